@@ -17,17 +17,24 @@ $PYPS_ROOT/config/.status/$hutch
 Which are created by the startProc script.
 """
 
+import fcntl
 import glob
 import logging
 import os
 import stat
-from copy import deepcopy
-from dataclasses import dataclass, field
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from copy import copy, deepcopy
+from dataclasses import dataclass, field, fields
 from pathlib import Path
 from tempfile import NamedTemporaryFile
+from typing import Any
 
 from .env_paths import env_paths
-from .epics_paths import get_parent
+from .epics_paths import get_parent, get_parent_cache
 from .hioc_tools import get_hard_ioc_dir_for_display
 
 logger = logging.getLogger(__name__)
@@ -81,6 +88,8 @@ class IOCProc:
         is a templated IOC.
         This will be automatically determined at object creation and
         does not need to be manually included.
+        If it is included, e.g. from a record, it is trusted and the
+        lookup is skipped.
     hard : bool, automatic
         True if this is a hard ioc on some embedded system.
         False if this is a soft ioc running on standard linux.
@@ -100,12 +109,136 @@ class IOCProc:
     hard: bool = False
 
     def __post_init__(self):
+        if self.parent:
+            return
         try:
             self.parent = get_parent(self.path, self.name)
         except Exception:
             ...
 
 
+# The procServ port ranges we hand out to new IOCs
+CLOSED_PORT_RANGE = range(30001, 39000)
+OPEN_PORT_RANGE = range(39100, 39200)
+
+
+class PortIndex:
+    """
+    Incremental index of which IOCs use which host and port.
+
+    This lets us answer "is this port taken", "which IOCs have port conflicts",
+    and "what is the first free port on this host" without looping over
+    every IOC in the config.
+
+    Each host has one bitmap (a bytearray with one byte per port) for each of
+    the closed and open port ranges, so finding the first free port is
+    a single bytearray.find call.
+
+    Each IOC is indexed by name, so an IOC can be re-indexed with new
+    host and port values without needing to know its old values.
+    """
+
+    def __init__(self):
+        # (host, port) -> names of iocs using this host, port in insertion order
+        self._users: dict[tuple[str, int], list[str]] = {}
+        # name -> (host, port)
+        self._keys: dict[str, tuple[str, int]] = {}
+        # host -> bitmaps for the closed and open port ranges
+        self._bitmaps: dict[str, dict[bool, bytearray]] = {}
+        # keys with more than one user
+        self._conflicts: set[tuple[str, int]] = set()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._keys
+
+    def add(self, name: str, host: str, port: int) -> None:
+        """Index an IOC, replacing its old host and port if it was indexed."""
+        if name in self._keys:
+            if self._keys[name] == (host, port):
+                return
+            self.remove(name)
+        key = (host, port)
+        self._keys[name] = key
+        users = self._users.setdefault(key, [])
+        users.append(name)
+        if len(users) > 1:
+            self._conflicts.add(key)
+        elif port in CLOSED_PORT_RANGE or port in OPEN_PORT_RANGE:
+            self._set_bit(host=host, port=port, value=1)
+
+    def remove(self, name: str) -> None:
+        """Stop indexing an IOC. This is a no-op if the IOC is not indexed."""
+        try:
+            key = self._keys.pop(name)
+        except KeyError:
+            return
+        users = self._users[key]
+        users.remove(name)
+        if len(users) < 2:
+            self._conflicts.discard(key)
+        if not users:
+            del self._users[key]
+            host, port = key
+            if port in CLOSED_PORT_RANGE or port in OPEN_PORT_RANGE:
+                self._set_bit(host=host, port=port, value=0)
+
+    def _set_bit(self, host: str, port: int, value: int) -> None:
+        try:
+            bitmaps = self._bitmaps[host]
+        except KeyError:
+            bitmaps = {
+                True: bytearray(len(CLOSED_PORT_RANGE)),
+                False: bytearray(len(OPEN_PORT_RANGE)),
+            }
+            self._bitmaps[host] = bitmaps
+        if port in CLOSED_PORT_RANGE:
+            bitmaps[True][port - CLOSED_PORT_RANGE.start] = value
+        else:
+            bitmaps[False][port - OPEN_PORT_RANGE.start] = value
+
+    def count(self, host: str, port: int) -> int:
+        """Return the number of IOCs that use host and port."""
+        return len(self._users.get((host, port), ()))
+
+    def users(self, host: str, port: int) -> list[str]:
+        """Return the names of the IOCs that use host and port."""
+        return list(self._users.get((host, port), ()))
+
+    def get_key(self, name: str) -> tuple[str, int] | None:
+        """Return the (host, port) an IOC is indexed under, or None."""
+        return self._keys.get(name)
+
+    @property
+    def conflicts(self) -> set[tuple[str, int]]:
+        """All of the (host, port) combinations that are used more than once."""
+        return set(self._conflicts)
+
+    def unused_port(self, host: str, closed: bool) -> int:
+        """
+        Return the smallest unused port for the host.
+
+        Parameters
+        ----------
+        host : str
+            The name of the host
+        closed : bool
+            True to use the closed range (30001-38999),
+            False to use the open range (39100-39199).
+        """
+        port_range = CLOSED_PORT_RANGE if closed else OPEN_PORT_RANGE
+        try:
+            bitmap = self._bitmaps[host][closed]
+        except KeyError:
+            return port_range.start
+        offset = bitmap.find(0)
+        if offset < 0:
+            raise RuntimeError("No unused ports found in range!")
+        return port_range.start + offset
+
+
 @dataclass(eq=True)
 class Config:
     """
@@ -132,7 +265,8 @@ class Config:
     procs : dict[str, IOCProc]
         A mapping of IOC name to the IOCProc instance associated with that IOC.
         Internally, this dictionary should be added to using the add_proc
-        method.
+        method, and changed using the update_proc and delete_proc methods,
+        which keep the port_index up to date.
     mtime : float
         The last modification time of the config file at the time of reading
         as a unix timestamp.
@@ -144,6 +278,30 @@ class Config:
     hosts: list[str] = field(default_factory=list)
     procs: dict[str, IOCProc] = field(default_factory=dict)
     mtime: float = 0.0
+    _port_index: PortIndex = field(
+        default_factory=PortIndex, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        self.reindex()
+
+    @property
+    def port_index(self) -> PortIndex:
+        """
+        The host and port index for the IOCs in this config.
+
+        If the procs dict was replaced or resized without using the
+        add_proc, update_proc, and delete_proc methods, this is rebuilt.
+        """
+        if len(self._port_index) != len(self.procs):
+            self.reindex()
+        return self._port_index
+
+    def reindex(self) -> None:
+        """Rebuild the port index from scratch."""
+        self._port_index = PortIndex()
+        for proc in self.procs.values():
+            self._port_index.add(name=proc.name, host=proc.host, port=proc.port)
 
     def add_proc(self, proc: IOCProc) -> None:
         """Include a new IOC process in the config."""
@@ -155,14 +313,18 @@ class Config:
 
     def update_proc(self, proc: IOCProc) -> None:
         """Update an existing IOC process in the config."""
+        port_index = self.port_index
         self.procs[proc.name] = proc
+        port_index.add(name=proc.name, host=proc.host, port=proc.port)
         if proc.host not in self.hosts:
             self.hosts.append(proc.host)
             self.hosts.sort()
 
     def delete_proc(self, ioc_name: str) -> None:
         """Remove an IOC from the config."""
+        port_index = self.port_index
         del self.procs[ioc_name]
+        port_index.remove(name=ioc_name)
 
     def validate(self) -> None:
         """
@@ -171,14 +333,17 @@ class Config:
         Currently, just checks if there is a duplicate host/port combination.
         If there is, a DuplicatePortError will be raised.
         """
-        host_ports = {}
+        conflicts = self.port_index.conflicts
+        if not conflicts:
+            return
+        # Report the first conflict in config order for consistent messages
         for proc in self.procs.values():
-            hp = (proc.host, proc.port)
-            if hp in host_ports:
+            key = (proc.host, proc.port)
+            if key in conflicts:
+                ioc1, ioc2 = self.port_index.users(host=proc.host, port=proc.port)[:2]
                 raise DuplicatePortError(
-                    host=proc.host, port=proc.port, ioc1=host_ports[hp], ioc2=proc.name
+                    host=proc.host, port=proc.port, ioc1=ioc1, ioc2=ioc2
                 )
-            host_ports[hp] = proc.name
 
     def get_unused_port(self, host: str, closed: bool):
         """
@@ -192,18 +357,170 @@ class Config:
             True to use the closed range (30001-38999),
             False to use the open range (39100-39199).
         """
-        used_ports = set()
-        for proc in self.procs.values():
-            if proc.host == host:
-                used_ports.add(proc.port)
-        if closed:
-            new_port_options = range(30001, 39000)
-        else:
-            new_port_options = range(39100, 39200)
-        for new_port in new_port_options:
-            if new_port not in used_ports:
-                return new_port
-        raise RuntimeError("No unused ports found in range!")
+        return self.port_index.unused_port(host=host, closed=closed)
+
+
+class ProcsOverlay(Mapping[str, IOCProc]):
+    """
+    Read-only mapping of IOC name to IOCProc with pending changes on top.
+
+    See ConfigOverlay.
+    """
+
+    def __init__(
+        self,
+        procs: Mapping[str, IOCProc],
+        add_procs: Mapping[str, IOCProc],
+        edit_procs: Mapping[str, IOCProc],
+        delete_names: Iterable[str],
+    ):
+        self._procs = procs
+        self._add_procs = add_procs
+        self._edit_procs = edit_procs
+        self._delete_names = delete_names
+        self._names: list[str] | None = None
+
+    def __getitem__(self, name: str) -> IOCProc:
+        if name in self._delete_names:
+            raise KeyError(name)
+        try:
+            return self._edit_procs[name]
+        except KeyError:
+            ...
+        try:
+            return self._add_procs[name]
+        except KeyError:
+            return self._procs[name]
+
+    def __contains__(self, name: object) -> bool:
+        if name in self._delete_names:
+            return False
+        return (
+            name in self._edit_procs or name in self._add_procs or name in self._procs
+        )
+
+    def _get_names(self) -> list[str]:
+        """Names in the same order as Config.add_proc and update_proc would give."""
+        if self._names is None:
+            names = dict.fromkeys(self._procs)
+            names.update(dict.fromkeys(self._add_procs))
+            names.update(dict.fromkeys(self._edit_procs))
+            self._names = [name for name in names if name not in self._delete_names]
+        return self._names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._get_names())
+
+    def __len__(self) -> int:
+        return len(self._get_names())
+
+
+class ConfigOverlay:
+    """
+    Read-only view of a Config with pending adds, edits, and deletes applied.
+
+    This presents the same information as copying the config and calling
+    add_proc, update_proc, and delete_proc for each pending change,
+    but without copying the config. The pending changes take priority
+    in the order delete, edit, add.
+
+    The base config is not copied and should be replaced rather than
+    modified while the view is in use.
+    The pending changes are shallow-copied, so later changes to the
+    containers that were passed in do not affect the view.
+    Use materialize to get a real Config, e.g. to write it to disk.
+
+    Parameters
+    ----------
+    config : Config
+        The config file contents.
+    add_procs : dict[str, IOCProc], optional
+        IOCs that are not yet in the config.
+    edit_procs : dict[str, IOCProc], optional
+        Replacements for IOCs in the config.
+    delete_names : iterable of str, optional
+        IOCs to leave out of the config.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        add_procs: Mapping[str, IOCProc] | None = None,
+        edit_procs: Mapping[str, IOCProc] | None = None,
+        delete_names: Iterable[str] = (),
+    ):
+        self.config = config
+        self._add_procs = dict(add_procs or {})
+        self._edit_procs = dict(edit_procs or {})
+        self.procs = ProcsOverlay(
+            procs=config.procs,
+            add_procs=self._add_procs,
+            edit_procs=self._edit_procs,
+            delete_names=frozenset(delete_names),
+        )
+        self._hosts: list[str] | None = None
+        self._port_index: PortIndex | None = None
+
+    @property
+    def path(self) -> str:
+        return self.config.path
+
+    @property
+    def commithost(self) -> str:
+        return self.config.commithost
+
+    @property
+    def allow_console(self) -> bool:
+        return self.config.allow_console
+
+    @property
+    def mtime(self) -> float:
+        return self.config.mtime
+
+    @property
+    def hosts(self) -> list[str]:
+        """The config's hosts, plus any new hosts from the pending changes."""
+        if self._hosts is None:
+            hosts = list(self.config.hosts)
+            new_hosts = {
+                proc.host
+                for proc in (*self._add_procs.values(), *self._edit_procs.values())
+                if proc.host not in hosts
+            }
+            if new_hosts:
+                hosts.extend(new_hosts)
+                hosts.sort()
+            self._hosts = hosts
+        return self._hosts
+
+    @property
+    def port_index(self) -> PortIndex:
+        """The host and port index for the IOCs in this view."""
+        if self._port_index is None:
+            self._port_index = PortIndex()
+            for proc in self.procs.values():
+                self._port_index.add(name=proc.name, host=proc.host, port=proc.port)
+        return self._port_index
+
+    def get_unused_port(self, host: str, closed: bool) -> int:
+        """See Config.get_unused_port."""
+        return self.port_index.unused_port(host=host, closed=closed)
+
+    def materialize(self) -> Config:
+        """
+        Create a real Config with the pending changes applied.
+
+        The IOCProc instances are copied so that the new Config
+        can be modified without affecting the view.
+        """
+        return Config(
+            path=self.path,
+            commithost=self.commithost,
+            allow_console=self.allow_console,
+            hosts=list(self.hosts),
+            procs={name: deepcopy(proc) for name, proc in self.procs.items()},
+            mtime=self.mtime,
+        )
 
 
 class DuplicatePortError(Exception):
@@ -222,6 +539,118 @@ class DuplicatePortError(Exception):
         )
 
 
+class ConfigConflictError(Exception):
+    """
+    Exception class for a config write that would clobber someone else's changes.
+
+    Raised by write_config when the file on disk is not the version we read,
+    and by merges when someone else changed the same setting we did.
+    """
+
+    def __init__(
+        self, path: str, expected_mtime: float, mtime: float, detail: str = ""
+    ):
+        self.path = path
+        self.expected_mtime = expected_mtime
+        self.mtime = mtime
+        self.detail = detail
+        message = (
+            f"{path} was modified by someone else since it was read "
+            f"(expected mtime {expected_mtime}, found {mtime})"
+        )
+        if detail:
+            message = f"{message}: {detail}"
+        super().__init__(message)
+
+
+@dataclass
+class ConfigDiff:
+    """
+    The differences between two snapshots of the same config file.
+
+    Attributes
+    ----------
+    added : list[str]
+        The names of IOCs that are only in the new config,
+        in the order they appear in the new config.
+    removed : list[str]
+        The names of IOCs that are only in the old config,
+        in the order they appeared in the old config.
+    modified : dict[str, set[str]]
+        A mapping of IOC name to the names of the IOCProc fields
+        that changed, for IOCs that are in both configs.
+    settings : set[str]
+        The names of the non-IOC Config fields that changed,
+        e.g. "commithost" or "hosts". The mtime is not included.
+        This will also include "order" if the IOCs that exist in both
+        configs are in a different relative order.
+    """
+
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    modified: dict[str, set[str]] = field(default_factory=dict)
+    settings: set[str] = field(default_factory=set)
+
+    @property
+    def has_changes(self) -> bool:
+        """True if there is any difference between the configs."""
+        return bool(self.added or self.removed or self.modified or self.settings)
+
+    @property
+    def reordered(self) -> bool:
+        """True if the IOCs in both configs are in a different relative order."""
+        return "order" in self.settings
+
+
+def diff_configs(old: Config, new: Config) -> ConfigDiff:
+    """
+    Compare two config snapshots and summarize what changed.
+
+    This is used to update the GUI incrementally when the config file
+    is edited by another user instead of starting from scratch.
+
+    Parameters
+    ----------
+    old : Config
+        The previous config snapshot.
+    new : Config
+        The current config snapshot.
+
+    Returns
+    -------
+    diff : ConfigDiff
+        The structured differences between old and new.
+    """
+    diff = ConfigDiff()
+    diff.added = [name for name in new.procs if name not in old.procs]
+    diff.removed = [name for name in old.procs if name not in new.procs]
+    proc_fields = [fld.name for fld in fields(IOCProc)]
+    for name, old_proc in old.procs.items():
+        try:
+            new_proc = new.procs[name]
+        except KeyError:
+            continue
+        if old_proc == new_proc:
+            continue
+        changed = {
+            fld
+            for fld in proc_fields
+            if getattr(old_proc, fld) != getattr(new_proc, fld)
+        }
+        if changed:
+            diff.modified[name] = changed
+    for fld in fields(Config):
+        if fld.name in ("procs", "mtime") or not fld.compare:
+            continue
+        if getattr(old, fld.name) != getattr(new, fld.name):
+            diff.settings.add(fld.name)
+    old_order = [name for name in old.procs if name in new.procs]
+    new_order = [name for name in new.procs if name in old.procs]
+    if old_order != new_order:
+        diff.settings.add("order")
+    return diff
+
+
 config_cache: dict[str, Config] = {}
 
 
@@ -285,6 +714,8 @@ def read_config(cfgname: str) -> Config:
         "hard": "hard",
     }
     exec(compile(cfgbytes, cfgfn, "exec"), {}, cfg_env)
+    parent_cache = get_parent_cache()
+    parent_changes = parent_cache.changes
     config = Config(
         path=cfgfn,
         commithost=cfg_env.get("COMMITHOST", DEFAULT_COMMITHOST),
@@ -320,34 +751,230 @@ def read_config(cfgname: str) -> Config:
         )
 
     config_cache[cfgfn] = config
+    # Share any new parents with the next process that reads this config
+    if parent_cache.changes != parent_changes:
+        parent_cache.save()
     return deepcopy(config)
 
 
-def get_host_os(hosts_list: list[str]) -> dict[str, str]:
+@dataclass
+class HostInfo:
+    """
+    Information about one server from its file in HOST_DIR.
+
+    Attributes
+    ----------
+    name : str
+        The hostname, which is also the filename.
+    os : str
+        The operating system, from the first line of the file.
+    extra : list[str]
+        Any additional non-empty lines in the file, in order.
+    mtime : float
+        The modification time of the file.
+    """
+
+    name: str
+    os: str
+    extra: list[str] = field(default_factory=list)
+    mtime: float = 0.0
+
+
+@dataclass
+class _HostFileCacheEntry:
+    """Cached result of reading one host file, with the stat info it came from."""
+
+    mtime_ns: int
+    size: int
+    host_info: HostInfo | None
+
+
+class HostDirReader:
+    """
+    Incremental reader for the host OS files in HOST_DIR.
+
+    One scandir finds every host file, and only the files that are new
+    or have a different mtime or size are opened.
+    Results from the last scan can be reused for up to max_age seconds.
+
+    Parameters
+    ----------
+    host_dir : str, optional
+        The directory to read, defaults to env_paths.HOST_DIR.
+    """
+
+    def __init__(self, host_dir: str | None = None):
+        self.host_dir = host_dir or env_paths.HOST_DIR
+        # Number of files opened and skipped on the most recent scan
+        self.reads = 0
+        self.skipped_reads = 0
+        self._cache: dict[str, _HostFileCacheEntry] = {}
+        self._last_scan: float | None = None
+        self._lock = threading.Lock()
+
+    def read(self, max_age: float = 0.0) -> dict[str, HostInfo]:
+        """
+        Return the information for every host that has a valid host file.
+
+        Parameters
+        ----------
+        max_age : float, optional
+            Skip the scan if we already did one within this many seconds.
+
+        Returns
+        -------
+        host_info : dict[str, HostInfo]
+            Dictionary from hostname to HostInfo.
+        """
+        with self._lock:
+            self._refresh(max_age=max_age)
+            return {
+                name: copy(entry.host_info)
+                for name, entry in self._cache.items()
+                if entry.host_info is not None
+            }
+
+    def get(self, hostname: str, max_age: float = 0.0) -> HostInfo | None:
+        """
+        Return the information for one host, or None if it has no valid file.
+
+        This is cheaper than read when you only need a few hosts,
+        because only the one host's information is copied.
+
+        Parameters
+        ----------
+        hostname : str
+            The host to look up.
+        max_age : float, optional
+            Skip the scan if we already did one within this many seconds.
+        """
+        with self._lock:
+            self._refresh(max_age=max_age)
+            entry = self._cache.get(hostname)
+            if entry is None or entry.host_info is None:
+                return None
+            return copy(entry.host_info)
+
+    def _refresh(self, max_age: float) -> None:
+        """Scan unless we already did within max_age. Needs the lock."""
+        now = time.monotonic()
+        if self._last_scan is None or now - self._last_scan >= max_age:
+            self._scan()
+            self._last_scan = now
+
+    def _scan(self) -> None:
+        self.reads = 0
+        self.skipped_reads = 0
+        new_cache: dict[str, _HostFileCacheEntry] = {}
+        try:
+            it = os.scandir(self.host_dir)
+        except OSError as exc:
+            logger.debug("Could not scan host dir %s: %s", self.host_dir, exc)
+            self._cache = new_cache
+            return
+        with it:
+            for dir_entry in it:
+                try:
+                    if not dir_entry.is_file():
+                        continue
+                    info = dir_entry.stat()
+                except OSError:
+                    continue
+                cached = self._cache.get(dir_entry.name)
+                if (
+                    cached is not None
+                    and cached.mtime_ns == info.st_mtime_ns
+                    and cached.size == info.st_size
+                ):
+                    self.skipped_reads += 1
+                    new_cache[dir_entry.name] = cached
+                    continue
+                self.reads += 1
+                new_cache[dir_entry.name] = _HostFileCacheEntry(
+                    mtime_ns=info.st_mtime_ns,
+                    size=info.st_size,
+                    host_info=self._read_file(
+                        name=dir_entry.name, path=dir_entry.path, mtime=info.st_mtime
+                    ),
+                )
+        self._cache = new_cache
+
+    @staticmethod
+    def _read_file(name: str, path: str, mtime: float) -> HostInfo | None:
+        try:
+            with open(path) as fd:
+                lines = [ln.strip() for ln in fd.readlines()]
+        except OSError as exc:
+            logger.debug("Could not read host file %s: %s", path, exc)
+            return None
+        if not lines:
+            logger.debug("Skipping empty host file %s", path)
+            return None
+        return HostInfo(
+            name=name, os=lines[0], extra=[ln for ln in lines[1:] if ln], mtime=mtime
+        )
+
+
+host_dir_readers: dict[str, HostDirReader] = {}
+
+
+def get_host_dir_reader() -> HostDirReader:
+    """
+    Return the shared HostDirReader for the current HOST_DIR.
+    """
+    host_dir = env_paths.HOST_DIR
+    try:
+        return host_dir_readers[host_dir]
+    except KeyError:
+        reader = HostDirReader(host_dir)
+        host_dir_readers[host_dir] = reader
+        return reader
+
+
+def read_host_info(max_age: float = 0.0) -> dict[str, HostInfo]:
+    """
+    Returns the information from every file in HOST_DIR.
+
+    Parameters
+    ----------
+    max_age : float, optional
+        Reuse the results of a previous scan if it is at most this many seconds old.
+
+    Returns
+    -------
+    host_info : dict[str, HostInfo]
+        Dictionary from hostname to HostInfo.
+    """
+    return get_host_dir_reader().read(max_age=max_age)
+
+
+def get_host_os(hosts_list: list[str], max_age: float = 0.0) -> dict[str, str]:
     """
     Returns the OS of each host.
 
     This is used to display which OS each host is running
     in the GUI.
 
+    Hosts without a readable host file are omitted.
+
     Parameters
     ----------
     hosts_list: list[str]
         The hosts to check.
+    max_age : float, optional
+        Reuse the results of a previous scan if it is at most this many seconds old.
 
     Returns
     -------
     host_os : dict[str, str]
         Dictionary from hostname to OS.
     """
-    host_os = {}
-    for fn in hosts_list:
-        try:
-            with open("%s/%s" % (env_paths.HOST_DIR, fn)) as fd:
-                host_os[fn] = fd.readlines()[0].strip()
-        except Exception:
-            ...
-    return host_os
+    host_info = read_host_info(max_age=max_age)
+    return {
+        hostname: host_info[hostname].os
+        for hostname in hosts_list
+        if hostname in host_info
+    }
 
 
 def _cfg_file_lines(config: Config) -> list[str]:
@@ -413,13 +1040,44 @@ def _cfg_file_lines(config: Config) -> list[str]:
     return lines
 
 
-def write_config(cfgname: str, config: Config) -> None:
+@contextmanager
+def config_write_lock(cfgfn: str) -> Iterator[None]:
+    """
+    Hold an exclusive lock for writing to a config file.
+
+    This only excludes other writers that also use this lock, such as
+    write_config with an expected_mtime.
+    The lock file is kept in TMP_DIR next to our other temporary files.
+
+    Parameters
+    ----------
+    cfgfn : str
+        The full path to the config file.
+    """
+    lock_name = os.path.abspath(cfgfn).strip(os.sep).replace(os.sep, "_")
+    lock_path = os.path.join(env_paths.TMP_DIR, f".{lock_name}.lock")
+    with open(lock_path, "a") as fd:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def write_config(
+    cfgname: str, config: Config, expected_mtime: float | None = None
+) -> float:
     """
     Write the configuration file for a given hutch.
 
     Writes to a temp file first, then copies over to the prod location
     to give us an atomic write.
 
+    If expected_mtime is provided, this is a compare-and-swap:
+    we hold the config's write lock, and only replace the file if
+    its mtime still matches. Otherwise, ConfigConflictError is raised and
+    the caller can re-read the file, redo its changes, and try again.
+
     Raises if the configuration is invalid.
 
     Parameters
@@ -428,6 +1086,13 @@ def write_config(cfgname: str, config: Config) -> None:
         A path to a config file or the name of a hutch.
     config : Config
         The configuration data to write.
+    expected_mtime : float, optional
+        The mtime of the file when we read it, typically config.mtime.
+
+    Returns
+    -------
+    mtime : float
+        The mtime of the newly written file.
     """
     config.validate()
     # Check if we have a file or a hutch name
@@ -442,7 +1107,144 @@ def write_config(cfgname: str, config: Config) -> None:
             fd.name,
             stat.S_IRUSR | stat.S_IRGRP | stat.S_IWUSR | stat.S_IWGRP | stat.S_IROTH,
         )
-        os.rename(fd.name, cfgfn)
+        if expected_mtime is None:
+            os.rename(fd.name, cfgfn)
+        else:
+            with config_write_lock(cfgfn):
+                mtime = os.stat(cfgfn).st_mtime
+                if mtime != expected_mtime:
+                    raise ConfigConflictError(
+                        path=cfgfn, expected_mtime=expected_mtime, mtime=mtime
+                    )
+                os.rename(fd.name, cfgfn)
+    return os.stat(cfgfn).st_mtime
+
+
+# Seconds between checks for edits to the auth, special, and nossh files
+POLICY_RECHECK_INTERVAL = 2.0
+
+
+@dataclass
+class _PolicyCacheEntry:
+    """Parsed contents of one policy file and when we last looked at it."""
+
+    signature: tuple[int, int] | None
+    value: Any = None
+    error: OSError | None = None
+    checked: float = 0.0
+
+
+class PolicyFileCache:
+    """
+    Parsed contents of the iocmanager.auth, .special, and .nossh files.
+
+    These are checked every time a user right-clicks or tries to edit a cell,
+    so rather than opening them each time we keep the parsed sets and dicts,
+    only re-reading a file when its mtime or size changes.
+    The stat itself is also skipped if we checked within recheck_interval seconds.
+
+    Parameters
+    ----------
+    recheck_interval : float, optional
+        Minimum number of seconds between checks of each file on disk.
+    """
+
+    def __init__(self, recheck_interval: float = POLICY_RECHECK_INTERVAL):
+        self.recheck_interval = recheck_interval
+        self.reads = 0
+        self._entries: dict[str, _PolicyCacheEntry] = {}
+        self._lock = threading.Lock()
+
+    def get[T](self, path: str, parser: Callable[[list[str]], T]) -> T:
+        """
+        Return the parsed contents of path, re-parsing only if it has changed.
+
+        Parameters
+        ----------
+        path : str
+            The file to read.
+        parser : callable
+            Function that turns the stripped lines of the file into a value.
+            This should be the same for every call with the same path.
+
+        Returns
+        -------
+        value : any
+            The output of parser.
+
+        Raises
+        ------
+        OSError
+            If the file could not be read.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or now - entry.checked >= self.recheck_interval:
+                entry = self._refresh(path=path, entry=entry, parser=parser)
+                entry.checked = now
+                self._entries[path] = entry
+        if entry.error is not None:
+            err = entry.error
+            raise type(err)(err.errno, err.strerror, err.filename)
+        return entry.value
+
+    def _refresh(
+        self,
+        path: str,
+        entry: _PolicyCacheEntry | None,
+        parser: Callable[[list[str]], Any],
+    ) -> _PolicyCacheEntry:
+        try:
+            info = os.stat(path)
+        except OSError as exc:
+            return _PolicyCacheEntry(signature=None, error=exc)
+        signature = (info.st_mtime_ns, info.st_size)
+        if entry is not None and entry.signature == signature:
+            return entry
+        try:
+            with open(path) as fd:
+                lines = [ln.strip() for ln in fd.readlines()]
+        except OSError as exc:
+            return _PolicyCacheEntry(signature=None, error=exc)
+        self.reads += 1
+        return _PolicyCacheEntry(signature=signature, value=parser(lines))
+
+    def invalidate(self, path: str | None = None) -> None:
+        """
+        Forget the cached contents of path, or of every file if path is omitted.
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(path, None)
+
+
+policy_cache = PolicyFileCache()
+
+
+def _parse_user_list(lines: list[str]) -> frozenset[str]:
+    """Parse iocmanager.auth or iocmanager.nossh: one username per line."""
+    return frozenset(lines)
+
+
+def _parse_special(lines: list[str]) -> dict[str, frozenset[str]]:
+    """
+    Parse iocmanager.special into a mapping from ioc name to permitted versions.
+
+    Each line is of the form ioc_name:permittedversion1,permittedversion2,etc
+    where everything after the ioc name is optional.
+    An ioc may appear on multiple lines, in which case the versions are merged.
+    """
+    special: dict[str, set[str]] = {}
+    for entry in lines:
+        ioc_vers_list = entry.split(":")
+        versions = special.setdefault(ioc_vers_list[0], set())
+        # if there is information after the colon, parse it
+        if len(ioc_vers_list) > 1:
+            versions.update(ioc_vers_list[-1].split(","))
+    return {ioc_name: frozenset(vers) for ioc_name, vers in special.items()}
 
 
 def check_auth(user: str, hutch: str) -> bool:
@@ -461,13 +1263,7 @@ def check_auth(user: str, hutch: str) -> bool:
     auth_ok : bool
         True if the user is authorized, False otherwise.
     """
-    with open(env_paths.AUTH_FILE % hutch) as fd:
-        lines = fd.readlines()
-    lines = [ln.strip() for ln in lines]
-    for ln in lines:
-        if ln == user:
-            return True
-    return False
+    return user in policy_cache.get(env_paths.AUTH_FILE % hutch, _parse_user_list)
 
 
 def check_special(
@@ -497,34 +1293,17 @@ def check_special(
     is_special -> bool
         True if the IOC is toggleable between versions.
     """
-    with open(env_paths.SPECIAL_FILE % req_hutch) as fp:
-        lines = fp.readlines()
-        lines = [ln.strip() for ln in lines]
-        for entry in lines:
-            ioc_vers_list = entry.split(":")
-            ioc_name = ioc_vers_list[0]
-
-            # check that the ioc is in permissioned list before moving forward
-            if ioc_name != req_ioc:
-                continue  # not the ioc we are looking for
-
-            if req_version == "no_upgrade":
-                # NOTE(josh): this does assume that the only place check_special is
-                # invoked without overloading the default argument is in the raw
-                # enable / disable case
-                return True
-
-            # if there is information after the colon, parse it
-            if len(ioc_vers_list) > 1:
-                perm_version = ioc_vers_list[-1].split(",")
-                for vers in perm_version:
-                    if vers == req_version:
-                        return (
-                            True  # return True if the requested version is in the list
-                        )
-            # if the entry has no colon, assumed just ioc name
-
+    special = policy_cache.get(env_paths.SPECIAL_FILE % req_hutch, _parse_special)
+    try:
+        versions = special[req_ioc]
+    except KeyError:
         return False
+    if req_version == "no_upgrade":
+        # NOTE(josh): this does assume that the only place check_special is
+        # invoked without overloading the default argument is in the raw
+        # enable / disable case
+        return True
+    return req_version in versions
 
 
 def check_ssh(user: str, hutch: str) -> bool:
@@ -548,14 +1327,66 @@ def check_ssh(user: str, hutch: str) -> bool:
         True if the user is not in the nossh file
     """
     try:
-        lines = open(env_paths.NOSSH_FILE % hutch).readlines()
+        nossh = policy_cache.get(env_paths.NOSSH_FILE % hutch, _parse_user_list)
     except Exception:
         return True
-    lines = [ln.strip() for ln in lines]
-    for ln in lines:
-        if ln == user:
-            return False
-    return True
+    return user not in nossh
+
+
+def read_all_configs(
+    hutches: Iterable[str] | None = None,
+    max_workers: int | None = None,
+    timings: dict[str, float] | None = None,
+) -> dict[str, Config]:
+    """
+    Read the configuration files for many hutches at once.
+
+    Each read_config call spends most of its time waiting on the filesystem,
+    both for the config file itself and to find each IOC's parent,
+    so the hutches are read concurrently in a thread pool.
+
+    May raise in case of failure, the same as read_config.
+
+    Parameters
+    ----------
+    hutches : iterable of str, optional
+        Paths to config files or names of hutches, as in read_config.
+        Defaults to every hutch from get_hutch_list.
+    max_workers : int, optional
+        The maximum number of configs to read at the same time.
+        Defaults to the ThreadPoolExecutor default.
+    timings : dict[str, float], optional
+        If provided, this is filled with the number of seconds it took
+        to read each hutch's config.
+
+    Returns
+    -------
+    configs : dict[str, Config]
+        Mapping from each input hutch or path to its config, in input order.
+    """
+    if hutches is None:
+        hutches = get_hutch_list()
+    hutches = list(dict.fromkeys(hutches))
+
+    def timed_read(cfgname: str) -> tuple[Config, float]:
+        start = time.monotonic()
+        config = read_config(cfgname)
+        return config, time.monotonic() - start
+
+    results: dict[str, tuple[Config, float]] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(timed_read, cfgname): cfgname for cfgname in hutches}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    configs = {}
+    for cfgname in hutches:
+        config, elapsed = results[cfgname]
+        logger.debug("Read config for %s in %.3fs", cfgname, elapsed)
+        if timings is not None:
+            timings[cfgname] = elapsed
+        configs[cfgname] = config
+    return configs
 
 
 old_keymap = {
@@ -592,8 +1423,7 @@ def find_iocs(**kwargs) -> list[tuple[str, IOCProc]]:
 
     cfgs = glob.glob(env_paths.CONFIG_FILE % "*")
     configs = []
-    for cfg in cfgs:
-        config = read_config(cfg)
+    for cfg, config in read_all_configs(cfgs).items():
         for ioc in config.procs.values():
             for k in list(kw.items()):
                 if getattr(ioc, k[0]) != k[1]:
@@ -659,6 +1489,240 @@ class IOCStatusFile:
 unique_id = tuple[str, str]
 
 
+@dataclass
+class _StatusFileCacheEntry:
+    """
+    What we learned about one status file the last time we read it.
+
+    status_file is None for empty and corrupt files.
+    """
+
+    mtime_ns: int
+    size: int
+    status_file: IOCStatusFile | None
+    corrupt: bool = False
+
+
+class StatusDirReader:
+    """
+    Stateful reader for one hutch's status directory.
+
+    See read_status_dir for the format of the status directory.
+
+    This keeps the results from previous reads and uses os.scandir
+    metadata to only open the files whose mtime or size changed.
+    Files that should be deleted (corrupt or obsolete) are deleted in
+    batches in a background thread rather than one at a time during the read.
+
+    Parameters
+    ----------
+    cfg : str
+        The hutch name associated with the config, such as xpp or tmo.
+
+    Attributes
+    ----------
+    reads : int
+        The number of files we had to open during the most recent read.
+    skipped_reads : int
+        The number of files we didn't need to open during the most recent read.
+    total_skipped_reads : int
+        The number of files we didn't need to open over all reads.
+    """
+
+    def __init__(self, cfg: str):
+        self.cfg = cfg
+        self.status_dir = env_paths.STATUS_DIR % cfg
+        self.reads = 0
+        self.skipped_reads = 0
+        self.total_skipped_reads = 0
+        self._cache: dict[str, _StatusFileCacheEntry] = {}
+        self._lock = threading.Lock()
+        self._pending_deletes: set[str] = set()
+        self._delete_lock = threading.Lock()
+        self._cleanup_thread: threading.Thread | None = None
+
+    def read(self) -> list[IOCStatusFile]:
+        """
+        Update the status directory and return its information.
+
+        See read_status_dir.
+        """
+        with self._lock:
+            entries = self._scan()
+            # Each host, port combination should be used exactly once
+            # When the keys collide, we know that one of the files is out of date
+            info: dict[unique_id, IOCStatusFile] = {}
+            for filename, entry in list(entries.items()):
+                if entry.corrupt:
+                    self._queue_delete(filename)
+                    continue
+                status_file = entry.status_file
+                if status_file is None:
+                    continue
+                key: unique_id = (status_file.host, str(status_file.port))
+                if key in info:
+                    # Duplicate
+                    if info[key].mtime < status_file.mtime:
+                        # Duplicate, but newer, so delete other!
+                        logger.info(
+                            "Deleting obsolete %s in favor of %s",
+                            info[key].name,
+                            filename,
+                        )
+                        self._queue_delete(info[key].name)
+                    else:
+                        # Duplicate, but older, so delete this!
+                        logger.info(
+                            "Deleting obsolete %s in favor of %s",
+                            filename,
+                            info[key].name,
+                        )
+                        self._queue_delete(filename)
+                        continue
+                info[key] = status_file
+            logger.debug(
+                "Read %d status files in %s, skipped %d unchanged files",
+                self.reads,
+                self.status_dir,
+                self.skipped_reads,
+            )
+        self._start_cleanup()
+        return [copy(status_file) for status_file in info.values()]
+
+    def _scan(self) -> dict[str, _StatusFileCacheEntry]:
+        """
+        Refresh our cache from the status directory and return it.
+
+        Only files that are new or have a different mtime or size are opened.
+        """
+        self.reads = 0
+        self.skipped_reads = 0
+        new_cache: dict[str, _StatusFileCacheEntry] = {}
+        with os.scandir(self.status_dir) as it:
+            for dir_entry in it:
+                if dir_entry.name in self._pending_deletes:
+                    continue
+                try:
+                    if not dir_entry.is_file():
+                        continue
+                    info = dir_entry.stat()
+                except OSError:
+                    continue
+                cached = self._cache.get(dir_entry.name)
+                if (
+                    cached is not None
+                    and cached.mtime_ns == info.st_mtime_ns
+                    and cached.size == info.st_size
+                ):
+                    new_cache[dir_entry.name] = cached
+                    self.skipped_reads += 1
+                    continue
+                try:
+                    entry = self._read_file(dir_entry.name)
+                except OSError:
+                    # Probably deleted by someone else just now
+                    continue
+                self.reads += 1
+                new_cache[dir_entry.name] = entry
+        self.total_skipped_reads += self.skipped_reads
+        self._cache = new_cache
+        return new_cache
+
+    def _read_file(self, filename: str) -> _StatusFileCacheEntry:
+        """Open and parse one status file."""
+        with open(os.path.join(self.status_dir, filename), "r") as fd:
+            lines = fd.readlines()
+            # Must be after we open the file to ensure up-to-date on NFS
+            info = os.fstat(fd.fileno())
+        if not lines:
+            return _StatusFileCacheEntry(
+                mtime_ns=info.st_mtime_ns, size=info.st_size, status_file=None
+            )
+        try:
+            pid, host, port, directory = lines[0].strip().split()
+            status_file = IOCStatusFile(
+                name=filename,
+                port=int(port),
+                host=host,
+                path=directory,
+                pid=int(pid),
+                mtime=info.st_mtime,
+            )
+        except Exception:
+            # Must be the unpack error, file has corrupt data
+            return _StatusFileCacheEntry(
+                mtime_ns=info.st_mtime_ns,
+                size=info.st_size,
+                status_file=None,
+                corrupt=True,
+            )
+        return _StatusFileCacheEntry(
+            mtime_ns=info.st_mtime_ns, size=info.st_size, status_file=status_file
+        )
+
+    def _queue_delete(self, filename: str) -> None:
+        """Schedule a file to be deleted at the next cleanup."""
+        with self._delete_lock:
+            self._pending_deletes.add(filename)
+        self._cache.pop(filename, None)
+
+    def _start_cleanup(self) -> None:
+        """Delete all the queued files in a background thread."""
+        with self._delete_lock:
+            if not self._pending_deletes:
+                return
+            if self._cleanup_thread is not None and self._cleanup_thread.is_alive():
+                # The running cleanup will pick up the new files
+                return
+            self._cleanup_thread = threading.Thread(target=self._cleanup, daemon=True)
+            self._cleanup_thread.start()
+
+    def _cleanup(self) -> None:
+        """Delete queued files until there are none left."""
+        while True:
+            with self._delete_lock:
+                batch = list(self._pending_deletes)
+                if not batch:
+                    return
+            for filename in batch:
+                _lazy_delete_file(os.path.join(self.status_dir, filename))
+            with self._delete_lock:
+                self._pending_deletes.difference_update(batch)
+
+    def wait_for_cleanup(self, timeout: float | None = None) -> bool:
+        """
+        Block until the background cleanup is done.
+
+        Returns True if the cleanup finished in time.
+        """
+        thread = self._cleanup_thread
+        if thread is not None:
+            thread.join(timeout=timeout)
+            return not thread.is_alive()
+        return True
+
+
+status_dir_readers: dict[str, StatusDirReader] = {}
+
+
+def get_status_dir_reader(cfg: str) -> StatusDirReader:
+    """
+    Return the shared StatusDirReader for a hutch's status directory.
+
+    Parameters
+    ----------
+    cfg : str
+        The hutch name associated with the config, such as xpp or tmo.
+    """
+    status_dir = env_paths.STATUS_DIR % cfg
+    try:
+        return status_dir_readers[status_dir]
+    except KeyError:
+        reader = StatusDirReader(cfg)
+        status_dir_readers[status_dir] = reader
+        return reader
+
+
 def read_status_dir(cfg: str) -> list[IOCStatusFile]:
     """
     Update a status directory for a hutch and return its information.
@@ -685,6 +1749,10 @@ def read_status_dir(cfg: str) -> list[IOCStatusFile]:
       delete all but the newest such file.
     - Collect information about the files that remain and return it all
 
+    Files are only opened if they changed since the last call,
+    and the deletions happen in a background thread.
+    See StatusDirReader and get_status_dir_reader.
+
     Parameters
     ----------
     cfg : str
@@ -696,59 +1764,7 @@ def read_status_dir(cfg: str) -> list[IOCStatusFile]:
         A list of structured data containing all information about each
         IOC from the status dir.
     """
-    # Each host, port combination should be used exactly once
-    # When the keys collide, we know that one of the files is out of date
-    info: dict[unique_id, IOCStatusFile] = {}
-
-    for filename in os.listdir(env_paths.STATUS_DIR % cfg):
-        full_path = (env_paths.STATUS_DIR % cfg) + "/" + filename
-        with open(full_path, "r") as fd:
-            lines = fd.readlines()
-        if not lines:
-            continue
-        # Must be after we open the file to ensure up-to-date on NFS
-        mtime = os.stat(full_path).st_mtime
-        try:
-            pid, host, port, directory = lines[0].strip().split()
-        except Exception:
-            # Must be the unpack error, file has corrupt data
-            _lazy_delete_file(full_path)
-            continue
-        key: unique_id = (host, port)
-        if key in info:
-            # Duplicate
-            if info[key].mtime < mtime:
-                # Duplicate, but newer, so delete other!
-                logger.info(
-                    "Deleting obsolete %s in favor of %s",
-                    info[key].name,
-                    filename,
-                )
-                _lazy_delete_file((env_paths.STATUS_DIR % cfg) + "/" + info[key].name)
-                new_entry = True
-            else:
-                # Duplicate, but older, so delete this!
-                logger.info(
-                    "Deleting obsolete %s in favor of %s",
-                    filename,
-                    info[key].name,
-                )
-                _lazy_delete_file(full_path)
-                new_entry = False
-        else:
-            new_entry = True
-
-        if new_entry:
-            info[key] = IOCStatusFile(
-                name=filename,
-                port=int(port),
-                host=host,
-                path=directory,
-                pid=int(pid),
-                mtime=mtime,
-            )
-
-    return list(info.values())
+    return get_status_dir_reader(cfg).read()
 
 
 def _lazy_delete_file(filename: str):
@@ -0,0 +1,368 @@
+"""
+The console_dock module defines in-app widgets for an IOC's console and log.
+
+These replace the floating terminals from the terminal module in the GUI:
+
+- ProcServConsole talks to the procServ port with a non-blocking QTcpSocket,
+  like a telnet session.
+- LogViewer follows the IOC's logfile, like tail -f.
+
+Neither spawns a process, so they open instantly and many can be open at once.
+Each keeps a bounded scrollback so that a chatty IOC can't use up our memory.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from collections import deque
+
+from qtpy.QtCore import QEvent, QObject, Qt, QTimer
+from qtpy.QtGui import QFont, QKeyEvent, QTextCursor
+from qtpy.QtNetwork import QAbstractSocket, QTcpSocket
+from qtpy.QtWidgets import (
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QPlainTextEdit,
+    QPushButton,
+    QVBoxLayout,
+    QWidget,
+)
+
+logger = logging.getLogger(__name__)
+
+# Most lines to keep in a console or log view
+CONSOLE_SCROLLBACK = 5000
+LOG_SCROLLBACK = 5000
+# How many lines of an existing log to show at first, like tail -1000
+LOG_INITIAL_LINES = 1000
+# How far back in the log to look for LOG_INITIAL_LINES
+LOG_INITIAL_BYTES = 512 * 1024
+# Most bytes to read from the log in one go, so the gui stays responsive
+LOG_MAX_READ = 1024 * 1024
+# How often to check the log for new lines
+LOG_POLL_MS = 500
+
+# Ctrl keys that procServ or the IOC shell act on, sent as soon as they are pressed:
+# ctrl+X kills the IOC, ctrl+T toggles autorestart, ctrl+C interrupts, ctrl+D is EOF.
+# Other ctrl keys are left to the input box for copy, paste, undo, etc.
+CONTROL_KEYS = frozenset((Qt.Key_X, Qt.Key_T, Qt.Key_C, Qt.Key_D))
+
+# Telnet protocol bytes, see RFC 854
+IAC = 255
+SB = 250
+SE = 240
+WILL_WONT_DO_DONT = frozenset((251, 252, 253, 254))
+
+
+class TelnetFilter:
+    """
+    Remove telnet protocol commands from a byte stream.
+
+    procServ sends a few option negotiations when we connect.
+    We don't need to answer them, but we shouldn't show them either.
+    A command can be split between two reads, so leftovers are kept
+    for the next call to feed.
+    """
+
+    def __init__(self):
+        self._pending = b""
+        self._in_subnegotiation = False
+
+    def feed(self, data: bytes) -> bytes:
+        """Return data without any telnet commands."""
+        data = self._pending + data
+        self._pending = b""
+        out = bytearray()
+        pos = 0
+        while pos < len(data):
+            byte = data[pos]
+            if byte != IAC:
+                if not self._in_subnegotiation:
+                    out.append(byte)
+                pos += 1
+                continue
+            if pos + 1 >= len(data):
+                self._pending = data[pos:]
+                break
+            command = data[pos + 1]
+            if command == IAC:
+                # Escaped 0xff
+                if not self._in_subnegotiation:
+                    out.append(IAC)
+                pos += 2
+            elif command in WILL_WONT_DO_DONT:
+                if pos + 2 >= len(data):
+                    self._pending = data[pos:]
+                    break
+                pos += 3
+            else:
+                if command == SB:
+                    self._in_subnegotiation = True
+                elif command == SE:
+                    self._in_subnegotiation = False
+                pos += 2
+        return bytes(out)
+
+
+def _make_output(scrollback: int) -> QPlainTextEdit:
+    """Read-only monospace text area that only keeps the last scrollback lines."""
+    output = QPlainTextEdit()
+    output.setReadOnly(True)
+    output.setMaximumBlockCount(scrollback)
+    output.setLineWrapMode(QPlainTextEdit.NoWrap)
+    font = QFont("Monospace")
+    font.setStyleHint(QFont.TypeWriter)
+    output.setFont(font)
+    return output
+
+
+def _append_text(output: QPlainTextEdit, text: str):
+    """
+    Add text at the end, without a newline, like a terminal.
+
+    Only follows the new text if we were already at the bottom,
+    so that the user can scroll up and read while output arrives.
+    """
+    scroll_bar = output.verticalScrollBar()
+    at_bottom = scroll_bar.value() == scroll_bar.maximum()
+    cursor = QTextCursor(output.document())
+    cursor.movePosition(QTextCursor.End)
+    cursor.insertText(text)
+    if at_bottom:
+        scroll_bar.setValue(scroll_bar.maximum())
+
+
+class ProcServConsole(QWidget):
+    """
+    An interactive console for one procServ port.
+
+    Lines typed into the input box are sent when the user hits enter.
+    The CONTROL_KEYS, like ctrl+X (restart) and ctrl+T (toggle autorestart),
+    are sent as soon as they are pressed, as they would be in telnet.
+
+    Parameters
+    ----------
+    host : str
+        The host the procServ runs on.
+    port : int
+        The procServ port.
+    scrollback : int, optional
+        The most lines of output to keep.
+    parent : QWidget, optional
+        The parent widget.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        scrollback: int = CONSOLE_SCROLLBACK,
+        parent: QWidget | None = None,
+    ):
+        super().__init__(parent)
+        self.host = host
+        self.port = port
+        self.telnet_filter = TelnetFilter()
+        self.output = _make_output(scrollback=scrollback)
+        self.input = QLineEdit()
+        self.input.setPlaceholderText("Type a command and press enter")
+        self.input.returnPressed.connect(self.send_input)
+        self.input.installEventFilter(self)
+        self.status_label = QLabel()
+        self.reconnect_button = QPushButton("Reconnect")
+        self.reconnect_button.clicked.connect(self.connect_to_host)
+        bottom = QHBoxLayout()
+        bottom.addWidget(self.input)
+        bottom.addWidget(self.status_label)
+        bottom.addWidget(self.reconnect_button)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.output)
+        layout.addLayout(bottom)
+
+        self.socket = QTcpSocket(self)
+        self.socket.readyRead.connect(self._read_socket)
+        self.socket.stateChanged.connect(self._update_status)
+        self.socket.errorOccurred.connect(self._socket_error)
+        self.connect_to_host()
+
+    def connect_to_host(self):
+        """Start connecting, or reconnecting, to the procServ port."""
+        self.socket.abort()
+        self.telnet_filter = TelnetFilter()
+        self.socket.connectToHost(self.host, self.port)
+
+    def send(self, data: bytes):
+        """Send raw bytes to procServ, if we're connected."""
+        if self.socket.state() == QAbstractSocket.ConnectedState:
+            self.socket.write(data)
+
+    def send_input(self):
+        """Send the line in the input box."""
+        self.send(self.input.text().encode() + b"\n")
+        self.input.clear()
+
+    def eventFilter(self, a0: QObject | None, a1: QEvent | None) -> bool:
+        """
+        Pass the CONTROL_KEYS from the input box straight to procServ.
+
+        ctrl+C still copies if there is selected text in the input box.
+        """
+        if (
+            a0 is self.input
+            and isinstance(a1, QKeyEvent)
+            and a1.type() == QEvent.KeyPress
+            and a1.modifiers() & Qt.ControlModifier
+            and a1.key() in CONTROL_KEYS
+            and not (a1.key() == Qt.Key_C and self.input.hasSelectedText())
+        ):
+            self.send(bytes((a1.key() - Qt.Key_A + 1,)))
+            return True
+        return super().eventFilter(a0, a1)
+
+    def close_connection(self):
+        """Disconnect from procServ."""
+        self.socket.abort()
+
+    def _read_socket(self):
+        data = self.telnet_filter.feed(bytes(self.socket.readAll()))
+        if data:
+            text = data.decode(errors="replace").replace("\r", "")
+            _append_text(self.output, text)
+
+    def _update_status(self, state: QAbstractSocket.SocketState):
+        match state:
+            case QAbstractSocket.ConnectedState:
+                self.status_label.setText(f"Connected to {self.host}:{self.port}")
+            case QAbstractSocket.UnconnectedState:
+                self.status_label.setText("Disconnected")
+            case _:
+                self.status_label.setText(f"Connecting to {self.host}:{self.port}...")
+
+    def _socket_error(self, error: QAbstractSocket.SocketError):
+        logger.debug("Console %s:%s error: %s", self.host, self.port, error)
+        _append_text(self.output, f"\n*** {self.socket.errorString()} ***\n")
+
+
+class LogViewer(QWidget):
+    """
+    Follow a logfile as it grows, like tail -f.
+
+    The file is checked every poll_ms for new lines, and only the new
+    bytes are read. If the file is replaced or truncated, e.g. by log
+    rotation or an IOC reboot, we start again from the top of the new file.
+
+    Parameters
+    ----------
+    path : str
+        The logfile to follow.
+    scrollback : int, optional
+        The most lines to keep.
+    initial_lines : int, optional
+        How many lines from the end of the existing file to show at first.
+    poll_ms : int, optional
+        How often to check for new lines.
+    parent : QWidget, optional
+        The parent widget.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        scrollback: int = LOG_SCROLLBACK,
+        initial_lines: int = LOG_INITIAL_LINES,
+        poll_ms: int = LOG_POLL_MS,
+        parent: QWidget | None = None,
+    ):
+        super().__init__(parent)
+        self.path = path
+        self.initial_lines = initial_lines
+        self.output = _make_output(scrollback=scrollback)
+        self.status_label = QLabel(path)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.output)
+        layout.addWidget(self.status_label)
+        # Which file we're reading, so we can tell when it is replaced
+        self._file_id: tuple[int, int] | None = None
+        self._offset = 0
+        # The end of the last line if it didn't have a newline yet
+        self._partial = b""
+        self.timer = QTimer(self)
+        self.timer.setInterval(poll_ms)
+        self.timer.timeout.connect(self.check_file)
+        self.check_file()
+        self.timer.start()
+
+    def check_file(self):
+        """Show any new lines in the file."""
+        try:
+            stat = os.stat(self.path)
+        except OSError as exc:
+            self.status_label.setText(f"{self.path}: {exc.strerror}")
+            return
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self._file_id:
+            first_read = self._file_id is None
+            self._file_id = file_id
+            self._offset = 0
+            self._partial = b""
+            if first_read:
+                self._read_tail(size=stat.st_size)
+                return
+            _append_text(self.output, f"\n*** {self.path} was replaced ***\n")
+        elif stat.st_size < self._offset:
+            self._offset = 0
+            self._partial = b""
+            _append_text(self.output, f"\n*** {self.path} was truncated ***\n")
+        if stat.st_size > self._offset:
+            self._read_new()
+
+    def stop(self):
+        """Stop following the file."""
+        self.timer.stop()
+
+    def _read_tail(self, size: int):
+        """Show the last initial_lines lines of the file."""
+        start = max(0, size - LOG_INITIAL_BYTES)
+        try:
+            with open(self.path, "rb") as fd:
+                fd.seek(start)
+                data = fd.read(size - start)
+        except OSError as exc:
+            self.status_label.setText(f"{self.path}: {exc.strerror}")
+            return
+        self._offset = start + len(data)
+        lines = data.split(b"\n")
+        # Keep the end without a newline, even if that is all we read
+        self._partial = lines.pop()
+        if start > 0 and lines:
+            # Probably started in the middle of a line
+            lines = lines[1:]
+        tail = deque(lines, maxlen=self.initial_lines)
+        if tail:
+            _append_text(self.output, self._decode(b"\n".join(tail) + b"\n"))
+        self.status_label.setText(self.path)
+
+    def _read_new(self):
+        """Show the lines added since the last read."""
+        try:
+            with open(self.path, "rb") as fd:
+                fd.seek(self._offset)
+                data = fd.read(LOG_MAX_READ)
+        except OSError as exc:
+            self.status_label.setText(f"{self.path}: {exc.strerror}")
+            return
+        self._offset += len(data)
+        data = self._partial + data
+        end = data.rfind(b"\n") + 1
+        self._partial = data[end:]
+        if end:
+            _append_text(self.output, self._decode(data[:end]))
+        self.status_label.setText(self.path)
+
+    @staticmethod
+    def _decode(data: bytes) -> str:
+        return data.decode(errors="replace").replace("\r", "")
@@ -25,7 +25,8 @@ from qtpy.QtWidgets import (
 )
 
 from .config import IOCProc
-from .epics_paths import get_parent, standard_ioc_paths
+from .epics_paths import standard_ioc_paths
+from .parent_resolver import ParentResolver
 
 if TYPE_CHECKING:
     from .table_model import IOCTableModel
@@ -37,6 +38,7 @@ class AddIOCDialog(QFileDialog):
 
     - Extend the grid layout with new widgets
     - Helpers for port selection
+    - Find the IOC's parent in the background as the user browses
     """
 
     def __init__(self, hutch: str, model: IOCTableModel, parent: QWidget | None):
@@ -77,6 +79,8 @@ class AddIOCDialog(QFileDialog):
         self._add_row("Port (-1 = HARD IOC)", port_layout)
         self.parent_edit = self._add_row("Parent", QLineEdit())
         self.parent_edit.setReadOnly(True)
+        self.parent_resolver = ParentResolver(parent=self)
+        self.parent_resolver.parent_resolved.connect(self._set_parent)
         self._add_row("* = Required Fields for Soft IOCs.")
         self._add_row("+ = Required fields for Hard IOCs.")
         self.reset()
@@ -146,15 +150,20 @@ class AddIOCDialog(QFileDialog):
 
     def _update_parent(self, _: str):
         """
-        Set the parent widget to the IOC parent (for templated IOCs)
+        Look up the IOC parent (for templated IOCs) for the parent widget.
 
         The input variable may be any of the three texts we need,
         ignore it and check all the values.
+
+        The lookup happens in the background, see _set_parent.
         """
         ioc_name = self.name_edit.text().strip()
         selected_path = self._get_selected_path()
-        parent_path = self._get_parent(selected_path=selected_path, ioc_name=ioc_name)
-        self.parent_edit.setText(parent_path)
+        self.parent_resolver.request(directory=selected_path, ioc_name=ioc_name)
+
+    def _set_parent(self, directory: str, ioc_name: str, parent: str):
+        """Slot to show the parent from the latest _update_parent."""
+        self.parent_edit.setText(parent)
 
     def _get_selected_path(self) -> str:
         """
@@ -180,15 +189,6 @@ class AddIOCDialog(QFileDialog):
         # That's enough, let's move on
         return selected_path
 
-    def _get_parent(self, selected_path: str, ioc_name: str) -> str:
-        """Inner wrapper for _update_parent that returns the str to use."""
-        if not ioc_name or not selected_path:
-            return ""
-        try:
-            return get_parent(directory=selected_path, ioc_name=ioc_name)
-        except Exception:
-            return ""
-
     def reset(self):
         """
         Set the widgets back to their default values.
@@ -197,6 +197,7 @@ class AddIOCDialog(QFileDialog):
         self.alias_edit.setText("")
         self.host_edit.setText("")
         self.port_spinbox.setValue(30001)
+        self.parent_resolver.cancel()
         self.parent_edit.setText("")
         # Workaround for no direct way to clear selected path
         # Move to a directory where we can select the default path as our dir
@@ -15,6 +15,7 @@ from qtpy.QtCore import Qt
 from qtpy.QtWidgets import QDialog, QWidget
 
 from . import ui_find_pv
+from .config import Config, ConfigOverlay
 from .ioc_info import find_pv
 from .table_model import IOCTableModel
 
@@ -48,7 +49,7 @@ class FindPVDialog(QDialog):
         self.ui = ui_find_pv.Ui_Dialog()
         self.ui.setupUi(self)
         self.model = model
-        self.config = model.config
+        self.config: Config | ConfigOverlay = model.config
         self.ioc_names = []
         self.regex_text = ""
         self.regexp = re.compile("")
@@ -67,7 +68,7 @@ class FindPVDialog(QDialog):
         self.ui.progress_label.setText("Initializing find_pv...")
         self.ui.found_pvs.setPlainText("")
         self.show()
-        self.config = self.model.get_next_config()
+        self.config = self.model.get_next_config_view()
         self.ioc_names = list(self.config.procs)
         self.regex_text = regex_text
         self.regexp = re.compile(regex_text)
@@ -0,0 +1,45 @@
+"""
+The dialog_host_tree module defines the HostTreeDialog's logic.
+
+The HostTreeDialog shows the IOCs grouped by host, with a summary row for
+each host, to answer questions like "is everything on this server healthy?"
+
+The HostTreeDialog's layout is defined in ui/host_tree.ui
+"""
+
+from qtpy.QtCore import QModelIndex
+from qtpy.QtWidgets import QDialog, QWidget
+
+from . import ui_host_tree
+from .host_tree import HostColumn, HostTreeModel
+
+# Depends on the version, even pylance gets confused
+try:
+    from qtpy.QtCore import pyqtSignal as Signal
+except ImportError:
+    from qtpy.QtCore import Signal  # type: ignore
+
+
+class HostTreeDialog(QDialog):
+    """
+    Load the pyuic-compiled ui/host_tree.ui into a QDialog.
+
+    Double-clicking an IOC asks the main window to scroll to it.
+    This is a non-modal dialog so it can be left open next to the table.
+    """
+
+    request_scroll = Signal(str)
+
+    def __init__(self, host_model: HostTreeModel, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.ui = ui_host_tree.Ui_Dialog()
+        self.ui.setupUi(self)
+        self.host_model = host_model
+        self.ui.tree.setModel(host_model)
+        self.ui.tree.resizeColumnToContents(HostColumn.NAME)
+        self.ui.tree.doubleClicked.connect(self._on_double_click)
+
+    def _on_double_click(self, index: QModelIndex):
+        name = self.host_model.get_ioc_name(index)
+        if name is not None:
+            self.request_scroll.emit(name)
@@ -0,0 +1,65 @@
+"""
+The dialog_poll_stats module defines the PollStatsDialog's logic.
+
+The PollStatsDialog shows recent timings from the table model's poll loop,
+including the slowest hosts and IOCs, to help explain a stale table.
+
+The PollStatsDialog's layout is defined in ui/poll_stats.ui
+"""
+
+import time
+
+from qtpy.QtCore import QTimer
+from qtpy.QtGui import QHideEvent, QShowEvent
+from qtpy.QtWidgets import QDialog, QWidget
+
+from . import ui_poll_stats
+from .poll_stats import PollStats
+
+
+class PollStatsDialog(QDialog):
+    """
+    Load the pyuic-compiled ui/poll_stats.ui into a QDialog.
+
+    The report is refreshed once per second while the dialog is shown.
+    This is a non-modal dialog so it can be left open next to the table.
+    """
+
+    def __init__(
+        self,
+        poll_stats: PollStats,
+        poll_interval: float,
+        parent: QWidget | None = None,
+    ):
+        super().__init__(parent)
+        self.ui = ui_poll_stats.Ui_Dialog()
+        self.ui.setupUi(self)
+        self.poll_stats = poll_stats
+        self.poll_interval = poll_interval
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.update_report)
+
+    def update_report(self):
+        """Show the latest measurements."""
+        last_sweep = self.poll_stats.last_sweep_time
+        if last_sweep:
+            self.ui.summary_label.setText(
+                f"Last full poll {time.time() - last_sweep:.0f}s ago, "
+                f"polling every {self.poll_interval:.0f}s"
+            )
+        else:
+            self.ui.summary_label.setText("Waiting for the first poll...")
+        scroll_bar = self.ui.report.verticalScrollBar()
+        scroll_pos = scroll_bar.value()
+        self.ui.report.setPlainText(self.poll_stats.format_report())
+        scroll_bar.setValue(scroll_pos)
+
+    def showEvent(self, a0: QShowEvent):
+        self.update_report()
+        self.timer.start()
+        return super().showEvent(a0)
+
+    def hideEvent(self, a0: QHideEvent):
+        self.timer.stop()
+        return super().hideEvent(a0)
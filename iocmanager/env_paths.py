@@ -9,6 +9,7 @@ such as:
 - EPICS_SITE_TOP
 - IOC_COMMON
 - IOC_DATA
+- IOCMANAGER_CACHE_DIR
 - TOOLS_SITE_TOP
 - PROCSERV_EXE
 - PYPS_ROOT
@@ -144,6 +145,24 @@ class EnvPaths:
         """
         return os.getenv("GNOME_TERMINAL_SERVER", "/usr/libexec/gnome-terminal-server")
 
+    @property
+    def CACHE_DIR(self) -> str:
+        """
+        A local, per-user directory for iocmanager's caches.
+
+        This is equivalent to the IOCMANAGER_CACHE_DIR environment variable,
+        which should contain a path.
+
+        This defaults to "iocmanager" inside of $XDG_CACHE_HOME, or inside of
+        ~/.cache if XDG_CACHE_HOME is not set.
+        """
+        try:
+            return os.environ["IOCMANAGER_CACHE_DIR"].removesuffix(os.sep)
+        except KeyError:
+            ...
+        xdg_cache = os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        return os.path.join(xdg_cache, "iocmanager")
+
     # The rest of these are derived from the above environment variables
     # or from each other
     @property
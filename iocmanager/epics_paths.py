@@ -4,13 +4,22 @@ The epics_paths module defines helper functions for paths in the EPICS filetree.
 This is everything under EPICS_SITE_TOP.
 """
 
+import atexit
 import glob
 import itertools
+import json
+import logging
 import os
 import re
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from tempfile import NamedTemporaryFile
 
 from .env_paths import env_paths
 
+logger = logging.getLogger(__name__)
+
 # Hardcoded equivalent paths for ECS at LCLS
 # Not sure how to parameterize this...
 MIRROR_ROOTS = ["/reg/g/pcds", "/cds/group/pcds"]
@@ -119,10 +128,10 @@ def get_stcmd(directory: str, ioc_name: str) -> str:
         directory = os.path.join(env_paths.EPICS_SITE_TOP, directory)
     for pth in stpaths:
         candidate = pth % (directory, ioc_name)
-        if os.path.exists(candidate):
+        if _exists(candidate):
             return candidate
     candidate = os.path.join(directory, "st.cmd")
-    if os.path.exists(candidate):
+    if _exists(candidate):
         return candidate
     raise RuntimeError(f"{ioc_name} in {directory} does not have a st.cmd file.")
 
@@ -145,7 +154,7 @@ spqq = re.compile("^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]+'([^']*)'[ \t]*$")
 shbg = re.compile(r"^#!(.*)/bin/[A-Za-z0-9_]*-x86.*/.*$")
 
 
-def get_parent(directory: str, ioc_name: str) -> str:
+def get_parent(directory: str, ioc_name: str, use_cache: bool = True) -> str:
     """
     Return the parent (common) ioc path for a child ioc.
 
@@ -160,6 +169,9 @@ def get_parent(directory: str, ioc_name: str) -> str:
     If the IOC has no parent, returns an empty string.
     The file could not be read, raises an appropriate OSError.
 
+    By default, results are remembered in the shared ParentRecordCache
+    and only worked out again if one of the files they came from changes.
+
     Parameters
     ----------
     directory : str
@@ -167,6 +179,8 @@ def get_parent(directory: str, ioc_name: str) -> str:
         to EPICS_SITE_TOP. An IOC release may contain multiple IOCs.
     ioc_name : str
         The name of the IOC to find within the IOC release directory.
+    use_cache : bool, optional
+        Set to False to skip the cache and always read the files.
 
     Returns
     -------
@@ -174,38 +188,240 @@ def get_parent(directory: str, ioc_name: str) -> str:
         The possibly truncated path to the parent IOC release,
         or an empty string if one could not be determined.
     """
-    parent = _get_parent(directory=directory, ioc_name=ioc_name)
-    if os.sep in parent:
-        return normalize_path(directory=parent, ioc_name=ioc_name)
-    return parent
+    if use_cache:
+        return get_parent_cache().resolve(directory=directory, ioc_name=ioc_name)
+    return _resolve_parent(directory=directory, ioc_name=ioc_name).parent
 
 
-def _get_parent(directory: str, ioc_name: str) -> str:
-    try:
-        return cfg_parent(directory=directory, ioc_name=ioc_name)
-    except Exception:
-        ...
-    try:
-        return stcmd_parent(directory=directory, ioc_name=ioc_name)
-    except Exception:
-        ...
-    try:
-        return makefile_parent(directory=directory, ioc_name=ioc_name)
-    except Exception:
-        ...
+@dataclass(frozen=True)
+class ParentRecord:
+    """
+    One get_parent result and the files it was worked out from.
+
+    Attributes
+    ----------
+    parent : str
+        The result of get_parent.
+    strategy : str
+        The name of the parent getter that found the parent,
+        or an empty string if none of them did.
+    depends : dict of str to int or None
+        The modification time in ns of every file or directory that
+        was looked at, or None for paths that didn't exist.
+        If any of these change, the parent needs to be found again.
+    """
+
+    parent: str
+    strategy: str
+    depends: dict[str, int | None]
+
+    def is_valid(self) -> bool:
+        """Returns True if none of the files we depend on have changed."""
+        return all(_get_mtime(path) == mtime for path, mtime in self.depends.items())
+
+
+class _DependencyRecorder(threading.local):
+    """The paths checked by the current thread's get_parent call, if any."""
+
+    depends: dict[str, int | None] | None = None
+
+
+_recorder = _DependencyRecorder()
+
+
+def _get_mtime(path: str) -> int | None:
+    """Return the modification time of a path in ns, or None if it is missing."""
     try:
-        return pyioc_parent(directory=directory, ioc_name=ioc_name)
-    except Exception:
-        ...
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _depends_on(path: str) -> int | None:
+    """
+    Note that the current parent depends on path and return its mtime.
+
+    Each path is only checked once per get_parent call, even though
+    most of the parent getters look for the same st.cmd files.
+    """
+    depends = _recorder.depends
+    if depends is None:
+        return _get_mtime(path)
     try:
-        return self_parent(directory=directory)
-    except Exception:
-        ...
+        return depends[path]
+    except KeyError:
+        mtime = depends[path] = _get_mtime(path)
+        return mtime
+
+
+def _exists(path: str) -> bool:
+    """os.path.exists that is remembered as a dependency of the parent."""
+    return _depends_on(path) is not None
+
+
+def _resolve_parent(directory: str, ioc_name: str) -> ParentRecord:
+    """Find the parent without the cache, noting which files were used."""
+    _recorder.depends = {}
     try:
-        return shebang_parent(directory=directory, ioc_name=ioc_name)
-    except Exception:
-        ...
-    return ""
+        strategy, parent = _get_parent(directory=directory, ioc_name=ioc_name)
+        depends = _recorder.depends
+    finally:
+        _recorder.depends = None
+    if os.sep in parent:
+        parent = normalize_path(directory=parent, ioc_name=ioc_name)
+    return ParentRecord(parent=parent, strategy=strategy, depends=depends)
+
+
+def _get_parent(directory: str, ioc_name: str) -> tuple[str, str]:
+    """Try each parent getter in order, returning the strategy and the parent."""
+    for strategy, getter in parent_getters.items():
+        try:
+            return strategy, getter(directory, ioc_name)
+        except Exception:
+            ...
+    return "", ""
+
+
+def default_parent_cache_path() -> str:
+    """Return the default location of the on-disk get_parent cache."""
+    return os.path.join(env_paths.CACHE_DIR, "parents.json")
+
+
+class ParentRecordCache:
+    """
+    Thread-safe, persistent cache of get_parent results.
+
+    Each result is kept with the modification times of the files it was
+    found from, so checking a cached result is only a few stat calls
+    instead of reading and parsing the IOC's files again.
+
+    New results are written to the cache file by save, which is called
+    when the process exits and after any read_config that found new results,
+    so the GUI and the command line tools can all start from each other's
+    results.
+
+    Parameters
+    ----------
+    path : str, optional
+        The cache file. Defaults to parents.json in the iocmanager cache dir.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or default_parent_cache_path()
+        self._lock = threading.Lock()
+        self._records: dict[tuple[str, str, str], ParentRecord] = self._load()
+        self._dirty = False
+        # How many results have been added or replaced, to tell if a batch did any
+        self.changes = 0
+
+    def get(self, directory: str, ioc_name: str) -> str | None:
+        """Return the cached parent if it is still valid, otherwise None."""
+        with self._lock:
+            record = self._records.get(self._key(directory, ioc_name))
+        if record is None or not record.is_valid():
+            return None
+        return record.parent
+
+    def resolve(self, directory: str, ioc_name: str) -> str:
+        """Return the parent, from the cache if it is still valid."""
+        parent = self.get(directory=directory, ioc_name=ioc_name)
+        if parent is not None:
+            return parent
+        record = _resolve_parent(directory=directory, ioc_name=ioc_name)
+        key = self._key(directory, ioc_name)
+        with self._lock:
+            if self._records.get(key) != record:
+                self._records[key] = record
+                self._dirty = True
+                self.changes += 1
+        return record.parent
+
+    def clear(self):
+        """Forget every cached parent. The cache file is not changed."""
+        with self._lock:
+            self._records.clear()
+
+    def save(self):
+        """
+        Write new results to the cache file, if there are any.
+
+        Results that other processes saved in the meantime are kept.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            records = self._load()
+            records.update(self._records)
+            raw = [
+                {
+                    "site_top": site_top,
+                    "directory": directory,
+                    "ioc_name": ioc_name,
+                    "parent": record.parent,
+                    "strategy": record.strategy,
+                    "depends": record.depends,
+                }
+                for (site_top, directory, ioc_name), record in records.items()
+            ]
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with NamedTemporaryFile(
+                    "w", dir=os.path.dirname(self.path), delete_on_close=False
+                ) as fd:
+                    json.dump(raw, fd)
+                    fd.close()
+                    os.replace(fd.name, self.path)
+            except OSError:
+                # The cache is only an optimization
+                logger.warning("Unable to write parent cache %s", self.path)
+                logger.debug("", exc_info=True)
+                return
+            self._dirty = False
+
+    @staticmethod
+    def _key(directory: str, ioc_name: str) -> tuple[str, str, str]:
+        # Relative directories mean something else with another EPICS_SITE_TOP
+        return (env_paths.EPICS_SITE_TOP, directory, ioc_name)
+
+    def _load(self) -> dict[tuple[str, str, str], ParentRecord]:
+        """Read the cache file, ignoring it if it is missing or unreadable."""
+        try:
+            with open(self.path) as fd:
+                raw = json.load(fd)
+            return {
+                (entry["site_top"], entry["directory"], entry["ioc_name"]): (
+                    ParentRecord(
+                        parent=entry["parent"],
+                        strategy=entry["strategy"],
+                        depends=entry["depends"],
+                    )
+                )
+                for entry in raw
+            }
+        except FileNotFoundError:
+            return {}
+        except Exception:
+            logger.warning("Ignoring unreadable parent cache %s", self.path)
+            logger.debug("", exc_info=True)
+            return {}
+
+
+_parent_cache: ParentRecordCache | None = None
+_parent_cache_lock = threading.Lock()
+
+
+def get_parent_cache() -> ParentRecordCache:
+    """
+    Return the ParentRecordCache shared by everything in this process.
+
+    It is created the first time it is needed, and saved when we exit.
+    """
+    global _parent_cache
+    with _parent_cache_lock:
+        if _parent_cache is None:
+            _parent_cache = ParentRecordCache()
+            atexit.register(_parent_cache.save)
+        return _parent_cache
 
 
 def cfg_parent(directory: str, ioc_name: str) -> str:
@@ -264,7 +480,7 @@ def stcmd_parent(directory: str, ioc_name: str) -> str:
         else:
             # Relative path: relative to this file location?
             candidate = os.path.abspath(os.path.join(os.path.dirname(stcmd), path))
-        if os.path.exists(candidate):
+        if _exists(candidate):
             return candidate
         else:
             raise RuntimeError(f"Invalid parent path {candidate}")
@@ -278,6 +494,7 @@ def makefile_parent(directory: str, ioc_name: str) -> str:
     """
     stcmd = get_stcmd(directory=directory, ioc_name=ioc_name)
     makefile = os.path.join(os.path.dirname(stcmd), "Makefile")
+    _depends_on(makefile)
     with open(makefile, "r") as fd:
         lines = fd.readlines()
     for line in lines:
@@ -330,22 +547,30 @@ def pyioc_parent(directory: str, ioc_name: str) -> str:
             break
     for check_dir in (directory, os.path.dirname(stcmd)):
         # Check for a conda_env in the same dir
-        if os.path.exists(os.path.join(check_dir, "conda_env")):
+        if _exists(os.path.join(check_dir, "conda_env")):
             env_kind = "conda"
             env_version = "local"
             break
         # Check for a venv in the same dir
-        elif os.path.exists(os.path.join(check_dir, ".venv")):
+        elif _exists(os.path.join(check_dir, ".venv")):
             env_kind = "venv"
             env_version = "local"
             break
     # Check the python files in the same repo for some keywords
     python_ioc_frameworks = ("caproto", "pyioc", "pcaspy")
+    # Catches python files being added or removed in any directory we glob
+    _depends_on(os.path.dirname(stcmd))
+    for subdir in itertools.chain(
+        glob.glob(os.path.join(os.path.dirname(stcmd), "*/")),
+        glob.glob(os.path.join(os.path.dirname(stcmd), "*/*/")),
+    ):
+        _depends_on(subdir)
     for filepath in itertools.chain(
         glob.glob(os.path.join(os.path.dirname(stcmd), "*.py")),
         glob.glob(os.path.join(os.path.dirname(stcmd), "**/*.py")),
         glob.glob(os.path.join(os.path.dirname(stcmd), "**/**/*.py")),
     ):
+        _depends_on(filepath)
         with open(filepath, "r") as fd:
             lines = fd.readlines()
         for package in python_ioc_frameworks:
@@ -363,7 +588,7 @@ def self_parent(directory: str) -> str:
     """
     if not os.path.isabs(directory):
         directory = os.path.join(env_paths.EPICS_SITE_TOP, directory)
-    if os.path.exists(os.path.join(directory, "bin")):
+    if _exists(os.path.join(directory, "bin")):
         return directory
     raise RuntimeError(f"{directory} definitely not self parented")
 
@@ -380,6 +605,17 @@ def shebang_parent(directory: str, ioc_name: str) -> str:
     raise RuntimeError("No shebang found!")
 
 
+# The parent getters, in the order get_parent tries them
+parent_getters: dict[str, Callable[[str, str], str]] = {
+    "cfg": cfg_parent,
+    "stcmd": stcmd_parent,
+    "makefile": makefile_parent,
+    "pyioc": pyioc_parent,
+    "self": lambda directory, ioc_name: self_parent(directory=directory),
+    "shebang": shebang_parent,
+}
+
+
 def epics_readlines(filename: str) -> list[str]:
     """
     Thin wrapper around readlines.
@@ -403,6 +639,7 @@ def epics_readlines(filename: str) -> list[str]:
     """
     if not os.path.isabs(filename):
         filename = os.path.join(env_paths.EPICS_SITE_TOP, filename)
+    _depends_on(filename)
     with open(filename, "r") as fd:
         return fd.readlines()
 
@@ -0,0 +1,450 @@
+"""
+The file_watcher module lets us react to changes in the files we poll.
+
+The GUI needs to know when any of the following change:
+
+- The hutch's iocmanager.cfg file
+- The hutch's status directory, which is written to on IOC boot
+- The host directory, which contains one file per host with OS info
+
+Rather than re-reading all of these on every poll, we watch them.
+
+On Linux, inotify is used when it is available, which gives us change events
+immediately and without touching the disk.
+inotify does not see changes made by other hosts on network filesystems
+such as NFS, so for paths on those filesystems (and on systems without inotify)
+we fall back to checking metadata. This is kept to one stat per path because
+every metadata request is a round trip to the file server.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import stat
+import struct
+import threading
+import time
+from collections.abc import Iterable
+
+logger = logging.getLogger(__name__)
+
+# Filesystem types where inotify will miss changes from other hosts
+NETWORK_FS_TYPES = frozenset(
+    (
+        "nfs",
+        "nfs4",
+        "cifs",
+        "smbfs",
+        "smb3",
+        "afs",
+        "lustre",
+        "gpfs",
+        "ceph",
+        "fuse.sshfs",
+        "9p",
+    )
+)
+
+# Subset of inotify flags from sys/inotify.h
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+
+_event_header = struct.Struct("iIII")
+
+
+def _load_inotify() -> ctypes.CDLL | None:
+    """Returns the libc handle if it supports inotify, or None."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1") or not hasattr(libc, "inotify_add_watch"):
+            return None
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+_libc = _load_inotify()
+
+
+def inotify_available() -> bool:
+    """Returns True if this system supports inotify."""
+    return _libc is not None
+
+
+def get_fs_type(path: str) -> str:
+    """
+    Return the filesystem type that path is located on, e.g. "ext4" or "nfs".
+
+    This is determined from the longest matching mount point in /proc/mounts.
+    Returns an empty string if this cannot be determined.
+    """
+    try:
+        with open("/proc/mounts", "r") as fd:
+            lines = fd.readlines()
+    except OSError:
+        return ""
+    real_path = os.path.realpath(path)
+    best_mount = ""
+    best_type = ""
+    for line in lines:
+        try:
+            _, mount_point, fs_type = line.split()[:3]
+        except ValueError:
+            continue
+        # Spaces etc. are octal-escaped in /proc/mounts
+        mount_point = mount_point.encode().decode("unicode_escape")
+        if real_path == mount_point or real_path.startswith(
+            mount_point.rstrip("/") + "/"
+        ):
+            if len(mount_point) >= len(best_mount):
+                best_mount = mount_point
+                best_type = fs_type
+    return best_type
+
+
+def is_network_fs(path: str) -> bool:
+    """Returns True if path is on a network filesystem such as NFS."""
+    return get_fs_type(path) in NETWORK_FS_TYPES
+
+
+def _path_signature(path: str) -> tuple[int, int, int, bool] | None:
+    """
+    Summarize a path's metadata so we can tell if it changed.
+
+    This is the inode, size, mtime, and whether the path is a directory,
+    all from a single stat.
+    A directory's mtime changes when files are added, removed, or renamed,
+    but not when a file in it is rewritten in place.
+
+    Returns None if the path does not exist.
+    """
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return (info.st_ino, info.st_size, info.st_mtime_ns, stat.S_ISDIR(info.st_mode))
+
+
+class FileWatcher:
+    """
+    Watch a set of files and directories and report which of them changed.
+
+    Paths on local filesystems are watched using inotify if available.
+    Paths on network filesystems, paths that do not exist yet,
+    and all paths on systems without inotify are checked by comparing
+    metadata (see _path_signature) instead.
+
+    For these paths, wait only sees files being added to or removed from
+    a directory, not files being rewritten in place. changed, which is meant
+    to be called once per full poll, always reports these directories so that
+    the caller re-reads them. Our directory readers only open the files
+    whose metadata changed, so this is one directory scan per poll.
+
+    Files are watched via their parent directory so that we still see
+    changes when a file is replaced by a rename, as in write_config.
+
+    Every path counts as changed the first time it is checked,
+    so that the caller reads everything once at startup.
+
+    Parameters
+    ----------
+    paths : iterable of str, optional
+        The files and directories to watch.
+    use_inotify : bool, optional
+        Set to False to always use metadata comparisons.
+    scan_interval : float, optional
+        The minimum time in seconds between metadata comparisons while waiting.
+        This limits the load we put on network filesystems.
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str] = (),
+        use_inotify: bool = True,
+        scan_interval: float = 2.0,
+    ):
+        self._lock = threading.RLock()
+        self.scan_interval = scan_interval
+        self._last_scan = 0.0
+        # Self-pipe so that interrupt can wake up a wait from another thread
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._fd: int | None = None
+        if use_inotify and _libc is not None:
+            fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                logger.debug(
+                    "inotify_init1 failed: %s", os.strerror(ctypes.get_errno())
+                )
+            else:
+                self._fd = fd
+        # watch descriptor -> watched directory
+        self._wd_to_dir: dict[int, str] = {}
+        # watched directory -> watch descriptor
+        self._dir_to_wd: dict[str, int] = {}
+        # watched directory -> {(user path, file name or None for the dir itself)}
+        self._dir_targets: dict[str, set[tuple[str, str | None]]] = {}
+        # user path -> last signature, for paths we need to check by hand
+        self._polled: dict[str, tuple | None] = {}
+        self._paths: set[str] = set()
+        self._changed: set[str] = set()
+        for path in paths:
+            self.add_path(path)
+
+    @property
+    def paths(self) -> set[str]:
+        """All of the paths that are being watched."""
+        return set(self._paths)
+
+    @property
+    def polled_paths(self) -> set[str]:
+        """The paths that are being checked via metadata rather than inotify."""
+        return set(self._polled)
+
+    def add_path(self, path: str) -> None:
+        """
+        Start watching a file or directory.
+
+        Empty paths are ignored.
+        """
+        if not path:
+            return
+        with self._lock:
+            if path in self._paths:
+                return
+            self._paths.add(path)
+            self._changed.add(path)
+            if not self._add_inotify(path):
+                self._polled[path] = _path_signature(path)
+
+    def _add_inotify(self, path: str) -> bool:
+        """Try to watch path using inotify, returning True if successful."""
+        if self._fd is None or not os.path.exists(path):
+            return False
+        if is_network_fs(path):
+            logger.debug("%s is on a network filesystem, using mtime checks", path)
+            return False
+        if os.path.isdir(path):
+            directory = path
+            target = None
+        else:
+            directory, target = os.path.split(os.path.abspath(path))
+        if directory not in self._dir_to_wd:
+            wd = _libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                logger.debug(
+                    "inotify_add_watch failed for %s: %s",
+                    directory,
+                    os.strerror(ctypes.get_errno()),
+                )
+                return False
+            self._dir_to_wd[directory] = wd
+            self._wd_to_dir[wd] = directory
+            self._dir_targets[directory] = set()
+        self._dir_targets[directory].add((path, target))
+        return True
+
+    def _fall_back(self, directory: str) -> None:
+        """Switch paths that used a removed inotify watch to metadata checks."""
+        wd = self._dir_to_wd.pop(directory, None)
+        if wd is not None:
+            self._wd_to_dir.pop(wd, None)
+        for path, _ in self._dir_targets.pop(directory, set()):
+            self._changed.add(path)
+            self._polled[path] = _path_signature(path)
+
+    def mark_changed(self, path: str | None = None) -> None:
+        """
+        Report path as changed on the next check, even if it didn't change.
+
+        If path is None, all paths are marked as changed.
+        """
+        with self._lock:
+            if path is None:
+                self._changed.update(self._paths)
+            elif path in self._paths:
+                self._changed.add(path)
+
+    def _read_events(self) -> None:
+        """Process all pending inotify events without blocking."""
+        if self._fd is None:
+            return
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return
+            except OSError:
+                logger.debug("Error reading inotify events", exc_info=True)
+                return
+            if not data:
+                return
+            offset = 0
+            while offset + _event_header.size <= len(data):
+                wd, mask, _, name_len = _event_header.unpack_from(data, offset)
+                offset += _event_header.size
+                name = os.fsdecode(data[offset : offset + name_len].rstrip(b"\0"))
+                offset += name_len
+                self._handle_event(wd=wd, mask=mask, name=name)
+
+    def _handle_event(self, wd: int, mask: int, name: str) -> None:
+        """Mark the paths associated with one inotify event as changed."""
+        if mask & IN_Q_OVERFLOW:
+            # We lost events, assume the worst
+            self._changed.update(self._paths)
+            return
+        try:
+            directory = self._wd_to_dir[wd]
+        except KeyError:
+            return
+        if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+            # Our directory is gone, inotify can't help us anymore
+            self._fall_back(directory)
+            return
+        for path, target in self._dir_targets.get(directory, ()):
+            if target is None or target == name:
+                self._changed.add(path)
+
+    def _check_polled(self, full: bool) -> None:
+        """
+        Compare the metadata for paths we can't use inotify for.
+
+        If full, directories are reported as changed regardless,
+        in case a file in them was rewritten in place.
+        """
+        for path, old_signature in list(self._polled.items()):
+            new_signature = _path_signature(path)
+            if full and new_signature is not None and new_signature[3]:
+                self._changed.add(path)
+            if new_signature != old_signature:
+                self._polled[path] = new_signature
+                self._changed.add(path)
+                # Maybe it just got created and we can use inotify now
+                if old_signature is None and self._add_inotify(path):
+                    del self._polled[path]
+
+    def wait(self, timeout: float) -> set[str]:
+        """
+        Wait up to timeout seconds for a change, and return the changed paths.
+
+        Returns early as soon as a change is seen or when interrupt
+        is called from another thread.
+        Paths that rely on metadata checks are checked while waiting,
+        at most once per scan_interval.
+
+        Parameters
+        ----------
+        timeout : float
+            The maximum time to wait in seconds.
+
+        Returns
+        -------
+        changed : set of str
+            The watched paths that changed since the last call.
+        """
+        return self._wait(timeout=timeout, force_scan=False)
+
+    def changed(self) -> set[str]:
+        """
+        Return the watched paths that changed since the last call.
+
+        This does not wait, and always includes a metadata check.
+        Directories that don't use inotify are always included,
+        see the class docstring.
+        """
+        return self._wait(timeout=0, force_scan=True)
+
+    def _wait(self, timeout: float, force_scan: bool) -> set[str]:
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if self._changed:
+                    deadline = now
+                fds = [self._wake_r]
+                if self._fd is not None:
+                    fds.append(self._fd)
+                # Wake up for the next metadata check, if we have any to do
+                next_scan = deadline
+                if self._polled:
+                    next_scan = min(deadline, self._last_scan + self.scan_interval)
+            if next_scan > now:
+                try:
+                    select.select(fds, [], [], next_scan - now)
+                except (OSError, ValueError):
+                    logger.debug("Error waiting for inotify events", exc_info=True)
+            with self._lock:
+                interrupted = False
+                try:
+                    while os.read(self._wake_r, 512):
+                        interrupted = True
+                except OSError:
+                    ...
+                self._read_events()
+                now = time.monotonic()
+                if force_scan or now - self._last_scan >= self.scan_interval:
+                    self._last_scan = now
+                    self._check_polled(full=force_scan)
+                if self._changed or interrupted or now >= deadline:
+                    changed = self._changed
+                    self._changed = set()
+                    return changed
+
+    def interrupt(self) -> None:
+        """Wake up a thread that is waiting in wait, e.g. to shut down."""
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            ...
+
+    def close(self) -> None:
+        """Release the file descriptors used for watching."""
+        with self._lock:
+            if self._fd is not None:
+                try:
+                    os.close(self._fd)
+                except OSError:
+                    ...
+                self._fd = None
+            for directory in list(self._dir_to_wd):
+                self._fall_back(directory)
+            for fd in (self._wake_r, self._wake_w):
+                try:
+                    os.close(fd)
+                except OSError:
+                    ...
+            self._wake_r = self._wake_w = -1
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            ...
@@ -6,7 +6,9 @@ Some imports here are deferred to speed up low-op actions like --help
 
 import argparse
 import logging
+import threading
 import time
+from collections.abc import Callable
 from importlib import import_module
 from importlib.util import find_spec
 
@@ -15,6 +17,9 @@ from .version import version as version_str
 
 logger = logging.getLogger(__name__)
 
+# How long to wait for the first poll when collecting startup timings
+FIRST_POLL_TIMEOUT = 10.0
+
 
 def get_parser():
     parser = argparse.ArgumentParser(
@@ -28,7 +33,13 @@ def get_parser():
     add_verbose_arg(parser)
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument(
-        "hutch", nargs="?", help="The area whose IOCs you'd like to manage."
+        "hutch",
+        nargs="*",
+        default=[],
+        help=(
+            "The area whose IOCs you'd like to manage. "
+            "Pass more than one to show each in its own tab."
+        ),
     )
     group.add_argument(
         "--version", action="store_true", help="Show the version information and exit."
@@ -48,10 +59,23 @@ def get_parser():
     return parser
 
 
-def main(argv: list[str] | None = None) -> int:
+def main(argv: list[str] | None = None, timings: dict[str, float] | None = None) -> int:
+    """
+    Run the iocmanager gui.
+
+    Parameters
+    ----------
+    argv : list of str, optional
+        The command-line arguments, defaults to sys.argv.
+    timings : dict, optional
+        If provided, this is filled with the time in seconds spent in each
+        startup phase, and the gui closes after its first paint instead of
+        running until the user quits. This is used for benchmarking.
+    """
     parser = get_parser()
     args = parser.parse_args(argv)
-    if args.profile:
+    # Only an option if line_profiler is installed
+    if getattr(args, "profile", False):
         print("Setting up profiler...")
         start = time.monotonic()
         # Late import: optional dep
@@ -73,24 +97,93 @@ def main(argv: list[str] | None = None) -> int:
         profiler.enable_by_count()
     else:
         profiler = None
-    rval = _main(args)
+    rval = _main(args, timings=timings)
     if profiler is not None:
         profiler.disable_by_count()
         profiler.print_stats(stripzeros=True, sort=True)
     return rval
 
 
-def _main(args) -> int:
+def _main(args, timings: dict[str, float] | None = None) -> int:
     if args.version:
         print(version_str)
         return 0
     iocmanager_log_config(args)
+    last_time = time.monotonic()
+
+    def finish_phase(phase: str):
+        nonlocal last_time
+        if timings is not None:
+            now = time.monotonic()
+            timings[phase] = now - last_time
+            last_time = now
+
+    # Same order as given, but each hutch only once
+    hutches = list(dict.fromkeys(hutch.lower() for hutch in args.hutch))
+    # Read the configs while we import qt and pydm, which takes a while
+    config_thread = threading.Thread(
+        target=_prefetch_config, args=(hutches,), daemon=True
+    )
+    config_thread.start()
     # Late imports: speed up --help, etc.
     from qtpy.QtWidgets import QApplication
 
     from .main_window import IOCMainWindow
+    from .multi_window import IOCMultiWindow
 
-    app = QApplication([""])
-    gui = IOCMainWindow(hutch=args.hutch.lower(), verbose=args.verbose)
+    finish_phase("imports")
+    app = QApplication.instance() or QApplication([""])
+    finish_phase("qapplication")
+    config_thread.join()
+    finish_phase("read_config")
+    if len(hutches) == 1:
+        gui = IOCMainWindow(hutch=hutches[0], verbose=args.verbose)
+        windows = [gui]
+    else:
+        gui = IOCMultiWindow(hutches=hutches, verbose=args.verbose)
+        windows = gui.windows
+    finish_phase("window_init")
     gui.show()
-    return app.exec_()
+    finish_phase("show")
+    if timings is None:
+        return app.exec_()
+    return _finish_timings(app=app, gui=gui, windows=windows, finish_phase=finish_phase)
+
+
+def _prefetch_config(hutches: list[str]):
+    """
+    Read the config files so that they're cached before the gui needs them.
+
+    Errors are ignored here so that the gui can report them normally.
+    """
+    from .config import read_config
+
+    for hutch in hutches:
+        try:
+            read_config(hutch)
+        except Exception:
+            logger.debug("Could not prefetch config for %s", hutch, exc_info=True)
+
+
+def _finish_timings(app, gui, windows, finish_phase: Callable[[str], None]) -> int:
+    """
+    Benchmark mode: time the first paint and first poll, then close the gui.
+
+    With multiple hutches, this waits for every hutch's first poll.
+    """
+    from qtpy.QtTest import QTest
+
+    QTest.qWaitForWindowExposed(gui)
+    app.processEvents()
+    finish_phase("first_paint")
+    # Zero if the first poll was already done by the time the window painted
+    for window in windows:
+        window.model.first_poll_done.wait(timeout=FIRST_POLL_TIMEOUT)
+    app.processEvents()
+    finish_phase("first_poll")
+    for window in windows:
+        window.pydm_ready.wait(timeout=FIRST_POLL_TIMEOUT)
+    finish_phase("pydm_ready")
+    gui.close()
+    app.processEvents()
+    return 0
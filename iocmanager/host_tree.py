@@ -0,0 +1,482 @@
+"""
+The host_tree module defines a host-grouped tree model for the GUI.
+
+This implements a QAbstractItemModel that sits on top of the IOCTableModel
+and shows the same IOCs grouped by host, with one summary row per host:
+how many IOCs it has, how many are in each status, how many are desynced,
+and which OS it runs.
+
+The summaries are not recomputed when the tree is painted. Instead, each
+IOC's contribution to its host's summary is remembered, and when the table
+model tells us that an IOC changed we subtract the old contribution
+and add the new one. The same per-host index of IOC names is used by the
+main window to find every IOC on a server.
+
+See https://doc.qt.io/qt-5/qabstractitemmodel.html#details
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any
+
+from qtpy.QtCore import QAbstractItemModel, QModelIndex, QObject, Qt, QVariant
+from qtpy.QtGui import QBrush
+
+from .table_model import IOCTableModel, TableColumn
+
+logger = logging.getLogger(__name__)
+
+
+class HostColumn(IntEnum):
+    """
+    Options and indices for tree columns
+    """
+
+    NAME = 0
+    IOCS = 1
+    STATUS = 2
+    DESYNC = 3
+    OSVER = 4
+
+
+# Map HostColumn to the desired tree header
+host_headers = {
+    HostColumn.NAME: "Host / IOC",
+    HostColumn.IOCS: "IOCs",
+    HostColumn.STATUS: "Status",
+    HostColumn.DESYNC: "Desync",
+    HostColumn.OSVER: "OS",
+}
+
+# The internal id for host rows. IOC rows use their host's id.
+HOST_ROW_ID = 0
+
+
+@dataclass(frozen=True)
+class HostEntry:
+    """
+    One IOC's row in the tree, and its contribution to its host's summary.
+
+    Attributes
+    ----------
+    host : str
+        The host the IOC is configured on, or running on if not in the config.
+    label : str
+        The name to show, which is the alias if there is one.
+    status : str
+        The live status, e.g. RUNNING
+    desync : str
+        The summary of the differences between the config and the live IOC,
+        or an empty string if there are none that count as a desync.
+    """
+
+    host: str
+    label: str
+    status: str
+    desync: str
+
+
+@dataclass
+class HostSummary:
+    """
+    The aggregate values for one host's summary row.
+
+    Attributes
+    ----------
+    host : str
+        The name of the host.
+    id : int
+        The internal id used in the QModelIndex of this host's IOC rows.
+    names : list[str]
+        The names of the IOCs on this host, sorted.
+    status_counts : Counter[str]
+        The number of IOCs in each status.
+    desync_count : int
+        The number of IOCs that don't match their config.
+    """
+
+    host: str
+    id: int
+    names: list[str] = field(default_factory=list)
+    status_counts: Counter[str] = field(default_factory=Counter)
+    desync_count: int = 0
+
+    def add(self, entry: HostEntry):
+        self.status_counts[entry.status] += 1
+        if entry.desync:
+            self.desync_count += 1
+
+    def remove(self, entry: HostEntry):
+        self.status_counts[entry.status] -= 1
+        if not self.status_counts[entry.status]:
+            del self.status_counts[entry.status]
+        if entry.desync:
+            self.desync_count -= 1
+
+    def status_text(self) -> str:
+        """e.g. "RUNNING: 5, NOCONNECT: 1", most common first."""
+        return ", ".join(
+            f"{status}: {count}" for status, count in self.status_counts.most_common()
+        )
+
+
+class HostTreeModel(QAbstractItemModel):
+    """
+    A two-level tree of the IOCTableModel's IOCs: hosts, then their IOCs.
+
+    Hosts and IOCs are both sorted by name. The tree follows the table
+    model's signals, so it only does work for the IOCs that changed.
+    Deleted and untracked IOCs are included because they are in the table.
+
+    Parameters
+    ----------
+    model : IOCTableModel
+        The table to group by host.
+    parent : QObject, optional
+        The parent object.
+    """
+
+    def __init__(self, model: IOCTableModel, parent: QObject | None = None):
+        super().__init__(parent)
+        self.table_model = model
+        self._entries: dict[str, HostEntry] = {}
+        self._hosts: list[str] = []
+        self._summaries: dict[str, HostSummary] = {}
+        self._ids: dict[int, HostSummary] = {}
+        self._next_id = HOST_ROW_ID + 1
+        # IOCs in rows being removed that also have another row
+        self._removing: list[str] = []
+        model.dataChanged.connect(self._source_data_changed)
+        model.rowsInserted.connect(self._source_rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self._source_rows_about_to_be_removed)
+        model.rowsRemoved.connect(self._source_rows_removed)
+        model.modelReset.connect(self._source_reset)
+        self._source_reset()
+
+    # Host index, for the gui
+    def get_hosts(self) -> list[str]:
+        """All of the hosts that have IOCs in the table, sorted."""
+        return list(self._hosts)
+
+    def get_host_iocs(self, host: str) -> list[str]:
+        """The names of the IOCs in the table that are on host, sorted."""
+        try:
+            return list(self._summaries[host].names)
+        except KeyError:
+            return []
+
+    def get_host_summary(self, host: str) -> HostSummary:
+        """The summary row values for one host."""
+        return self._summaries[host]
+
+    def get_ioc_name(self, index: QModelIndex) -> str | None:
+        """The name of the IOC at index, or None for host rows."""
+        if not index.isValid() or index.internalId() == HOST_ROW_ID:
+            return None
+        return self._ids[index.internalId()].names[index.row()]
+
+    # Implement QAbstractItemModel API
+    def index(
+        self, row: int, column: int, parent: QModelIndex | None = None
+    ) -> QModelIndex:
+        """
+        Returns the index of the item at row and column under parent.
+
+        https://doc.qt.io/archives/qt-5.15/qabstractitemmodel.html#index
+        """
+        if parent is None or not parent.isValid():
+            if 0 <= row < len(self._hosts):
+                return self.createIndex(row, column, HOST_ROW_ID)
+            return QModelIndex()
+        if parent.internalId() != HOST_ROW_ID:
+            # IOCs have no children
+            return QModelIndex()
+        summary = self._summaries[self._hosts[parent.row()]]
+        if 0 <= row < len(summary.names):
+            return self.createIndex(row, column, summary.id)
+        return QModelIndex()
+
+    def parent(self, index: QModelIndex | None = None) -> Any:
+        """
+        Returns the host row for IOC rows, or an invalid index for host rows.
+
+        With no index, this is QObject.parent instead.
+
+        https://doc.qt.io/archives/qt-5.15/qabstractitemmodel.html#parent
+        """
+        if index is None:
+            return super().parent()
+        if not index.isValid() or index.internalId() == HOST_ROW_ID:
+            return QModelIndex()
+        summary = self._ids[index.internalId()]
+        return self.createIndex(self._host_row(summary.host), 0, HOST_ROW_ID)
+
+    def rowCount(self, parent: QModelIndex | None = None) -> int:
+        """
+        Returns the number of hosts, or the number of IOCs on a host.
+
+        https://doc.qt.io/archives/qt-5.15/qabstractitemmodel.html#rowCount
+        """
+        if parent is None or not parent.isValid():
+            return len(self._hosts)
+        if parent.internalId() != HOST_ROW_ID or parent.column() != 0:
+            return 0
+        return len(self._summaries[self._hosts[parent.row()]].names)
+
+    def columnCount(self, parent: QModelIndex | None = None) -> int:
+        """
+        Returns the number of columns, which is the same at every level.
+
+        https://doc.qt.io/archives/qt-5.15/qabstractitemmodel.html#columnCount
+        """
+        return len(HostColumn)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        """
+        Returns the summary values for host rows and the IOC values for IOC rows.
+
+        https://doc.qt.io/archives/qt-5.15/qabstractitemmodel.html#data
+        """
+        if not index.isValid():
+            return QVariant()
+        column = index.column()
+        if index.internalId() == HOST_ROW_ID:
+            summary = self._summaries[self._hosts[index.row()]]
+            match role:
+                case Qt.DisplayRole:
+                    return self._host_display(summary=summary, column=column)
+                case Qt.ForegroundRole if summary.desync_count:
+                    return QBrush(Qt.red)
+                case _:
+                    return QVariant()
+        entry = self._entries[self._ids[index.internalId()].names[index.row()]]
+        match (role, column):
+            case (Qt.DisplayRole, HostColumn.NAME):
+                return entry.label
+            case (Qt.DisplayRole, HostColumn.STATUS):
+                return entry.status
+            case (Qt.DisplayRole, HostColumn.DESYNC):
+                return entry.desync
+            case _:
+                return QVariant()
+
+    def _host_display(self, summary: HostSummary, column: int) -> str | int:
+        match column:
+            case HostColumn.NAME:
+                return summary.host
+            case HostColumn.IOCS:
+                return len(summary.names)
+            case HostColumn.STATUS:
+                return summary.status_text()
+            case HostColumn.DESYNC:
+                return summary.desync_count
+            case HostColumn.OSVER:
+                return self.table_model.host_os.get(summary.host, "")
+            case _:
+                raise ValueError(f"Invalid column {column}")
+
+    def headerData(
+        self,
+        section: int,
+        orientation: Qt.Orientation,
+        role: int = Qt.DisplayRole,
+    ) -> Any:
+        """
+        Returns the header labels.
+
+        https://doc.qt.io/archives/qt-5.15/qabstractitemmodel.html#headerData
+        """
+        if role != Qt.DisplayRole or orientation != Qt.Horizontal:
+            return QVariant()
+        try:
+            return host_headers[HostColumn(section)]
+        except ValueError:
+            return QVariant()
+
+    # Follow the table model
+    def _source_data_changed(
+        self, top_left: QModelIndex, bottom_right: QModelIndex, *args
+    ):
+        """Update the IOCs in a dataChanged range."""
+        if top_left.column() <= TableColumn.OSVER <= bottom_right.column():
+            # The OS is not part of the summary, so just repaint it
+            self._host_os_changed()
+        row_map = self.table_model.get_ioc_row_map()
+        for name in row_map[max(top_left.row(), 0) : bottom_right.row() + 1]:
+            self._update_ioc(name=name)
+
+    def _source_rows_inserted(self, parent: QModelIndex, first: int, last: int):
+        """Add the IOCs in new table rows."""
+        row_map = self.table_model.get_ioc_row_map()
+        for name in row_map[first : last + 1]:
+            self._update_ioc(name=name)
+
+    def _source_rows_about_to_be_removed(
+        self, parent: QModelIndex, first: int, last: int
+    ):
+        """
+        Drop the IOCs in table rows that are about to go away.
+
+        An IOC can briefly have two rows, e.g. a live-only IOC that was just
+        added to the config. If it has a row outside of the range, it is
+        updated from that row once the removal is done instead.
+        """
+        row_map = self.table_model.get_ioc_row_map()
+        others = {*row_map[:first], *row_map[last + 1 :]}
+        for name in row_map[first : last + 1]:
+            if name in others:
+                self._removing.append(name)
+            else:
+                self._remove_ioc(name=name)
+
+    def _source_rows_removed(self, parent: QModelIndex, first: int, last: int):
+        """Update the IOCs that still have a row after a removal."""
+        removing = self._removing
+        self._removing = []
+        for name in removing:
+            self._update_ioc(name=name)
+
+    def _source_reset(self):
+        """Rebuild the whole tree, e.g. at startup."""
+        self.beginResetModel()
+        self._entries.clear()
+        self._hosts.clear()
+        self._summaries.clear()
+        self._ids.clear()
+        for name in self.table_model.get_ioc_row_map():
+            entry = self._compute_entry(name=name)
+            if entry is None:
+                continue
+            self._entries[name] = entry
+            summary = self._summaries.get(entry.host)
+            if summary is None:
+                summary = self._new_summary(host=entry.host)
+                self._hosts.append(entry.host)
+            summary.names.append(name)
+            summary.add(entry)
+        self._hosts.sort()
+        for summary in self._summaries.values():
+            summary.names.sort()
+        self.endResetModel()
+
+    def _host_os_changed(self):
+        if self._hosts:
+            self.dataChanged.emit(
+                self.index(0, HostColumn.OSVER),
+                self.index(len(self._hosts) - 1, HostColumn.OSVER),
+            )
+
+    def _compute_entry(self, name: str) -> HostEntry | None:
+        """Get one IOC's tree values from the table model, or None if it's gone."""
+        try:
+            row = self.table_model.get_ioc_row(ioc=name)
+        except ValueError:
+            return None
+        row_view = self.table_model.get_row_view(ioc=row)
+        display = row_view.display
+        extra = display[TableColumn.EXTRA]
+        return HostEntry(
+            host=str(display[TableColumn.HOST] or ""),
+            label=str(display[TableColumn.IOCNAME] or name),
+            status=str(display[TableColumn.STATUS] or ""),
+            # Same as the "desync" filter in the table
+            desync=str(extra) if extra and not row_view.info.ioc_proc.hard else "",
+        )
+
+    def _update_ioc(self, name: str):
+        """
+        Move one IOC's contribution to match the table.
+
+        If it stays on the same host, only its row and its host's row change.
+        Otherwise, it is removed from the old host and added to the new one.
+        """
+        new_entry = self._compute_entry(name=name)
+        old_entry = self._entries.get(name)
+        if new_entry == old_entry:
+            return
+        if new_entry is None:
+            self._remove_ioc(name=name)
+            return
+        if old_entry is None or old_entry.host != new_entry.host:
+            self._remove_ioc(name=name)
+            self._add_ioc(name=name, entry=new_entry)
+            return
+        summary = self._summaries[new_entry.host]
+        summary.remove(old_entry)
+        summary.add(new_entry)
+        self._entries[name] = new_entry
+        host_row = self._host_row(summary.host)
+        self.dataChanged.emit(
+            self.index(host_row, HostColumn.STATUS),
+            self.index(host_row, HostColumn.DESYNC),
+        )
+        host_index = self.index(host_row, 0)
+        ioc_row = bisect.bisect_left(summary.names, name)
+        self.dataChanged.emit(
+            self.index(ioc_row, 0, host_index),
+            self.index(ioc_row, len(HostColumn) - 1, host_index),
+        )
+
+    def _add_ioc(self, name: str, entry: HostEntry):
+        summary = self._summaries.get(entry.host)
+        if summary is None:
+            host_row = bisect.bisect_left(self._hosts, entry.host)
+            self.beginInsertRows(QModelIndex(), host_row, host_row)
+            self._hosts.insert(host_row, entry.host)
+            summary = self._new_summary(host=entry.host)
+            self.endInsertRows()
+        else:
+            host_row = self._host_row(entry.host)
+        host_index = self.index(host_row, 0)
+        ioc_row = bisect.bisect_left(summary.names, name)
+        self.beginInsertRows(host_index, ioc_row, ioc_row)
+        summary.names.insert(ioc_row, name)
+        summary.add(entry)
+        self._entries[name] = entry
+        self.endInsertRows()
+        self.dataChanged.emit(
+            self.index(host_row, HostColumn.IOCS),
+            self.index(host_row, HostColumn.DESYNC),
+        )
+
+    def _remove_ioc(self, name: str):
+        try:
+            entry = self._entries[name]
+        except KeyError:
+            return
+        summary = self._summaries[entry.host]
+        host_row = self._host_row(entry.host)
+        if len(summary.names) == 1:
+            # Last IOC on the host, remove the whole host
+            self.beginRemoveRows(QModelIndex(), host_row, host_row)
+            del self._entries[name]
+            del self._hosts[host_row]
+            del self._summaries[entry.host]
+            del self._ids[summary.id]
+            self.endRemoveRows()
+            return
+        ioc_row = bisect.bisect_left(summary.names, name)
+        self.beginRemoveRows(self.index(host_row, 0), ioc_row, ioc_row)
+        del self._entries[name]
+        del summary.names[ioc_row]
+        summary.remove(entry)
+        self.endRemoveRows()
+        self.dataChanged.emit(
+            self.index(host_row, HostColumn.IOCS),
+            self.index(host_row, HostColumn.DESYNC),
+        )
+
+    def _new_summary(self, host: str) -> HostSummary:
+        summary = HostSummary(host=host, id=self._next_id)
+        self._next_id += 1
+        self._summaries[host] = summary
+        self._ids[summary.id] = summary
+        return summary
+
+    def _host_row(self, host: str) -> int:
+        return bisect.bisect_left(self._hosts, host)
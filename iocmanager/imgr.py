@@ -9,7 +9,8 @@ import argparse
 import logging
 import socket
 import subprocess
-from dataclasses import dataclass
+from copy import copy
+from dataclasses import dataclass, fields
 from getpass import getuser
 
 from epics import caput
@@ -17,6 +18,7 @@ from epics import caput
 from . import procserv_tools as pt
 from .config import (
     Config,
+    ConfigConflictError,
     IOCProc,
     check_auth,
     check_special,
@@ -337,18 +339,101 @@ def reboot_cmd(config: Config, ioc_name: str, reboot_mode: str):
             raise ValueError(f"Invalid reboot mode {other}, must be soft or hard.")
 
 
-def _write_apply(config: Config, ioc_name: str, hutch: str):
+# How many times to redo a single-IOC edit on top of someone else's newer config
+WRITE_RETRIES = 3
+
+
+# Settings that are worked out from the others rather than edited
+DERIVED_PROC_FIELDS = ("parent",)
+
+
+def _write_apply(config: Config, ioc_name: str, hutch: str, original: IOCProc | None):
     """
     Super common write + apply combination.
 
+    original is a copy of the IOC from before our edit,
+    or None if we are adding it. See _write_merge.
+
     Pulled out for ease of testing.
     """
     # Ensure everything is up-to-date
     config.update_proc(config.procs[ioc_name])
-    write_config(cfgname=hutch, config=config)
+    _write_merge(config=config, ioc_name=ioc_name, hutch=hutch, original=original)
     apply_config(cfg=hutch, verify=None, ioc=ioc_name)
 
 
+def _merge_proc(
+    config: Config, ours: IOCProc, original: IOCProc | None, exc: ConfigConflictError
+):
+    """
+    Re-apply only the settings we changed in ours onto config's newer copy.
+
+    Raises ConfigConflictError if someone else changed the same setting
+    to something else, or added or removed the same IOC.
+    """
+
+    def conflict(detail: str) -> ConfigConflictError:
+        return ConfigConflictError(
+            path=exc.path,
+            expected_mtime=exc.expected_mtime,
+            mtime=exc.mtime,
+            detail=detail,
+        )
+
+    theirs = config.procs.get(ours.name)
+    if original is None:
+        if theirs is None:
+            config.add_proc(ours)
+            return
+        if theirs != ours:
+            raise conflict(f"someone else also added {ours.name}")
+        return
+    if theirs is None:
+        raise conflict(f"someone else removed {ours.name}")
+    merged = copy(theirs)
+    for fld in fields(IOCProc):
+        if fld.name in DERIVED_PROC_FIELDS:
+            continue
+        old = getattr(original, fld.name)
+        new = getattr(ours, fld.name)
+        if new == old:
+            continue
+        other = getattr(theirs, fld.name)
+        if other not in (old, new):
+            raise conflict(
+                f"someone else changed {ours.name} {fld.name} "
+                f"from {old!r} to {other!r}, we wanted {new!r}"
+            )
+        setattr(merged, fld.name, new)
+    config.update_proc(merged)
+
+
+def _write_merge(config: Config, ioc_name: str, hutch: str, original: IOCProc | None):
+    """
+    Write our changes to one IOC without clobbering anyone else's edits.
+
+    The write only succeeds if the config file is unchanged since we read it.
+    If someone else saved in the meantime, re-read their version,
+    re-apply only the settings we changed compared to original, and try again.
+    If they changed one of the same settings, ConfigConflictError is raised.
+    """
+    ioc_proc = config.procs[ioc_name]
+    for _ in range(WRITE_RETRIES):
+        try:
+            config.mtime = write_config(
+                cfgname=hutch, config=config, expected_mtime=config.mtime
+            )
+            return
+        except ConfigConflictError as exc:
+            logger.info(f"{exc}, merging our changes to {ioc_name}.")
+            config = read_config(hutch)
+            _merge_proc(config=config, ours=ioc_proc, original=original, exc=exc)
+    raise RuntimeError(
+        f"Could not write {ioc_name} to the {hutch} config, "
+        "it kept changing while we were writing."
+    )
+
+
 def _apply_disable(config: Config, ioc_name: str, hutch: str, disable: bool):
     """Shared routines between enable_cmd and disable_cmd."""
     ensure_iocname(ioc_name)
@@ -360,8 +445,9 @@ def _apply_disable(config: Config, ioc_name: str, hutch: str, disable: bool):
         else:
             logger.info(f"{ioc_name} is already enabled.")
         return
+    original = copy(ioc_proc)
     ioc_proc.disable = disable
-    _write_apply(config=config, ioc_name=ioc_name, hutch=hutch)
+    _write_apply(config=config, ioc_name=ioc_name, hutch=hutch, original=original)
 
 
 def enable_cmd(config: Config, ioc_name: str, hutch: str):
@@ -425,11 +511,12 @@ def upgrade_cmd(config: Config, ioc_name: str, hutch: str, upgrade_dir: str):
     if not has_stcmd(directory=upgrade_dir, ioc_name=ioc_name):
         raise RuntimeError(f"{upgrade_dir} does not have an st.cmd for {ioc_name}!")
     ioc_proc = get_proc(config=config, ioc_name=ioc_name)
+    original = copy(ioc_proc)
     try:
         ioc_proc.path = normalize_path(directory=upgrade_dir, ioc_name=ioc_name)
     except Exception:
         ioc_proc.path = upgrade_dir
-    _write_apply(config=config, ioc_name=ioc_name, hutch=hutch)
+    _write_apply(config=config, ioc_name=ioc_name, hutch=hutch, original=original)
 
 
 def move_cmd(config: Config, ioc_name: str, hutch: str, move_host_port: str):
@@ -473,9 +560,10 @@ def move_cmd(config: Config, ioc_name: str, hutch: str, move_host_port: str):
     if new_host == ioc_proc.host and new_port == ioc_proc.port:
         logger.info(f"{ioc_name} is already configured for {new_host}:{new_port}")
         return
+    original = copy(ioc_proc)
     ioc_proc.host = new_host
     ioc_proc.port = new_port
-    _write_apply(config=config, ioc_name=ioc_name, hutch=hutch)
+    _write_apply(config=config, ioc_name=ioc_name, hutch=hutch, original=original)
 
 
 def add_cmd(
@@ -543,7 +631,7 @@ def add_cmd(
             history=[],
         )
     )
-    _write_apply(config=config, ioc_name=ioc_name, hutch=hutch)
+    _write_apply(config=config, ioc_name=ioc_name, hutch=hutch, original=None)
 
 
 def list_cmd(config: Config, list_host: str, list_enabled: bool, list_disabled: bool):
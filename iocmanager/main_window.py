@@ -9,6 +9,7 @@ import io
 import logging
 import threading
 import traceback
+from collections.abc import Callable
 from enum import Enum
 from functools import partial
 
@@ -16,16 +17,20 @@ import pydm.config
 import pydm.data_plugins
 from pydm.exception import ExceptionDispatcher
 from pydm.exception import install as install_pydm_excepthook
+
+# Loaded here in the main thread: pydm's plugins import it in prepare_pydm,
+# and loading a qt extension module while widgets are being built crashes.
+from qtpy import QtNetwork  # noqa: F401
 from qtpy.QtCore import (
     QItemSelection,
     QItemSelectionModel,
     QPoint,
-    QSortFilterProxyModel,
     Qt,
 )
 from qtpy.QtGui import QCloseEvent
 from qtpy.QtWidgets import (
     QAbstractItemView,
+    QDockWidget,
     QMainWindow,
     QMenu,
     QMessageBox,
@@ -34,23 +39,31 @@ from qtpy.QtWidgets import (
 
 from .commit import check_commit_possible, commit_config
 from .config import check_auth, check_ssh, read_config, write_config
+from .console_dock import LogViewer, ProcServConsole
 from .dialog_apply_verify import verify_dialog
 from .dialog_commit import CommitDialog, CommitOption
 from .dialog_find_pv import FindPVDialog
+from .dialog_host_tree import HostTreeDialog
+from .dialog_poll_stats import PollStatsDialog
 from .env_paths import env_paths
 from .hioc_tools import reboot_hioc
+from .host_tree import HostTreeModel
 from .imgr import ensure_auth, reboot_cmd
 from .ioc_info import get_base_name
 from .procserv_tools import apply_config
-from .server_tools import reboot_server, sdfconfig
+from .server_tools import HostInfoCache, reboot_server
+from .state_engine import SharedProber
 from .table_delegate import IOCTableDelegate
+from .table_filter import IOCFilterProxyModel
 from .table_model import IOCModelIdentifier, IOCTableModel
-from .terminal import run_in_floating_terminal
 from .ui_ioc import Ui_MainWindow
 from .version import version as version_str
 
 logger = logging.getLogger(__name__)
 
+# There might be a window for each hutch, only set up pydm in one at a time
+pydm_prep_lock = threading.Lock()
+
 
 class IOCMainWindow(QMainWindow):
     """
@@ -60,9 +73,28 @@ class IOCMainWindow(QMainWindow):
     for e.g. saving and comitting configs.
 
     It loads from the pyuic-compiled ui/ioc.ui file.
+
+    Parameters
+    ----------
+    hutch : str
+        The hutch whose IOCs to show.
+    verbose : int, optional
+        The verbosity level from the command line.
+    prober : SharedProber, optional
+        Share IOC status checks with the windows for other hutches,
+        see IOCMultiWindow.
+    host_info : HostInfoCache, optional
+        Share sdfconfig host info with the windows for other hutches.
+        The owner is responsible for shutting it down.
     """
 
-    def __init__(self, hutch: str, verbose: int = 0):
+    def __init__(
+        self,
+        hutch: str,
+        verbose: int = 0,
+        prober: SharedProber | None = None,
+        host_info: HostInfoCache | None = None,
+    ):
         super().__init__()
         self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
@@ -74,10 +106,21 @@ class IOCMainWindow(QMainWindow):
         self.hutch = hutch
         self.verbose = verbose
 
+        # Performance quibbles
+        # Doing this in a thread saves a startup second
+        # Start it first so it overlaps with everything else here
+        self.pydm_ready = threading.Event()
+        self.pydm_prep_thread = threading.Thread(target=self.prepare_pydm, daemon=True)
+        self.pydm_prep_thread.start()
+
         # Data interfaces
         config = read_config(hutch)
-        self.model = IOCTableModel(config=config, hutch=hutch, parent=self)
-        self.sort_model = QSortFilterProxyModel()
+        self.model = IOCTableModel(
+            config=config, hutch=hutch, parent=self, prober=prober
+        )
+        # Ready to go! Start checking ioc status while we build the rest!
+        self.model.start_poll_thread()
+        self.sort_model = IOCFilterProxyModel()
         self.sort_model.setSourceModel(self.model)
         self.delegate = IOCTableDelegate(
             hutch=hutch,
@@ -96,13 +139,14 @@ class IOCMainWindow(QMainWindow):
         # Set up all the qt objects we'll need
         # Helpful title: which hutch and iocmanager version we're using
         self.setWindowTitle(f"{hutch.upper()} iocmanager R{version_str}")
-        # Re-usable dialogs
-        self.commit_dialog = CommitDialog(hutch=hutch, parent=self)
-        self.find_pv_dialog = FindPVDialog(
-            model=self.model,
-            parent=self,
-        )
-        self.find_pv_dialog.request_scroll.connect(self.scroll_to_ioc)
+        # Re-usable dialogs, built the first time they are used
+        self._commit_dialog: CommitDialog | None = None
+        self._find_pv_dialog: FindPVDialog | None = None
+        self._poll_stats_dialog: PollStatsDialog | None = None
+        self._host_model: HostTreeModel | None = None
+        self._host_tree_dialog: HostTreeDialog | None = None
+        # Console and log docks by (kind, ioc name)
+        self.docks: dict[tuple[str, str], QDockWidget] = {}
         # Configuration menu
         self.ui.actionApply.triggered.connect(self.action_write_and_apply_config)
         self.ui.actionSave.triggered.connect(self.action_write_config)
@@ -116,9 +160,12 @@ class IOCMainWindow(QMainWindow):
         # Utilities menu
         self.ui.actionHelp.triggered.connect(self.action_help)
         self.ui.actionRemember.triggered.connect(self.action_remember_versions)
+        self.ui.actionPollStats.triggered.connect(self.action_poll_stats)
+        self.ui.actionHosts.triggered.connect(self.action_hosts)
         self.ui.actionQuit.triggered.connect(self.action_quit)
         # At the very bottom of the window
         self.ui.findpv.returnPressed.connect(self.on_find_pv)
+        self.ui.filter.textChanged.connect(self.sort_model.set_filter_text)
         # Set up the table view properly
         self.ui.tableView.setModel(self.sort_model)
         self.ui.tableView.setItemDelegate(self.delegate)
@@ -134,20 +181,11 @@ class IOCMainWindow(QMainWindow):
         )
         self.ui.tableView.customContextMenuRequested.connect(self.show_context_menu)
 
-        # Ready to go! Start checking ioc status!
-        self.model.start_poll_thread()
-
-        # Performance quibbles
-        # Doing this in a thread saves a startup second
-        self.pydm_ready = threading.Event()
-        self.pydm_prep_thread = threading.Thread(target=self.prepare_pydm, daemon=True)
-        self.pydm_prep_thread.start()
-        # Pre-loading the sdfconfig info makes the table snappier
-        self.sdfconfig_cache = {}
-        self.sdfconfig_prep_thread = threading.Thread(
-            target=self.prepare_sdfconfig, daemon=True
-        )
-        self.sdfconfig_prep_thread.start()
+        # Start from last session's sdfconfig info, refresh it in the background
+        self.own_host_info = host_info is None
+        self.host_info = host_info or HostInfoCache()
+        self.sdfconfig_failed: set[str] = set()
+        self.prepare_sdfconfig()
         # Checking if we can ssh can take a few seconds for kerberos
         self.commit_check_thread = threading.Thread(
             target=self.prepare_commit_host_status, daemon=True
@@ -158,6 +196,49 @@ class IOCMainWindow(QMainWindow):
         install_pydm_excepthook(use_default_handler=False)
         self.exception_notifier = IOCExceptionNotifier(self)
 
+    @property
+    def commit_dialog(self) -> CommitDialog:
+        """The dialog that asks the user about committing, built on first use."""
+        if self._commit_dialog is None:
+            self._commit_dialog = CommitDialog(hutch=self.hutch, parent=self)
+        return self._commit_dialog
+
+    @property
+    def find_pv_dialog(self) -> FindPVDialog:
+        """The dialog that shows find pv results, built on first use."""
+        if self._find_pv_dialog is None:
+            self._find_pv_dialog = FindPVDialog(model=self.model, parent=self)
+            self._find_pv_dialog.request_scroll.connect(self.scroll_to_ioc)
+        return self._find_pv_dialog
+
+    @property
+    def poll_stats_dialog(self) -> PollStatsDialog:
+        """The dialog that shows poll loop timings, built on first use."""
+        if self._poll_stats_dialog is None:
+            self._poll_stats_dialog = PollStatsDialog(
+                poll_stats=self.model.poll_stats,
+                poll_interval=self.model.poll_interval,
+                parent=self,
+            )
+        return self._poll_stats_dialog
+
+    @property
+    def host_model(self) -> HostTreeModel:
+        """The IOCs grouped by host, built on first use and then kept up to date."""
+        if self._host_model is None:
+            self._host_model = HostTreeModel(model=self.model, parent=self)
+        return self._host_model
+
+    @property
+    def host_tree_dialog(self) -> HostTreeDialog:
+        """The dialog that shows the IOCs grouped by host, built on first use."""
+        if self._host_tree_dialog is None:
+            self._host_tree_dialog = HostTreeDialog(
+                host_model=self.host_model, parent=self
+            )
+            self._host_tree_dialog.request_scroll.connect(self.scroll_to_ioc)
+        return self._host_tree_dialog
+
     def update_user_label(self):
         text = f"User: {self.user}"
         if self.auth:
@@ -184,36 +265,36 @@ class IOCMainWindow(QMainWindow):
         start while the user is thinking about what to do without slowing down
         the ui load.
         """
-        # Don't load typhos, etc. plugins, wastes time
-        pydm.config.ENTRYPOINT_DATA_PLUGIN += "_disable"
-        # Force early load of the plugins
-        pydm.data_plugins.initialize_plugins_if_needed()
+        with pydm_prep_lock:
+            # Don't load typhos, etc. plugins, wastes time
+            if not pydm.config.ENTRYPOINT_DATA_PLUGIN.endswith("_disable"):
+                pydm.config.ENTRYPOINT_DATA_PLUGIN += "_disable"
+            # Force early load of the plugins
+            pydm.data_plugins.initialize_plugins_if_needed()
         self.pydm_ready.set()
 
     def prepare_sdfconfig(self):
         """
-        Load sdfconfig info in the background to make the table feel snappier
+        Refresh sdfconfig info in the background to make the table feel snappier
         """
-        for host in self.model.config.hosts:
-            self._get_sdfconfig(host)
+        self.host_info.refresh(self.model.config.hosts)
 
     def _get_sdfconfig(self, host: str) -> dict[str, str]:
         """
         Return the cached sdfconfig information if available, otherwise get it.
         """
-        if host not in self.sdfconfig_cache:
-            try:
-                self.sdfconfig_cache[host] = sdfconfig(host=host)
-            except Exception:
-                self.sdfconfig_cache[host] = {
-                    "Foreman Location": "Please configure sdfconfig"
-                }
-            if not self.sdfconfig_cache[host]:
-                # Invalid hostname
-                self.sdfconfig_cache[host] = {
-                    "Foreman Location": "Server not in sdfconfig"
-                }
-        return self.sdfconfig_cache[host]
+        if host in self.sdfconfig_failed:
+            return {"Foreman Location": "Please configure sdfconfig"}
+        try:
+            info = self.host_info.fetch(host)
+        except Exception:
+            # Don't block the table on a broken sdfconfig more than once
+            self.sdfconfig_failed.add(host)
+            return {"Foreman Location": "Please configure sdfconfig"}
+        if not info:
+            # Invalid hostname
+            return {"Foreman Location": "Server not in sdfconfig"}
+        return info
 
     def prepare_commit_host_status(self):
         """
@@ -239,6 +320,8 @@ class IOCMainWindow(QMainWindow):
         The strange signature makes pylance happy because it matches the base class 1:1.
         """
         self.model.stop_poll_thread()
+        if self.own_host_info:
+            self.host_info.shutdown()
         self.model.poll_thread.join(timeout=1.0)
         return super().closeEvent(a0)
 
@@ -428,14 +511,20 @@ class IOCMainWindow(QMainWindow):
             return
         ensure_auth(hutch=self.hutch, ioc_name="", special_ok=False)
         # Need to figure out which IOCs are on this host
-        config = self.model.get_next_config()
+        config = self.model.get_next_config_view()
         this_proc = config.procs[self.current_ioc]
         if this_proc.hard:
             self._hioc_server_reboot(host=this_proc.host)
         else:
+            # The host index also has deleted and untracked IOCs, skip those
             all_names = []
-            for ioc_name, ioc_proc in config.procs.items():
-                if ioc_proc.host == this_proc.host and not ioc_proc.disable:
+            for ioc_name in self.host_model.get_host_iocs(host=this_proc.host):
+                ioc_proc = config.procs.get(ioc_name)
+                if (
+                    ioc_proc is not None
+                    and ioc_proc.host == this_proc.host
+                    and not ioc_proc.disable
+                ):
                     all_names.append(ioc_name)
             self._sioc_server_reboot(host=this_proc.host, ioc_names=all_names)
 
@@ -465,8 +554,9 @@ class IOCMainWindow(QMainWindow):
         msg = f"Confirm: reboot ioc server {host}?"
         if ioc_names:
             msg += f"\nRebooting {host} will temporarily stop the following IOCs:"
+            procs = self.model.get_next_config_view().procs
             for name in ioc_names:
-                ioc_proc = self.model.get_next_config().procs[name]
+                ioc_proc = procs[name]
                 if ioc_proc.alias:
                     msg += f"\n- {ioc_proc.alias} ({name})"
                 else:
@@ -495,35 +585,62 @@ class IOCMainWindow(QMainWindow):
         """
         Action when the user clicks "Show Log".
 
-        This opens a floating terminal that tails the IOC's logfile.
+        This opens a dock that follows the IOC's logfile.
         """
         if not self._check_selected():
             return
-        pos = self.ui.menuIOC_Control.pos()
-        run_in_floating_terminal(
-            title=f"{self.current_ioc} logfile",
-            cmd=f"tail -1000lf {env_paths.LOGBASE % self.current_ioc}",
-            xpos=pos.x(),
-            ypos=pos.y(),
+        ioc_name = self.current_ioc
+        self.open_dock(
+            key=("log", ioc_name),
+            title=f"{ioc_name} logfile",
+            make_widget=lambda: LogViewer(path=env_paths.LOGBASE % ioc_name),
         )
 
     def action_show_console(self):
         """
         Action when the user clicks "Show Console".
 
-        This opens a floating terminal that telnets to the IOC's host and port.
+        This opens a dock with a console connected to the IOC's procServ port.
         """
         if not self._check_selected():
             return
         ioc_proc = self.model.get_ioc_proc(ioc=self.current_ioc)
-        pos = self.ui.menuIOC_Control.pos()
-        run_in_floating_terminal(
-            title=f"{self.current_ioc} telnet session",
-            cmd=f"telnet {ioc_proc.host} {ioc_proc.port}",
-            xpos=pos.x(),
-            ypos=pos.y(),
+        self.open_dock(
+            key=("console", ioc_proc.name),
+            title=f"{ioc_proc.name} console",
+            make_widget=lambda: ProcServConsole(host=ioc_proc.host, port=ioc_proc.port),
         )
 
+    def open_dock(
+        self,
+        key: tuple[str, str],
+        title: str,
+        make_widget: Callable[[], QWidget],
+    ) -> QDockWidget:
+        """
+        Show a dock at the bottom of the window, creating it if needed.
+
+        Docks are tabbed together. If a dock with the same key is already
+        open, it is brought to the front instead of opening a second one.
+        Closing a dock deletes it and its widget.
+        """
+        try:
+            dock = self.docks[key]
+        except KeyError:
+            dock = QDockWidget(title, self)
+            dock.setObjectName(f"{key[0]}_{key[1]}")
+            dock.setAttribute(Qt.WA_DeleteOnClose)
+            dock.setWidget(make_widget())
+            dock.destroyed.connect(lambda *args: self.docks.pop(key, None))
+            others = [other for other in self.docks.values() if other.isVisible()]
+            self.addDockWidget(Qt.BottomDockWidgetArea, dock)
+            if others:
+                self.tabifyDockWidget(others[-1], dock)
+            self.docks[key] = dock
+        dock.show()
+        dock.raise_()
+        return dock
+
     def action_help(self):
         """
         Action when the user clicks "Help".
@@ -549,11 +666,31 @@ class IOCMainWindow(QMainWindow):
         """
         self.model.save_all_versions()
 
+    def action_poll_stats(self):
+        """
+        Action when the user clicks "Poll Diagnostics"
+
+        Shows how long the recent polls took, and the slowest hosts and IOCs.
+        """
+        self.poll_stats_dialog.show()
+        self.poll_stats_dialog.raise_()
+
+    def action_hosts(self):
+        """
+        Action when the user clicks "Host Overview"
+
+        Shows the IOCs grouped by host, with a status summary for each host.
+        """
+        self.host_tree_dialog.show()
+        self.host_tree_dialog.raise_()
+
     def action_quit(self):
         """
         Action when the user clicks "Quit"
+
+        This closes every hutch's tab if we're inside an IOCMultiWindow.
         """
-        self.close()
+        self.window().close()
 
     def on_find_pv(self):
         """
@@ -767,6 +904,10 @@ class IOCExceptionNotifier:
         self.main_window = main_window
         ExceptionDispatcher().newException.connect(self.recieve_new_exception)
 
+    def disconnect(self):
+        """Stop showing exceptions, e.g. if another window will show them."""
+        ExceptionDispatcher().newException.disconnect(self.recieve_new_exception)
+
     def recieve_new_exception(
         self, exc_info: tuple[type[BaseException], BaseException, tuple]
     ):
@@ -0,0 +1,72 @@
+"""
+The multi_window module shows several hutches in one iocmanager gui.
+
+Each hutch gets a normal IOCMainWindow in its own tab.
+The tabs share one SharedProber, so an IOC that shows up in more than one
+hutch's table is only checked once per poll, and one HostInfoCache.
+
+It will be launched via the cli parser in gui.py when more than one hutch
+is given, e.g. iocmanager xpp xcs
+"""
+
+import logging
+
+from qtpy.QtCore import Qt
+from qtpy.QtGui import QCloseEvent
+from qtpy.QtWidgets import QTabWidget
+
+from .main_window import IOCMainWindow
+from .server_tools import HostInfoCache
+from .state_engine import SharedProber
+from .version import version as version_str
+
+logger = logging.getLogger(__name__)
+
+
+class IOCMultiWindow(QTabWidget):
+    """
+    A tab for each hutch's IOCMainWindow, sharing one poll prober.
+
+    Parameters
+    ----------
+    hutches : list of str
+        The hutches to show, one tab each, in order.
+    verbose : int, optional
+        The verbosity level from the command line.
+    """
+
+    def __init__(self, hutches: list[str], verbose: int = 0):
+        super().__init__()
+        self.hutches = hutches
+        self.prober = SharedProber()
+        self.host_info = HostInfoCache()
+        self.windows: list[IOCMainWindow] = []
+        for hutch in hutches:
+            window = IOCMainWindow(
+                hutch=hutch,
+                verbose=verbose,
+                prober=self.prober,
+                host_info=self.host_info,
+            )
+            # Show it as a plain widget inside the tab
+            window.setWindowFlags(Qt.Widget)
+            if self.windows:
+                # The first tab already shows exceptions
+                window.exception_notifier.disconnect()
+            self.windows.append(window)
+            self.addTab(window, hutch.upper())
+        self.setWindowTitle(
+            f"{' '.join(hutch.upper() for hutch in hutches)} iocmanager R{version_str}"
+        )
+
+    def closeEvent(self, a0: QCloseEvent):
+        """
+        Override base closeEvent to also stop each hutch's polling.
+
+        The strange signature makes pylance happy because it matches the base class 1:1.
+        """
+        for window in self.windows:
+            window.close()
+        self.prober.shutdown()
+        self.host_info.shutdown()
+        return super().closeEvent(a0)
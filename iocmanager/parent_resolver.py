@@ -0,0 +1,227 @@
+"""
+The parent_resolver module finds IOC parents in the background for the GUI.
+
+get_parent can do dozens of file operations, which is slow on NFS.
+The file dialogs ask for the parent every time the user clicks on or types
+something, so doing it in the GUI thread makes browsing stutter.
+
+The ParentResolver waits until the user has paused before looking anything
+up, only ever reports the result for the latest request, and shares
+its results with every other ParentResolver through a ParentCache.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from qtpy.QtCore import QObject, QTimer
+
+from .epics_paths import get_parent
+
+# Depends on the version, even pylance gets confused
+try:
+    from qtpy.QtCore import pyqtSignal as Signal
+except ImportError:
+    from qtpy.QtCore import Signal  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# How long the user needs to pause before we look up the parent
+PARENT_DEBOUNCE_MS = 200
+# How long to trust a cached parent, in seconds
+PARENT_CACHE_TTL = 60.0
+# The most get_parent calls to run at the same time
+PARENT_WORKERS = 2
+
+
+class ParentCache:
+    """
+    Thread-safe cache of get_parent results and lookups in progress.
+
+    Parameters
+    ----------
+    ttl : float, optional
+        How many seconds a result is used before it is looked up again.
+    max_workers : int, optional
+        The most get_parent calls to run at the same time.
+    """
+
+    def __init__(
+        self, ttl: float = PARENT_CACHE_TTL, max_workers: int = PARENT_WORKERS
+    ):
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str], tuple[float, str]] = {}
+        self._pending: dict[tuple[str, str], Future[str]] = {}
+        # How many requests are waiting on each pending lookup
+        self._waiters: dict[tuple[str, str], int] = {}
+        self._executor: ThreadPoolExecutor | None = None
+
+    def get(self, directory: str, ioc_name: str) -> str | None:
+        """Return the cached parent, or None if it needs to be looked up."""
+        with self._lock:
+            entry = self._entries.get((directory, ioc_name))
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            return None
+        return entry[1]
+
+    def submit(self, directory: str, ioc_name: str) -> Future[str]:
+        """
+        Start a background lookup, or join the one already in progress.
+
+        The future's result is the parent, or an empty string if there
+        is none or if it could not be determined.
+        Call release if you no longer need the result.
+        """
+        key = (directory, ioc_name)
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="get_parent"
+                    )
+                future = self._executor.submit(self._lookup, directory, ioc_name)
+                self._pending[key] = future
+            self._waiters[key] = self._waiters.get(key, 0) + 1
+        return future
+
+    def release(self, directory: str, ioc_name: str):
+        """
+        Give up on a lookup from submit.
+
+        If nobody else is waiting for it and it hasn't started yet,
+        it is cancelled.
+        """
+        key = (directory, ioc_name)
+        with self._lock:
+            waiters = self._waiters.get(key, 0) - 1
+            if waiters > 0:
+                self._waiters[key] = waiters
+                return
+            self._waiters.pop(key, None)
+            future = self._pending.get(key)
+            if future is not None and future.cancel():
+                del self._pending[key]
+
+    def clear(self):
+        """Forget every cached parent."""
+        with self._lock:
+            self._entries.clear()
+
+    def _lookup(self, directory: str, ioc_name: str) -> str:
+        """Worker thread: call get_parent and save the result."""
+        try:
+            parent = get_parent(directory=directory, ioc_name=ioc_name)
+        except Exception:
+            logger.debug(
+                "get_parent failed for %s in %s", ioc_name, directory, exc_info=True
+            )
+            parent = ""
+        with self._lock:
+            self._entries[(directory, ioc_name)] = (time.monotonic(), parent)
+            self._pending.pop((directory, ioc_name), None)
+            self._waiters.pop((directory, ioc_name), None)
+        return parent
+
+
+# Shared by every ParentResolver by default
+parent_cache = ParentCache()
+
+
+class ParentResolver(QObject):
+    """
+    Debounced, cancellable, background get_parent for one GUI widget.
+
+    Call request as often as you like. Once the requests stop for
+    debounce_ms, the latest one is looked up in a worker thread and
+    parent_resolved is emitted in the GUI thread with the result.
+    Results for older requests are never emitted.
+    Cached results are emitted right away, without waiting.
+
+    Parameters
+    ----------
+    debounce_ms : int, optional
+        How long to wait for more requests before looking anything up.
+    cache : ParentCache, optional
+        Where to keep results. Defaults to the shared parent_cache.
+    parent : QObject, optional
+        The parent object.
+    """
+
+    # directory, ioc_name, parent
+    parent_resolved = Signal(str, str, str)
+    # generation, directory, ioc_name, parent: from the worker thread
+    _lookup_done = Signal(int, str, str, str)
+
+    def __init__(
+        self,
+        debounce_ms: int = PARENT_DEBOUNCE_MS,
+        cache: ParentCache | None = None,
+        parent: QObject | None = None,
+    ):
+        super().__init__(parent)
+        self.cache = cache or parent_cache
+        self._generation = 0
+        self._request: tuple[str, str] = ("", "")
+        self._future: Future[str] | None = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._start_lookup)
+        self._lookup_done.connect(self._finish_lookup)
+
+    def request(self, directory: str, ioc_name: str):
+        """
+        Ask for the parent of ioc_name in directory.
+
+        If either is empty, the parent is an empty string.
+        """
+        self.cancel()
+        if not directory or not ioc_name:
+            self.parent_resolved.emit(directory, ioc_name, "")
+            return
+        parent = self.cache.get(directory=directory, ioc_name=ioc_name)
+        if parent is not None:
+            self.parent_resolved.emit(directory, ioc_name, parent)
+            return
+        self._request = (directory, ioc_name)
+        self._timer.start()
+
+    def cancel(self):
+        """Forget the current request, if any. Its result will not be emitted."""
+        self._generation += 1
+        self._timer.stop()
+        if self._future is not None:
+            # Only stops it if it hasn't started, otherwise we ignore the result
+            self.cache.release(*self._request)
+            self._future = None
+
+    def _start_lookup(self):
+        generation = self._generation
+        directory, ioc_name = self._request
+        self._future = self.cache.submit(directory=directory, ioc_name=ioc_name)
+
+        def done(future: Future[str]):
+            if future.cancelled():
+                return
+            try:
+                self._lookup_done.emit(generation, directory, ioc_name, future.result())
+            except RuntimeError:
+                # We were deleted while the lookup ran, e.g. the dialog closed
+                ...
+
+        self._future.add_done_callback(done)
+
+    def _finish_lookup(
+        self, generation: int, directory: str, ioc_name: str, parent: str
+    ):
+        if generation != self._generation:
+            # The user has moved on
+            return
+        self._future = None
+        self.parent_resolved.emit(directory, ioc_name, parent)
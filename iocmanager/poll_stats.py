@@ -0,0 +1,180 @@
+"""
+The poll_stats module keeps timing measurements from the gui's poll loop.
+
+The StatusPoller's poll thread records how long each phase of each sweep
+takes and how long each IOC's status check takes. Only the most recent
+measurements are kept, so the numbers always describe the recent past.
+
+This is used to explain why the table might feel stale, both in the gui
+(see dialog_poll_stats) and from benchmarks and tests:
+
+>>> stats = model.poll_stats
+>>> stats.phase_summary()[PollPhase.PROBE].mean
+>>> stats.slowest_hosts(count=5)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import StrEnum
+
+# How many sweeps, or status checks per host or IOC, to remember
+DEFAULT_WINDOW = 30
+
+
+class PollPhase(StrEnum):
+    """
+    The timed parts of a poll sweep.
+    """
+
+    CONFIG_READ = "config read"
+    HOST_OS_READ = "host os read"
+    STATUS_DIR_READ = "status dir read"
+    PROBE = "probe fan-out"
+    EMIT = "result emission"
+    SWEEP = "full sweep"
+
+
+@dataclass(frozen=True)
+class LatencySummary:
+    """
+    Summary of the recent measurements for one phase, host, or IOC.
+
+    Attributes
+    ----------
+    name : str
+        The phase, host, or IOC name.
+    count : int
+        The number of measurements in the window.
+    mean : float
+        The average time in seconds.
+    max : float
+        The longest time in seconds.
+    last : float
+        The most recent time in seconds.
+    """
+
+    name: str
+    count: int
+    mean: float
+    max: float
+    last: float
+
+    @classmethod
+    def from_samples(cls, name: str, samples: deque[float]) -> LatencySummary:
+        return cls(
+            name=name,
+            count=len(samples),
+            mean=sum(samples) / len(samples),
+            max=max(samples),
+            last=samples[-1],
+        )
+
+
+class PollStats:
+    """
+    Thread-safe rolling window of poll loop timings.
+
+    Parameters
+    ----------
+    window : int, optional
+        How many measurements to keep for each phase, host, and IOC.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._phases: dict[str, deque[float]] = {}
+        self._hosts: dict[str, deque[float]] = {}
+        self._iocs: dict[str, deque[float]] = {}
+        self.last_sweep_time = 0.0
+
+    @contextmanager
+    def time_phase(self, phase: PollPhase) -> Iterator[None]:
+        """Context manager that records how long the block takes as phase."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record_phase(phase=phase, duration=time.monotonic() - start)
+
+    def record_phase(self, phase: PollPhase, duration: float):
+        """Add one measurement of a poll phase."""
+        with self._lock:
+            self._append(self._phases, str(phase), duration)
+            if phase == PollPhase.SWEEP:
+                self.last_sweep_time = time.time()
+
+    def record_probe(self, host: str, name: str, duration: float):
+        """Add one measurement of an IOC status check."""
+        with self._lock:
+            self._append(self._hosts, host, duration)
+            self._append(self._iocs, name, duration)
+
+    def clear(self):
+        """Forget every measurement."""
+        with self._lock:
+            self._phases.clear()
+            self._hosts.clear()
+            self._iocs.clear()
+            self.last_sweep_time = 0.0
+
+    def phase_summary(self) -> dict[PollPhase, LatencySummary]:
+        """Summarize each poll phase that has been measured."""
+        with self._lock:
+            return {
+                phase: LatencySummary.from_samples(phase, self._phases[phase])
+                for phase in PollPhase
+                if phase in self._phases
+            }
+
+    def slowest_hosts(self, count: int = 10) -> list[LatencySummary]:
+        """Summarize the hosts with the slowest average status checks."""
+        with self._lock:
+            return self._slowest(self._hosts, count)
+
+    def slowest_iocs(self, count: int = 10) -> list[LatencySummary]:
+        """Summarize the IOCs with the slowest average status checks."""
+        with self._lock:
+            return self._slowest(self._iocs, count)
+
+    def format_report(self, count: int = 10) -> str:
+        """Return a plain text report of the current measurements."""
+        lines = [f"{'Phase':<20}{'mean':>10}{'max':>10}{'last':>10}"]
+        for phase, summary in self.phase_summary().items():
+            lines.append(_format_line(phase, summary))
+        lines += ["", f"Slowest hosts (of the last {self.window} checks)"]
+        for summary in self.slowest_hosts(count=count):
+            lines.append(_format_line(summary.name, summary))
+        lines += ["", f"Slowest IOCs (of the last {self.window} checks)"]
+        for summary in self.slowest_iocs(count=count):
+            lines.append(_format_line(summary.name, summary))
+        return "\n".join(lines)
+
+    def _append(self, samples: dict[str, deque[float]], key: str, duration: float):
+        try:
+            samples[key].append(duration)
+        except KeyError:
+            samples[key] = deque((duration,), maxlen=self.window)
+
+    def _slowest(
+        self, samples: dict[str, deque[float]], count: int
+    ) -> list[LatencySummary]:
+        summaries = [
+            LatencySummary.from_samples(name, values)
+            for name, values in samples.items()
+        ]
+        summaries.sort(key=lambda summary: summary.mean, reverse=True)
+        return summaries[:count]
+
+
+def _format_line(name: str, summary: LatencySummary) -> str:
+    return (
+        f"{name[:19]:<20}{summary.mean * 1000:>8.1f}ms"
+        f"{summary.max * 1000:>8.1f}ms{summary.last * 1000:>8.1f}ms"
+    )
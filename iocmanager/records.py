@@ -0,0 +1,333 @@
+"""
+The records module defines memory-compact, read-only versions of our dataclasses.
+
+IOCProc, IOCStatusFile, and IOCStatusLive are mutable because the GUI and imgr
+edit them in place. Tools that keep thousands of these alive at once just to
+read them, such as views across many hutches, can convert them to the records
+here instead. Records:
+
+- Use __slots__ instead of a per-instance __dict__
+- Store the IOC history as a tuple rather than a per-instance list
+- Intern the host and path strings, which repeat heavily across IOCs
+
+The records are frozen. Frozen records can be "edited" by making a new record
+with dataclasses.replace, or converted back to the mutable dataclasses with
+their to_* methods. Each also has a slotted but mutable variant, e.g.
+MutableIOCProcRecord, for tools that need to edit in place.
+
+Note that read_config keeps every Config it reads in config_cache,
+so converting the procs from read_config adds copies rather than replacing
+the originals. The records only save memory for data we own, such as status
+files and live statuses, or configs read without the cache.
+
+For large collections, RecordTable stores records column by column,
+which avoids the per-record object overhead entirely.
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field, fields, make_dataclass
+from typing import Any, ClassVar
+
+from .config import IOCProc, IOCStatusFile
+from .procserv_tools import AutoRestartMode, IOCStatusLive, ProcServStatus
+
+
+def _intern(text: str) -> str:
+    """sys.intern that tolerates str subclasses and non-str values."""
+    if type(text) is str:
+        return sys.intern(text)
+    return text
+
+
+@dataclass(frozen=True, slots=True)
+class IOCProcRecord:
+    """
+    Compact, read-only version of IOCProc.
+
+    See IOCProc for a description of the attributes.
+    """
+
+    name: str
+    port: int
+    host: str
+    path: str
+    alias: str = ""
+    disable: bool = False
+    cmd: str = ""
+    history: tuple[str, ...] = ()
+    delay: int = 0
+    parent: str = ""
+    hard: bool = False
+
+    # Columns that RecordTable can store in typed arrays
+    array_columns: ClassVar[dict[str, str]] = {
+        "port": "q",
+        "disable": "b",
+        "delay": "q",
+        "hard": "b",
+    }
+
+    @classmethod
+    def from_dataclass(cls, proc: IOCProc | IOCProcRecord) -> IOCProcRecord:
+        """Create a record from an IOCProc."""
+        if isinstance(proc, cls):
+            return proc
+        return cls(
+            name=_intern(proc.name),
+            port=proc.port,
+            host=_intern(proc.host),
+            path=_intern(proc.path),
+            alias=proc.alias,
+            disable=proc.disable,
+            cmd=_intern(proc.cmd),
+            history=tuple(_intern(path) for path in proc.history),
+            delay=proc.delay,
+            parent=_intern(proc.parent),
+            hard=proc.hard,
+        )
+
+    def to_dataclass(self) -> IOCProc:
+        """Create a mutable IOCProc from this record, keeping its parent."""
+        return IOCProc(
+            name=self.name,
+            port=self.port,
+            host=self.host,
+            path=self.path,
+            alias=self.alias,
+            disable=self.disable,
+            cmd=self.cmd,
+            history=list(self.history),
+            delay=self.delay,
+            parent=self.parent,
+            hard=self.hard,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class IOCStatusFileRecord:
+    """
+    Compact, read-only version of IOCStatusFile.
+
+    See IOCStatusFile for a description of the attributes.
+    """
+
+    name: str
+    port: int
+    host: str
+    path: str
+    pid: int
+    mtime: float = 0.0
+
+    array_columns: ClassVar[dict[str, str]] = {
+        "port": "q",
+        "pid": "q",
+        "mtime": "d",
+    }
+
+    @classmethod
+    def from_dataclass(
+        cls, status_file: IOCStatusFile | IOCStatusFileRecord
+    ) -> IOCStatusFileRecord:
+        """Create a record from an IOCStatusFile."""
+        if isinstance(status_file, cls):
+            return status_file
+        return cls(
+            name=_intern(status_file.name),
+            port=status_file.port,
+            host=_intern(status_file.host),
+            path=_intern(status_file.path),
+            pid=status_file.pid,
+            mtime=status_file.mtime,
+        )
+
+    def to_dataclass(self) -> IOCStatusFile:
+        """Create a mutable IOCStatusFile from this record."""
+        return IOCStatusFile(
+            name=self.name,
+            port=self.port,
+            host=self.host,
+            path=self.path,
+            pid=self.pid,
+            mtime=self.mtime,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class IOCStatusLiveRecord:
+    """
+    Compact, read-only version of IOCStatusLive.
+
+    See IOCStatusLive for a description of the attributes.
+    """
+
+    name: str
+    port: int
+    host: str
+    path: str
+    pid: int | None
+    status: ProcServStatus
+    autorestart_mode: AutoRestartMode
+
+    array_columns: ClassVar[dict[str, str]] = {"port": "q"}
+
+    @classmethod
+    def from_dataclass(
+        cls, status_live: IOCStatusLive | IOCStatusLiveRecord
+    ) -> IOCStatusLiveRecord:
+        """Create a record from an IOCStatusLive."""
+        if isinstance(status_live, cls):
+            return status_live
+        return cls(
+            name=_intern(status_live.name),
+            port=status_live.port,
+            host=_intern(status_live.host),
+            path=_intern(status_live.path),
+            pid=status_live.pid,
+            status=status_live.status,
+            autorestart_mode=status_live.autorestart_mode,
+        )
+
+    def to_dataclass(self) -> IOCStatusLive:
+        """Create a mutable IOCStatusLive from this record."""
+        return IOCStatusLive(
+            name=self.name,
+            port=self.port,
+            host=self.host,
+            path=self.path,
+            pid=self.pid,
+            status=self.status,
+            autorestart_mode=self.autorestart_mode,
+        )
+
+
+def _mutable_variant(record_type: type) -> type:
+    """Make a slotted but not frozen copy of one of the record classes."""
+    return make_dataclass(
+        f"Mutable{record_type.__name__}",
+        [
+            (fld.name, fld.type, field(default=fld.default))
+            for fld in fields(record_type)
+        ],
+        namespace={
+            name: record_type.__dict__[name]
+            for name in ("from_dataclass", "to_dataclass", "array_columns")
+        }
+        | {"__doc__": f"Compact, mutable version of {record_type.__name__}."},
+        slots=True,
+        module=__name__,
+    )
+
+
+MutableIOCProcRecord = _mutable_variant(IOCProcRecord)
+MutableIOCStatusFileRecord = _mutable_variant(IOCStatusFileRecord)
+MutableIOCStatusLiveRecord = _mutable_variant(IOCStatusLiveRecord)
+
+
+type Record = (
+    IOCProcRecord
+    | IOCStatusFileRecord
+    | IOCStatusLiveRecord
+    | MutableIOCProcRecord
+    | MutableIOCStatusFileRecord
+    | MutableIOCStatusLiveRecord
+)
+
+
+class RecordTable[T: Record]:
+    """
+    Column-oriented collection of records of a single type.
+
+    Each field is stored in its own column: a typed array for numeric and
+    boolean fields (see each record's array_columns) and a list otherwise.
+    Records are only created when they are accessed.
+
+    Records are also indexed by name, so each name should appear once.
+    Adding a record with a name that is already present replaces it.
+
+    Parameters
+    ----------
+    record_type : type
+        One of the record classes in this module.
+    items : iterable, optional
+        Initial contents, as records or as the matching mutable dataclasses.
+    """
+
+    def __init__(self, record_type: type[T], items: Iterable[Any] = ()):
+        self.record_type = record_type
+        self._field_names = [fld.name for fld in fields(record_type)]
+        self._typecodes: dict[str, str] = dict(record_type.array_columns)
+        self._columns: dict[str, list | array] = {
+            name: (array(self._typecodes[name]) if name in self._typecodes else [])
+            for name in self._field_names
+        }
+        self._rows: dict[str, int] = {}
+        self.extend(items)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._rows
+
+    def __iter__(self) -> Iterator[T]:
+        for row in range(len(self)):
+            yield self._get_row(row)
+
+    def __getitem__(self, key: int | str) -> T:
+        """Get a record by position or by name."""
+        if isinstance(key, str):
+            key = self._rows[key]
+        elif key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError(f"Row {key} out of range")
+        return self._get_row(key)
+
+    def _get_row(self, row: int) -> T:
+        values = {}
+        for name in self._field_names:
+            value = self._columns[name][row]
+            if self._typecodes.get(name) == "b":
+                value = bool(value)
+            values[name] = value
+        return self.record_type(**values)
+
+    def get(self, name: str, default: T | None = None) -> T | None:
+        """Get a record by name, or default if it is not present."""
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def names(self) -> list[str]:
+        """All of the names in the table, in order."""
+        return list(self._rows)
+
+    def column(self, name: str) -> list:
+        """Get a copy of one column's values as a list."""
+        values = list(self._columns[name])
+        if self._typecodes.get(name) == "b":
+            return [bool(value) for value in values]
+        return values
+
+    def append(self, item: Any) -> None:
+        """Add a record or a matching mutable dataclass to the table."""
+        record = self.record_type.from_dataclass(item)
+        row = self._rows.get(record.name)
+        for name in self._field_names:
+            value = getattr(record, name)
+            if row is None:
+                self._columns[name].append(value)
+            else:
+                self._columns[name][row] = value
+        if row is None:
+            self._rows[record.name] = len(self._rows)
+
+    def extend(self, items: Iterable[Any]) -> None:
+        """Add many records or matching mutable dataclasses to the table."""
+        for item in items:
+            self.append(item)
@@ -20,7 +20,7 @@ from typing import Iterable
 import jinja2
 from packaging.version import InvalidVersion, Version
 
-from ..config import IOCProc, get_host_os, read_config
+from ..config import IOCProc, get_host_dir_reader, read_all_configs, read_config
 from ..env_paths import env_paths
 from ..log_setup import add_verbose_arg, iocmanager_log_config
 
@@ -64,6 +64,8 @@ RENAMES = {
     "leviton": "pdu_snmp",
     "arcus_dmx": "arcus",
 }
+# Seconds to reuse one scan of the host directory across many host lookups
+HOST_OS_MAX_AGE = 600.0
 REG = "/reg/g"
 CDS = "/cds/group"
 PACKAGE = "package/epics/3.14/ioc"
@@ -408,25 +410,43 @@ class SurveyResult:
 
     @classmethod
     def from_hutch_list[T: SurveyResult](cls: type[T], hutch_list: list[str]) -> T:
-        hutch_results = []
-        for hutch in hutch_list:
-            if hutch == "all":
-                procs = []
-                for hutch_name in ALL_HUTCHES:
-                    if hutch_name == "all":
-                        continue
-                    cfg = read_config(hutch_name)
-                    procs.extend(cfg.procs.values())
-            else:
-                config = read_config(hutch)
-                procs = config.procs.values()
-            hutch_results.append(HutchResult.from_procs(hutch=hutch, procs=procs))
+        hutch_results = [
+            HutchResult.from_procs(hutch=hutch, procs=procs)
+            for hutch, procs in get_hutch_procs(hutch_list).items()
+        ]
         return cls(
             survey_date=datetime.datetime.now(),
             hutch_results=hutch_results,
         )
 
 
+def get_hutch_procs(hutch_list: list[str]) -> dict[str, list[IOCProc]]:
+    """
+    Return the IOCs configured in each hutch, where "all" means every hutch.
+
+    All of the needed configs are read concurrently up front.
+    """
+    all_hutches = [hutch for hutch in ALL_HUTCHES if hutch != "all"]
+    needed: list[str] = []
+    for hutch in hutch_list:
+        if hutch == "all":
+            needed.extend(all_hutches)
+        else:
+            needed.append(hutch)
+    configs = read_all_configs(needed)
+    hutch_procs = {}
+    for hutch in hutch_list:
+        if hutch == "all":
+            hutch_procs[hutch] = [
+                proc
+                for hutch_name in all_hutches
+                for proc in configs[hutch_name].procs.values()
+            ]
+        else:
+            hutch_procs[hutch] = list(configs[hutch].procs.values())
+    return hutch_procs
+
+
 @functools.lru_cache(maxsize=1024)
 def get_common_ioc(parent_ioc: str) -> str:
     """
@@ -540,13 +560,16 @@ def get_supported_os(common_ioc: str) -> str:
     return UNKNOWN
 
 
-@functools.lru_cache(maxsize=1024)
 def get_one_host_os(hostname: str) -> str:
     """Return the OS that a hostname runs on."""
+    # One scan of the host directory is shared by every lookup in a survey
     try:
-        return get_host_os([hostname])[hostname]
+        host_info = get_host_dir_reader().get(hostname, max_age=HOST_OS_MAX_AGE)
     except Exception:
         return UNKNOWN
+    if host_info is None:
+        return UNKNOWN
+    return host_info.os
 
 
 class CommonStatus(enum.StrEnum):
@@ -705,19 +728,10 @@ class ConfluenceStatsPage:
     def from_hutch_list[T: ConfluenceStatsPage](
         cls: type[T], hutch_list: list[str]
     ) -> T:
-        hutch_results = []
-        for hutch in hutch_list:
-            if hutch == "all":
-                procs = []
-                for hutch_name in ALL_HUTCHES:
-                    if hutch_name == "all":
-                        continue
-                    cfg = read_config(hutch_name)
-                    procs.extend(cfg.procs.values())
-            else:
-                config = read_config(hutch)
-                procs = config.procs.values()
-            hutch_results.append(HutchResult.from_procs(hutch=hutch, procs=procs))
+        hutch_results = [
+            HutchResult.from_procs(hutch=hutch, procs=procs)
+            for hutch, procs in get_hutch_procs(hutch_list).items()
+        ]
         return cls.from_results(hutch_results)
 
     @classmethod
@@ -3,15 +3,35 @@ The server_tools module defines functions for working with servers.
 
 IOCs run on servers, so getting information about servers on the
 network or e.g. rebooting the whole server can useful.
+
+Looking up a server in sdfconfig takes a second or two per host,
+so HostInfoCache runs these lookups in parallel and keeps the
+results on disk between sessions.
 """
 
+from __future__ import annotations
+
 import copy
 import json
+import logging
 import os
 import subprocess
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from tempfile import NamedTemporaryFile
 
 from .env_paths import env_paths
 
+logger = logging.getLogger(__name__)
+
+# Server metadata rarely changes, so cached results are good for a day
+SDFCONFIG_TTL = 24 * 60 * 60.0
+# The most sdfconfig subprocesses to run at once
+SDFCONFIG_WORKERS = 8
+
 
 def netconfig(host: str) -> dict[str, str]:
     """
@@ -110,6 +130,213 @@ def _sdfconfig(host: str, domain="pcdsn") -> str:
     )
 
 
+def default_host_info_path() -> str:
+    """Return the default location of the on-disk sdfconfig cache."""
+    return os.path.join(env_paths.CACHE_DIR, "sdfconfig.json")
+
+
+@dataclass(frozen=True)
+class HostInfo:
+    """
+    One cached sdfconfig result.
+
+    Attributes
+    ----------
+    info : dict of str
+        The information about the host from sdfconfig.
+        This is empty if sdfconfig doesn't know about the host.
+    timestamp : float
+        The time.time() when sdfconfig was checked.
+    """
+
+    info: dict[str, str]
+    timestamp: float
+
+
+class HostInfoCache:
+    """
+    Thread-safe, persistent cache of sdfconfig results.
+
+    Cached results are returned immediately, even if they are older than
+    the ttl. Use refresh to update stale or missing hosts in the background
+    using a limited pool of worker threads. Once all of the lookups in
+    progress are done, the new results are written back to the cache file
+    so that the next session can start from them.
+
+    Lookups that raise (e.g. sdfconfig is not installed) are not cached,
+    so they will be tried again on the next refresh.
+
+    Parameters
+    ----------
+    path : str, optional
+        The cache file. Defaults to sdfconfig.json in the iocmanager cache dir.
+    ttl : float, optional
+        How many seconds a cached result is considered fresh.
+    max_workers : int, optional
+        The most sdfconfig lookups to run at the same time.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        ttl: float = SDFCONFIG_TTL,
+        max_workers: int = SDFCONFIG_WORKERS,
+    ):
+        self.path = path or default_host_info_path()
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # Only one thread writes the cache file at a time
+        self._save_lock = threading.Lock()
+        self._entries: dict[str, HostInfo] = self._load()
+        self._pending: dict[str, Future[dict[str, str]]] = {}
+        self._dirty = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="sdfconfig"
+        )
+
+    def get(self, host: str) -> dict[str, str] | None:
+        """
+        Return the cached information for a host, or None if we have none.
+
+        This never blocks on sdfconfig, and may return stale information.
+        """
+        with self._lock:
+            entry = self._entries.get(host)
+        if entry is None:
+            return None
+        return entry.info
+
+    def is_fresh(self, host: str) -> bool:
+        """Returns True if we have cached information newer than the ttl."""
+        with self._lock:
+            entry = self._entries.get(host)
+        return entry is not None and time.time() - entry.timestamp < self.ttl
+
+    def refresh(
+        self, hosts: Iterable[str], force: bool = False
+    ) -> dict[str, Future[dict[str, str]]]:
+        """
+        Start background sdfconfig lookups for hosts that need them.
+
+        Parameters
+        ----------
+        hosts : iterable of str
+            The hosts to check.
+        force : bool, optional
+            If True, look up hosts even if the cached information is fresh.
+
+        Returns
+        -------
+        futures : dict of str to Future
+            The pending lookup for each host that is being refreshed.
+        """
+        futures = {}
+        for host in hosts:
+            if not force and self.is_fresh(host):
+                continue
+            with self._lock:
+                future = self._pending.get(host)
+                if future is None:
+                    future = self._executor.submit(self._lookup, host)
+                    self._pending[host] = future
+            futures[host] = future
+        return futures
+
+    def fetch(self, host: str, timeout: float | None = None) -> dict[str, str]:
+        """
+        Return information for a host, waiting for sdfconfig if needed.
+
+        Fresh cached information is returned right away.
+        Stale information is returned right away and refreshed
+        in the background. Otherwise, this waits for the lookup
+        and raises if it failed.
+        """
+        info = self.get(host)
+        futures = self.refresh([host])
+        if info is not None:
+            return info
+        return futures[host].result(timeout=timeout)
+
+    def shutdown(self, wait: bool = False):
+        """Stop the worker threads, cancelling any lookups that haven't started."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def save(self):
+        """
+        Write new results to the cache file, if there are any.
+
+        Results that other sessions saved in the meantime are kept,
+        unless we have a newer result for the same host.
+        """
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                entries = dict(self._entries)
+                self._dirty = False
+            merged = self._load()
+            for host, entry in entries.items():
+                old_entry = merged.get(host)
+                if old_entry is None or entry.timestamp >= old_entry.timestamp:
+                    merged[host] = entry
+            raw = {
+                host: {"info": entry.info, "timestamp": entry.timestamp}
+                for host, entry in merged.items()
+            }
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with NamedTemporaryFile(
+                    "w", dir=os.path.dirname(self.path), delete_on_close=False
+                ) as fd:
+                    json.dump(raw, fd)
+                    fd.close()
+                    os.replace(fd.name, self.path)
+            except OSError:
+                # The cache is only an optimization
+                logger.warning("Unable to write sdfconfig cache %s", self.path)
+                logger.debug("", exc_info=True)
+                with self._lock:
+                    self._dirty = True
+
+    def _lookup(self, host: str) -> dict[str, str]:
+        """Worker thread: check sdfconfig and save the result."""
+        try:
+            info = sdfconfig(host=host)
+        except Exception:
+            logger.debug("sdfconfig lookup failed for %s", host, exc_info=True)
+            self._finish(host=host, entry=None)
+            raise
+        self._finish(host=host, entry=HostInfo(info=info, timestamp=time.time()))
+        return info
+
+    def _finish(self, host: str, entry: HostInfo | None):
+        """Worker thread: keep one result, then save if it was the last one."""
+        with self._lock:
+            if entry is not None:
+                self._entries[host] = entry
+                self._dirty = True
+            self._pending.pop(host, None)
+            if self._pending:
+                return
+        self.save()
+
+    def _load(self) -> dict[str, HostInfo]:
+        """Read the cache file, ignoring it if it is missing or unreadable."""
+        try:
+            with open(self.path) as fd:
+                raw = json.load(fd)
+            return {
+                host: HostInfo(info=entry["info"], timestamp=entry["timestamp"])
+                for host, entry in raw.items()
+            }
+        except FileNotFoundError:
+            return {}
+        except Exception:
+            logger.warning("Ignoring unreadable sdfconfig cache %s", self.path)
+            logger.debug("", exc_info=True)
+            return {}
+
+
 def reboot_server(host: str) -> bool:
     """Reboot a server, returning True if successful."""
     return os.system(f"{env_paths.PSIPMI} %s power cycle" % host) == 0
@@ -0,0 +1,1321 @@
+"""
+The state_engine module keeps track of a hutch's IOCs without any gui.
+
+The IOCStateEngine holds everything we know about a hutch's IOCs:
+
+- The iocmanager.cfg config file (what should be running)
+- The status files (what was started)
+- The live status of each IOC (what is running right now)
+- Any pending edits to the config that have not been saved yet
+
+and the logic that combines them, such as finding IOCs that are running
+but not in the config and checking whether a live IOC matches its config.
+
+The StatusPoller keeps an engine up to date in a background thread.
+Several pollers can share one SharedProber, e.g. to show multiple hutches
+at once without checking the same IOC more than once.
+
+Neither of these use Qt, so they can be used from scripts, tests, and
+benchmarks without a display. The gui's IOCTableModel is an adapter that
+shows an engine in a table, see table_model.
+
+>>> engine = IOCStateEngine(config=read_config("xpp"), hutch="xpp")
+>>> StatusPoller(engine=engine).poll_once()
+>>> engine.get_desync_text("ioc-xpp-example")
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+from contextlib import AbstractContextManager, closing, nullcontext
+from copy import copy, deepcopy
+from dataclasses import dataclass, field, replace
+from enum import StrEnum
+
+from .config import (
+    Config,
+    ConfigOverlay,
+    IOCProc,
+    IOCStatusFile,
+    PortIndex,
+    diff_configs,
+    get_host_os,
+    read_config,
+    read_status_dir,
+)
+from .env_paths import env_paths
+from .epics_paths import normalize_path
+from .file_watcher import FileWatcher
+from .poll_stats import PollPhase, PollStats
+from .procserv_tools import (
+    AutoRestartMode,
+    IOCStatusLive,
+    ProcServStatus,
+    check_status,
+)
+
+logger = logging.getLogger(__name__)
+
+# How old a shared status check can be and still be used, in seconds
+PROBE_MAX_AGE = 5.0
+
+
+def _contiguous_ranges(rows: list[int]) -> list[tuple[int, int]]:
+    """
+    Group sorted row numbers into inclusive (first, last) ranges.
+
+    For example, [1, 2, 3, 7, 9, 10] becomes [(1, 3), (7, 7), (9, 10)].
+    """
+    ranges: list[tuple[int, int]] = []
+    for row in rows:
+        if ranges and ranges[-1][1] == row - 1:
+            ranges[-1] = (ranges[-1][0], row)
+        else:
+            ranges.append((row, row))
+    return ranges
+
+
+@dataclass
+class PollBatch:
+    """
+    The new and changed information from one sweep of the poll thread.
+
+    Sent to the engine all at once so that it can apply the whole sweep
+    with one refresh and a few coalesced change notifications.
+    """
+
+    status_files: list[IOCStatusFile] = field(default_factory=list)
+    status_live: list[IOCStatusLive] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.status_files or self.status_live)
+
+
+@dataclass(frozen=True)
+class DesyncInfo:
+    """
+    Used in IOCStateEngine.get_desync_info to summarize IOC desync.
+
+    IOC desync is when the live IOC and the configured IOC do not match.
+    Any non-None value here represents a live value that is different
+    than the configured value.
+
+    The has_diff parameter will be set to True if there is a desync
+    and False if the live IOC matches the configured IOC.
+    """
+
+    port: int | None = None
+    host: str | None = None
+    path: str | None = None
+    disable: bool | None = None
+    has_diff: bool = False
+
+    @classmethod
+    def from_info[T: DesyncInfo](
+        cls: type[T], ioc_proc: IOCProc, status_live: IOCStatusLive
+    ) -> T:
+        has_diff = False
+        if all((status_live.path, status_live.host, status_live.port)):
+            # IOC proc is generally well-formed, we can trust it
+            if ioc_proc.port != status_live.port:
+                port = status_live.port
+                has_diff = True
+            else:
+                port = None
+            if ioc_proc.host != status_live.host:
+                host = status_live.host
+                has_diff = True
+            else:
+                host = None
+            if ioc_proc.path != status_live.path and status_live.path != "/tmp":
+                path = status_live.path
+                has_diff = True
+            else:
+                path = None
+        else:
+            # Skip first part if any of the status info is e.g. 0, empty str
+            # This means we don't know where the IOC is running
+            port = None
+            host = None
+            path = None
+        # Covers enable/disable (if the server is up)
+        match status_live.status:
+            case ProcServStatus.INIT | ProcServStatus.DOWN | ProcServStatus.ERROR:
+                # Cannot be determined
+                disable = None
+            case ProcServStatus.NOCONNECT:
+                # IOC is not up, but could be.
+                # This is a desync if the config wants the IOC enabled.
+                if ioc_proc.disable:
+                    disable = None
+                else:
+                    disable = True
+                    has_diff = True
+            case ProcServStatus.RUNNING:
+                # IOC is up
+                # This is a desync if the config wants the IOC disabled.
+                if ioc_proc.disable:
+                    disable = False
+                    has_diff = True
+                else:
+                    disable = None
+            case ProcServStatus.SHUTDOWN:
+                # This is never correct.
+                # Either we need to restart or we need to fully kill the procServ.
+                # Report disable is exactly what it shouldn't be
+                disable = not ioc_proc.disable
+                has_diff = True
+        return cls(port=port, host=host, path=path, disable=disable, has_diff=has_diff)
+
+
+def desync_text(ioc_proc: IOCProc, ioc_live: IOCStatusLive, live_only: bool) -> str:
+    """
+    Summarize the differences between an IOC's config and live status.
+
+    Returns an empty string if there is nothing to report.
+
+    Parameters
+    ----------
+    ioc_proc : IOCProc
+        The IOC's config, including pending edits.
+    ioc_live : IOCStatusLive
+        The IOC's live status.
+    live_only : bool
+        True if the IOC is running but is not in the config.
+    """
+    if ioc_proc.hard:
+        return "HARD IOC"
+    if ioc_live.status not in (
+        ProcServStatus.RUNNING,
+        ProcServStatus.SHUTDOWN,
+        ProcServStatus.ERROR,
+    ):
+        # There isn't a meaningful comparison to check
+        return ""
+    if live_only:
+        return "Untracked IOC: Not in config!"
+    desync_info = DesyncInfo.from_info(ioc_proc=ioc_proc, status_live=ioc_live)
+    if not desync_info.has_diff:
+        # There's nothing different
+        return ""
+    text_parts = []
+    if desync_info.disable is not None:
+        if desync_info.disable:
+            if ioc_live.status == ProcServStatus.SHUTDOWN:
+                if ioc_live.autorestart_mode in (
+                    AutoRestartMode.OFF,
+                    AutoRestartMode.ONESHOT,
+                ):
+                    text_parts.append("Idle procServ")
+                else:
+                    text_parts.append("Restarting")
+            else:
+                text_parts.append("Offline")
+        else:
+            text_parts.append("Enabled")
+    if desync_info.path is not None:
+        text_parts.append(desync_info.path)
+    if desync_info.host is not None or desync_info.port is not None:
+        host = desync_info.host or ioc_proc.host
+        port = desync_info.port or ioc_proc.port
+        text_parts.append(f"on {host}:{port}")
+    if text_parts:
+        text_parts.insert(0, "Live:")
+        return " ".join(text_parts)
+    return ""
+
+
+class ChangedPart(StrEnum):
+    """
+    Which information changed for the IOCs in StateObserver.rows_changed.
+    """
+
+    # Everything about the IOC
+    ROW = "row"
+    # Only the alias
+    ALIAS = "alias"
+    # Only the live status
+    STATUS = "status"
+    # Only the differences between the live IOC and the config
+    DESYNC = "desync"
+    # Everything that depends on the status files and live status
+    LIVE = "live"
+    # Only whether the IOC's port conflicts with another IOC
+    PORT = "port"
+    # Only the OS of the IOC's host
+    HOST_OS = "host os"
+
+
+class StateObserver:
+    """
+    Base class for objects that follow the changes in an IOCStateEngine.
+
+    Rows are positions in IOCStateEngine.get_ioc_names.
+    The "about_to" methods are called before the engine changes
+    and the others are called after, which lets an adapter like
+    IOCTableModel wrap each change in e.g. beginInsertRows and endInsertRows.
+
+    Every method does nothing by default.
+    """
+
+    def rows_about_to_be_inserted(self, first: int, last: int):
+        """New IOCs will be inserted at rows first through last."""
+
+    def rows_inserted(self, first: int, last: int):
+        """New IOCs were inserted at rows first through last."""
+
+    def rows_about_to_be_removed(self, first: int, last: int):
+        """The IOCs at rows first through last will be removed."""
+
+    def rows_removed(self, first: int, last: int):
+        """The IOCs that were at rows first through last were removed."""
+
+    def layout_about_to_change(self):
+        """The IOCs will be moved to different rows."""
+
+    def layout_changed(self):
+        """The IOCs were moved to different rows."""
+
+    def rows_changed(self, first: int, last: int, part: ChangedPart):
+        """Some information changed for the IOCs at rows first through last."""
+
+
+class IOCStateEngine:
+    """
+    Everything we know about a hutch's IOCs, and the logic that combines it.
+
+    Each IOC is identified by name, and has a row: its position in
+    get_ioc_names. The rows are ordered like the gui table:
+
+    - First, the config file contents
+    - Second, any IOCs that are being added
+    - Third, any discovered IOCs that are not in the config
+
+    The live information can be updated with the update_from_* methods,
+    for example by a StatusPoller. The config can be changed with the
+    pending edit methods like add_ioc, and the result can be saved
+    using get_next_config.
+
+    This is not thread-safe. Only change the engine from one thread at a time.
+
+    Parameters
+    ----------
+    config : Config
+        The config object that represents the hutch's iocmanager config.
+    hutch : str
+        The name of the hutch.
+    observer : StateObserver, optional
+        The object to notify about each change, see StateObserver.
+    """
+
+    config: Config
+
+    def __init__(
+        self, config: Config, hutch: str, observer: StateObserver | None = None
+    ):
+        self.config = config
+        self.hutch = hutch
+        self.observer = observer or StateObserver()
+        # Local changes (not applied yet)
+        self.add_iocs: dict[str, IOCProc] = {}
+        self.edit_iocs: dict[str, IOCProc] = {}
+        self.delete_iocs: set[str] = set()
+        # Live info
+        self.live_only_iocs: dict[str, IOCProc] = {}
+        self.status_live: dict[str, IOCStatusLive] = {}
+        self.status_files: dict[str, IOCStatusFile] = {}
+        self.host_os: dict[str, str] = {}
+        # Performance caches
+        self.port_index: PortIndex
+        self.refresh_ports_taken(self.config)
+        self._row_names: list[str] | None = None
+        self._name_rows: dict[str, int] = {}
+
+    # The pending config
+    def get_next_config(self) -> Config:
+        """
+        Creates a new config including the pending edits.
+
+        This should be used when saving and applying the config.
+
+        This copies the entire config, so for reading the pending config
+        use get_next_config_view instead.
+        """
+        return self.get_next_config_view().materialize()
+
+    def get_next_config_view(self) -> ConfigOverlay:
+        """
+        View the config including the pending edits, without copying it.
+
+        Note: the priority is important: delete first, then edit, then add.
+        For example, if the user added the IOC to the table but then edited it,
+        or edited an IOC and then deleted it, we always end in the desired final
+        state.
+
+        The view does not follow later edits, so get a new one each time
+        rather than holding onto it.
+        """
+        return ConfigOverlay(
+            config=self.config,
+            add_procs=self.add_iocs,
+            edit_procs=self.edit_iocs,
+            delete_names=self.delete_iocs,
+        )
+
+    # Looking up IOCs
+    def get_ioc_names(self) -> list[str]:
+        """
+        The name of the IOC in each row.
+
+        This is cached until rows are inserted, removed, or moved,
+        so it should not be modified.
+        """
+        if self._row_names is None:
+            self._row_names = [
+                *self.config.procs,
+                *self.add_iocs,
+                *self.live_only_iocs,
+            ]
+            # An IOC can briefly have two rows, e.g. a live-only IOC that was
+            # just added to the config. Like list.index, use the first one.
+            self._name_rows = {}
+            for row, name in enumerate(self._row_names):
+                self._name_rows.setdefault(name, row)
+        return self._row_names
+
+    def get_ioc_row(self, name: str) -> int:
+        """Get the row of an IOC, or raise ValueError if there is none."""
+        self.get_ioc_names()
+        try:
+            return self._name_rows[name]
+        except KeyError:
+            raise ValueError(f"{name} is not in the table") from None
+
+    def invalidate_rows(self):
+        """Clear the cached row map, e.g. after inserting or removing rows."""
+        self._row_names = None
+        self._name_rows = {}
+
+    def get_ioc_proc(self, name: str) -> IOCProc:
+        """
+        Get the IOCProc for an IOC, including any pending edits.
+
+        When picking an IOCProc instance to return, one from the edit_iocs dict
+        will be chosen first, to make sure we use the values that include the
+        user's edits.
+        """
+        for source in (
+            self.edit_iocs,
+            self.add_iocs,
+            self.config.procs,
+            self.live_only_iocs,
+        ):
+            try:
+                return source[name]
+            except KeyError:
+                ...
+        raise RuntimeError(f"No data associated with {name}!")
+
+    def get_live_info(self, name: str) -> IOCStatusLive:
+        """
+        Return the information about a live ioc.
+
+        This uses the cached IOCStatusLive if it is fully populated,
+        but auguments it with values from the IOCStatusFile if not.
+        """
+        try:
+            live_info = deepcopy(self.status_live[name])
+        except KeyError:
+            # This might get called too early,
+            # use some default values for display purposes
+            live_info = IOCStatusLive(
+                name=name,
+                port=0,
+                host="",
+                path="",
+                pid=None,
+                status=ProcServStatus.INIT,
+                autorestart_mode=AutoRestartMode.OFF,
+            )
+        if name in self.status_files:
+            st_file = self.status_files[name]
+            for attr in ("port", "host", "pid"):
+                if not getattr(live_info, attr):
+                    setattr(live_info, attr, getattr(st_file, attr))
+            # Replace tmp with the true path
+            live_info.path = st_file.path
+        return live_info
+
+    def get_desync_info(self, name: str) -> DesyncInfo:
+        """
+        Return info about the differences between an IOC's config and live settings.
+
+        See DesyncInfo.
+        """
+        return DesyncInfo.from_info(
+            ioc_proc=self.get_ioc_proc(name=name),
+            status_live=self.get_live_info(name=name),
+        )
+
+    def get_desync_text(self, name: str) -> str:
+        """Summarize the differences between an IOC's config and live status."""
+        return desync_text(
+            ioc_proc=self.get_ioc_proc(name=name),
+            ioc_live=self.get_live_info(name=name),
+            live_only=name in self.live_only_iocs,
+        )
+
+    def pending_edits(self, name: str) -> bool:
+        """Return True if the ioc has pending edits."""
+        # Deleted is a pending edit regardless of the fields
+        if name in self.delete_iocs and name not in self.add_iocs:
+            return True
+        # Covers any normal add, edit scenario via comparing fields or to None
+        return self.get_ioc_proc(name=name) != self.config.procs.get(name)
+
+    def get_unused_port(self, host: str, closed: bool) -> int:
+        """
+        Return the smallest valid unused port for the host.
+
+        Works in the context of the current config including
+        pending edits.
+        """
+        return self.port_index.unused_port(host=host, closed=closed)
+
+    # Pending edits
+    def add_ioc(self, ioc_proc: IOCProc):
+        """
+        Add a completely new IOC to the config.
+        """
+        add_row = len(self.config.procs) + len(self.add_iocs)
+        try:
+            ioc_proc.path = normalize_path(
+                directory=ioc_proc.path, ioc_name=ioc_proc.name
+            )
+        except Exception:
+            ...
+        self.observer.rows_about_to_be_inserted(add_row, add_row)
+        self.add_iocs[ioc_proc.name] = ioc_proc
+        self.invalidate_rows()
+        self.observer.rows_inserted(add_row, add_row)
+        self._reindex_port(name=ioc_proc.name)
+        self.update_live_only_ioc(name=ioc_proc.name)
+
+    def edit_ioc(self, ioc_proc: IOCProc, part: ChangedPart | None = ChangedPart.ROW):
+        """
+        Stage an edit to an IOC.
+
+        Parameters
+        ----------
+        ioc_proc : IOCProc
+            The new settings for the IOC with the same name.
+        part : ChangedPart or None, optional
+            What to tell the observer has changed about the IOC's row,
+            or None if the caller will take care of it.
+            Changes in port conflicts are always sent.
+        """
+        self.edit_iocs[ioc_proc.name] = ioc_proc
+        if part is not None:
+            self._notify_changed(name=ioc_proc.name, part=part)
+        self._reindex_port(name=ioc_proc.name)
+
+    def delete_ioc(self, name: str):
+        """
+        Mark the IOC as pending deletion.
+        """
+        self.delete_iocs.add(name)
+        self._notify_changed(name=name, part=ChangedPart.ROW)
+        self._reindex_port(name=name)
+
+    def revert_ioc(self, name: str):
+        """
+        Revert all pending adds, edits, and deletes for an IOC.
+        """
+        row = self.get_ioc_row(name=name)
+        if name in self.add_iocs:
+            self.observer.rows_about_to_be_removed(row, row)
+        undo_add = self.add_iocs.pop(name, None)
+        undo_edit = self.edit_iocs.pop(name, None)
+        try:
+            undo_delete = self.delete_iocs.remove(name)
+        except KeyError:
+            undo_delete = None
+        if undo_add is not None:
+            self.invalidate_rows()
+            self.observer.rows_removed(row, row)
+        elif undo_edit is not None or undo_delete is not None:
+            self.observer.rows_changed(row, row, ChangedPart.ROW)
+        self.update_live_only_ioc(name=name)
+        self._reindex_port(name=name)
+
+    def reset_edits(self):
+        """
+        Removes all pending configuration edits.
+        """
+        # Order is config, added, live
+        first_added = len(self.config.procs)
+        last_added = first_added + len(self.add_iocs) - 1
+        if self.add_iocs:
+            self.observer.rows_about_to_be_removed(first_added, last_added)
+        had_adds = bool(self.add_iocs)
+        self.add_iocs.clear()
+        self.edit_iocs.clear()
+        self.delete_iocs.clear()
+        if had_adds:
+            self.invalidate_rows()
+            self.observer.rows_removed(first_added, last_added)
+        # Show the reverted edits
+        if self.get_ioc_names():
+            self.observer.rows_changed(
+                0, len(self.get_ioc_names()) - 1, ChangedPart.ROW
+            )
+        self.refresh()
+
+    def save_version(self, name: str):
+        """
+        Add the IOC's current version to its history.
+
+        This is treated as a pending edit.
+        """
+        if self._save_version(name=name):
+            self._notify_changed(name=name, part=ChangedPart.ROW)
+
+    def save_all_versions(self):
+        """For all IOCs, call save_version."""
+        names = self.get_ioc_names()
+        changed = [self._save_version(name=name) for name in list(names)]
+        if any(changed):
+            self.observer.rows_changed(0, len(names) - 1, ChangedPart.ROW)
+
+    def _save_version(self, name: str) -> bool:
+        """save_version without telling the observer. Returns True on changes."""
+        ioc_proc = deepcopy(self.get_ioc_proc(name=name))
+        if ioc_proc.path in ioc_proc.history:
+            return False
+        ioc_proc.history.insert(0, ioc_proc.path)
+        self.edit_iocs[ioc_proc.name] = ioc_proc
+        return True
+
+    def set_from_running(self, name: str):
+        """
+        Edit the IOC's config such that it matches the values found in the live status.
+
+        The IOC might be in any state: newly added, edited, deleted, or unchanged.
+        Check edited first, then added, then base config for IOCProc.
+        """
+        ioc_live = self.get_live_info(name=name)
+        edit_proc = deepcopy(self.get_ioc_proc(name=name))
+        # Check port, host, and path
+        if ioc_live.port:
+            edit_proc.port = ioc_live.port
+        if ioc_live.host:
+            edit_proc.host = ioc_live.host
+        if ioc_live.path:
+            edit_proc.path = ioc_live.path
+        # If setting from running, it must not be disabled
+        edit_proc.disable = False
+        self.edit_iocs[name] = edit_proc
+        self.update_live_only_ioc(name=name)
+        self._notify_changed(name=name, part=ChangedPart.ROW)
+        self._reindex_port(name=name)
+
+    # Updates from files and live IOCs
+    def update_from_config_file(self, config: Config):
+        """
+        Use a newly read config file, e.g. with changes from other users.
+
+        The config file contains information about:
+        - Each IOC's intended launch host, port, and other settings
+        - The configured hosts
+
+        Configs that are not newer than the one we have are ignored.
+
+        Only the rows that changed are updated: removed IOCs have their rows
+        removed, new IOCs have rows inserted in their config file positions,
+        and modified IOCs are reported as changed.
+
+        Parameters
+        ----------
+        config : Config
+            The config object that represents the hutch's iocmanager config.
+        """
+        if config.mtime <= self.config.mtime:
+            return
+        diff = diff_configs(old=self.config, new=config)
+        old_procs = self.config.procs
+        # Work on a shallow copy so we never mutate a config someone else holds.
+        # Each step below also swaps in a new procs dict rather than editing
+        # it in place, because the poll thread iterates over it without a lock.
+        self.config = copy(self.config)
+
+        # Remove rows bottom-up so the earlier row numbers stay valid
+        # Order is config, added, live so config rows are the same as proc order
+        removed_rows = [
+            row for row, name in enumerate(old_procs) if name not in config.procs
+        ]
+        for first, last in reversed(_contiguous_ranges(removed_rows)):
+            self.observer.rows_about_to_be_removed(first, last)
+            items = list(self.config.procs.items())
+            del items[first : last + 1]
+            self.config.procs = dict(items)
+            self.invalidate_rows()
+            self.observer.rows_removed(first, last)
+
+        # Very rare: someone re-ordered the file, move the rows we already have
+        if diff.reordered:
+            self.observer.layout_about_to_change()
+            self.config.procs = {
+                name: self.config.procs[name]
+                for name in config.procs
+                if name in self.config.procs
+            }
+            self.invalidate_rows()
+            self.observer.layout_changed()
+
+        # Insert rows top-down at their final positions
+        new_names = list(config.procs)
+        added_rows = [row for row, name in enumerate(new_names) if name in diff.added]
+        for first, last in _contiguous_ranges(added_rows):
+            self.observer.rows_about_to_be_inserted(first, last)
+            items = list(self.config.procs.items())
+            items[first:first] = [
+                (name, config.procs[name]) for name in new_names[first : last + 1]
+            ]
+            self.config.procs = dict(items)
+            self.invalidate_rows()
+            self.observer.rows_inserted(first, last)
+
+        # Rows now line up exactly, swap in the real config
+        self.config = config
+        for first, last in _contiguous_ranges(
+            sorted(self.get_ioc_row(name=name) for name in diff.modified)
+        ):
+            self.observer.rows_changed(first, last, ChangedPart.ROW)
+        for name in (*diff.added, *diff.removed, *diff.modified):
+            self._reindex_port(name=name)
+        self.refresh_live_only_iocs(names=(*diff.added, *diff.removed))
+
+    def update_host_os(self, host_os: dict[str, str]):
+        """
+        Use new host OS information.
+
+        Parameters
+        ----------
+        host_os : dict[str, str]
+            Mapping of hostname to OS name, as in get_host_os.
+        """
+        if host_os == self.host_os:
+            return
+        self.host_os = host_os
+        if self.get_ioc_names():
+            self.observer.rows_changed(
+                0, len(self.get_ioc_names()) - 1, ChangedPart.HOST_OS
+            )
+
+    def update_from_poll_batch(self, batch: PollBatch):
+        """
+        Apply everything that changed in one sweep of the poll thread.
+
+        This has the same effect as calling update_from_status_file and
+        update_from_live_ioc for each item in the batch, but refreshes the
+        live-only IOCs at most once and reports contiguous ranges of rows
+        rather than each IOC individually.
+
+        Parameters
+        ----------
+        batch : PollBatch
+            The status files and live statuses that changed.
+        """
+        changed_names: set[str] = set()
+        for status_file in batch.status_files:
+            if status_file != self.status_files.get(status_file.name):
+                self.status_files[status_file.name] = status_file
+                changed_names.add(status_file.name)
+        for status_live in batch.status_live:
+            if status_live != self.status_live.get(status_live.name):
+                self.status_live[status_live.name] = status_live
+                changed_names.add(status_live.name)
+        self.refresh_live_only_iocs(names=changed_names)
+        rows = []
+        for name in changed_names:
+            try:
+                rows.append(self.get_ioc_row(name=name))
+            except ValueError:
+                ...
+        for first, last in _contiguous_ranges(sorted(rows)):
+            self.observer.rows_changed(first, last, ChangedPart.LIVE)
+
+    def update_from_status_file(self, status_file: IOCStatusFile):
+        """
+        Use new information from a status file.
+
+        Status files are generated on IOC boot and contain information about
+        the IOC's pid, host, port, and version at the time of last boot.
+
+        This is primarily used to find candidates for IOCs that are live but
+        not in the configuration, and to identify what the real running
+        IOC is when different from the configuration.
+
+        Parameters
+        ----------
+        status_file : IOCStatusFile
+            Boot-time information about an IOC
+        """
+        if status_file == self.status_files.get(status_file.name):
+            return
+        self.status_files[status_file.name] = status_file
+        # The status file has the path for live-only IOCs
+        if status_file.name in self.live_only_iocs:
+            self.update_live_only_ioc(name=status_file.name)
+        self._notify_changed(name=status_file.name, part=ChangedPart.DESYNC)
+
+    def update_from_live_ioc(self, status_live: IOCStatusLive):
+        """
+        Use new information inspected from a live IOC.
+
+        This is typically gathered by using diagnostic tools like
+        ping and telnet and contains information like whether or not
+        the IOC is running, in addition to the same boot-time information
+        found in the status files.
+
+        It has priority over the status file when their shared information
+        is in conflict.
+
+        Parameters
+        ----------
+        status_live : IOCStatusLive
+            Live-inspected information about an IOC
+        """
+        if status_live == self.status_live.get(status_live.name):
+            return
+        self.status_live[status_live.name] = status_live
+        self.update_live_only_ioc(name=status_live.name)
+        self._notify_changed(name=status_live.name, part=ChangedPart.STATUS)
+        self._notify_changed(name=status_live.name, part=ChangedPart.DESYNC)
+
+    def refresh_live_only_iocs(self, names: Iterable[str] | None = None):
+        """
+        Update our cache of IOCs that are only live (and not in the config).
+
+        An IOC is live if it has a non-erroring entry in self.status_live.
+        An IOC is in the config if it is present in any of:
+        - self.config.procs
+        - self.add_iocs
+        - self.edit_iocs
+
+        Parameters
+        ----------
+        names : iterable of str, optional
+            The IOCs that might have changed. Only these are re-checked,
+            see update_live_only_ioc. By default, re-check every IOC.
+        """
+        if names is None:
+            names = [*self.live_only_iocs, *self.status_live]
+        for name in dict.fromkeys(names):
+            self.update_live_only_ioc(name=name)
+
+    def update_live_only_ioc(self, name: str):
+        """
+        Add, remove, or update one IOC in our cache of live-only IOCs.
+
+        New live-only IOCs are inserted at the end,
+        and IOCs that are no longer live-only are removed from wherever
+        they are in the live-only section.
+        See refresh_live_only_iocs.
+        """
+        old_proc = self.live_only_iocs.get(name)
+        new_proc = self._get_live_only_proc(name=name)
+        if new_proc is old_proc:
+            return
+        row_count = len(self.get_ioc_names())
+        if old_proc is None:
+            self.observer.rows_about_to_be_inserted(row_count, row_count)
+            self.live_only_iocs[name] = new_proc
+            self.invalidate_rows()
+            self.observer.rows_inserted(row_count, row_count)
+            return
+        # The same name might also be in the config now, so count from the end
+        row = (
+            row_count - len(self.live_only_iocs) + list(self.live_only_iocs).index(name)
+        )
+        if new_proc is None:
+            self.observer.rows_about_to_be_removed(row, row)
+            del self.live_only_iocs[name]
+            self.invalidate_rows()
+            self.observer.rows_removed(row, row)
+        else:
+            self.live_only_iocs[name] = new_proc
+            self.observer.rows_changed(row, row, ChangedPart.ROW)
+
+    def _get_live_only_proc(self, name: str) -> IOCProc | None:
+        """
+        Get the provisional IOCProc for an IOC that is only live.
+
+        Returns None if the IOC is not live or if it is in the config.
+        If the IOC's host, port, and path have not changed,
+        this returns the IOCProc we already have rather than
+        building a new one, which would need to look up the parent again.
+        """
+        if name in self.config.procs or name in self.add_iocs or name in self.edit_iocs:
+            return None
+        ioc_live = self.status_live.get(name)
+        # We need to be able to connect to it and get a status
+        if ioc_live is None or ioc_live.status not in ("RUNNING", "SHUTDOWN"):
+            return None
+        # IOC live never has a useful path, use status file instead
+        if name in self.status_files:
+            path = self.status_files[name].path
+        else:
+            path = ioc_live.path
+        old_proc = self.live_only_iocs.get(name)
+        if old_proc is not None and (old_proc.host, old_proc.port, old_proc.path) == (
+            ioc_live.host,
+            ioc_live.port,
+            path,
+        ):
+            return old_proc
+        return IOCProc(
+            name=name,
+            port=ioc_live.port,
+            host=ioc_live.host,
+            path=path,
+        )
+
+    def _reindex_port(self, name: str):
+        """
+        Update the port index for one IOC to match the next config.
+
+        This follows the same priority as get_next_config: pending deletes
+        first, then edits, then adds, then the config file.
+
+        If this creates or resolves a port conflict, every IOC that shares
+        the old or new host and port is reported as changed so that
+        the conflict highlighting is correct.
+        """
+        old_key = self.port_index.get_key(name=name)
+        if name in self.delete_iocs:
+            ioc_proc = None
+        else:
+            ioc_proc = (
+                self.edit_iocs.get(name)
+                or self.add_iocs.get(name)
+                or self.config.procs.get(name)
+            )
+        if ioc_proc is None:
+            self.port_index.remove(name=name)
+        else:
+            self.port_index.add(name=name, host=ioc_proc.host, port=ioc_proc.port)
+        new_key = self.port_index.get_key(name=name)
+        if old_key == new_key:
+            return
+        for key in (old_key, new_key):
+            if key is None:
+                continue
+            count = self.port_index.count(*key)
+            count_before = count + 1 if key == old_key else count - 1
+            if (count > 1) == (count_before > 1):
+                # Conflict status didn't change
+                continue
+            for user in dict.fromkeys([name, *self.port_index.users(*key)]):
+                self._notify_changed(name=user, part=ChangedPart.PORT)
+
+    def _notify_changed(self, name: str, part: ChangedPart):
+        """Tell the observer about a change to one IOC, if it has a row."""
+        try:
+            row = self.get_ioc_row(name=name)
+        except ValueError:
+            return
+        self.observer.rows_changed(row, row, part)
+
+    def refresh_ports_taken(self, config: Config | ConfigOverlay | None = None):
+        """
+        Rebuild the port index from scratch.
+
+        This is normally kept up to date incrementally, see _reindex_port.
+        """
+        if config is None:
+            config = self.get_next_config_view()
+        self.port_index = deepcopy(config.port_index)
+
+    def refresh(self):
+        """
+        Re-read the config file and rebuild the caches.
+
+        Note: added IOCs only exist as pending edits
+        and do not need to be refreshed.
+        """
+        try:
+            config = read_config(self.config.path)
+        except Exception:
+            ...
+        else:
+            self.update_from_config_file(config)
+        self.refresh_live_only_iocs()
+        self.refresh_ports_taken()
+
+
+class SharedProber:
+    """
+    Check IOC statuses on behalf of several StatusPollers.
+
+    Each host and port is only checked by one poller at a time.
+    Other pollers that ask for the same host and port while it is
+    being checked, or up to max_age seconds afterwards, get the same result.
+    The pollers also share one thread pool.
+
+    Parameters
+    ----------
+    max_age : float, optional
+        How old a result can be and still be shared, in seconds.
+    max_workers : int, optional
+        The size of the shared thread pool.
+        Defaults to the ThreadPoolExecutor default.
+    """
+
+    def __init__(self, max_age: float = PROBE_MAX_AGE, max_workers: int | None = None):
+        self.max_age = max_age
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        # How many real status checks we did, for diagnostics
+        self.probe_count = 0
+        self._lock = threading.Lock()
+        self._pending: dict[
+            tuple[str, int], concurrent.futures.Future[IOCStatusLive]
+        ] = {}
+        self._results: dict[tuple[str, int], tuple[float, IOCStatusLive]] = {}
+
+    def check_status(self, host: str, port: int, name: str) -> IOCStatusLive:
+        """
+        Same as procserv_tools.check_status, but shared with the other pollers.
+
+        The first caller for a host and port does the check in its own thread,
+        so this never waits on a thread pool slot.
+        """
+        key = (host, port)
+        with self._lock:
+            try:
+                checked, status = self._results[key]
+            except KeyError:
+                ...
+            else:
+                if time.monotonic() - checked < self.max_age:
+                    return self._with_name(status=status, name=name)
+            future = self._pending.get(key)
+            if future is None:
+                future = concurrent.futures.Future()
+                self._pending[key] = future
+                self.probe_count += 1
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            return self._with_name(status=future.result(), name=name)
+        try:
+            status = check_status(host=host, port=port, name=name)
+        except BaseException as exc:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            self._results[key] = (time.monotonic(), status)
+            del self._pending[key]
+        future.set_result(status)
+        return status
+
+    @staticmethod
+    def _with_name(status: IOCStatusLive, name: str) -> IOCStatusLive:
+        """
+        Use the requested IOC name unless the procServ told us the real one.
+        """
+        if status.name == name or status.status not in (
+            ProcServStatus.DOWN,
+            ProcServStatus.NOCONNECT,
+        ):
+            return status
+        return replace(status, name=name)
+
+    def shutdown(self):
+        """Stop the shared thread pool, without waiting for running checks."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class StatusPoller:
+    """
+    Keeps an IOCStateEngine up to date by polling in a background thread.
+
+    Uses the following sources:
+    - iocmanager.cfg config file
+    - status directory
+    - host OS directory
+    - check ioc statuses e.g. via ping, telnet from info in the above
+
+    The results are passed to the callbacks, which are called from the
+    poll thread. By default, they update the engine directly. This is only
+    safe if nothing else uses the engine while the poll is running,
+    e.g. in a script that only reads the engine after poll_once.
+    A gui should instead pass the results to its own thread,
+    see IOCTableModel.
+
+    Parameters
+    ----------
+    engine : IOCStateEngine
+        The engine to keep up to date.
+    on_config_file : callable, optional
+        Called with each new Config.
+    on_host_os : callable, optional
+        Called with each new mapping of host to OS.
+    on_poll_batch : callable, optional
+        Called with each PollBatch of changed status files and live statuses.
+    on_poll_done : callable, optional
+        Called with no arguments after each full sweep.
+    poll_interval : float, optional
+        The time in seconds between full sweeps.
+    prober : SharedProber, optional
+        Check statuses through this shared prober and its thread pool,
+        rather than on our own.
+    """
+
+    def __init__(
+        self,
+        engine: IOCStateEngine,
+        on_config_file: Callable[[Config], None] | None = None,
+        on_host_os: Callable[[dict[str, str]], None] | None = None,
+        on_poll_batch: Callable[[PollBatch], None] | None = None,
+        on_poll_done: Callable[[], None] | None = None,
+        poll_interval: float = 10.0,
+        prober: SharedProber | None = None,
+    ):
+        self.engine = engine
+        self.prober = prober
+        self.on_config_file = on_config_file or engine.update_from_config_file
+        self.on_host_os = on_host_os or engine.update_host_os
+        self.on_poll_batch = on_poll_batch or engine.update_from_poll_batch
+        self.on_poll_done = on_poll_done or (lambda: None)
+        self.poll_interval = poll_interval
+        self.poll_thread = threading.Thread(target=self._poll_loop, daemon=True)
+        self.poll_stop_ev = threading.Event()
+        self.first_poll_done = threading.Event()
+        # Recent timings from the poll thread, for diagnostics
+        self.poll_stats = PollStats()
+        # What the poll thread last sent, so it only sends changes
+        self._poll_sent_files: dict[str, IOCStatusFile] = {}
+        self._poll_sent_live: dict[str, IOCStatusLive] = {}
+        # Files are only re-read when they change
+        self.file_watcher = FileWatcher(
+            paths=(
+                engine.config.path,
+                env_paths.STATUS_DIR % engine.hutch,
+                env_paths.HOST_DIR,
+            )
+        )
+
+    def start(self):
+        """Start checking IOC statuses in the background."""
+        self.poll_stop_ev.clear()
+        self.poll_thread.start()
+
+    def stop(self):
+        """
+        Ask the background thread to stop soon.
+
+        The file watcher is closed once the thread is done with it,
+        or right away if there is no thread running.
+        """
+        self.poll_stop_ev.set()
+        self.file_watcher.interrupt()
+        if not self.poll_thread.is_alive():
+            self.file_watcher.close()
+
+    def poll_once(self):
+        """Run one full sweep in the current thread."""
+        with self._executor() as executor:
+            with self.poll_stats.time_phase(PollPhase.SWEEP):
+                self._inner_poll(executor=executor)
+
+    def _poll_loop(self):
+        """
+        Continually check the status of configured IOCs.
+
+        The IOC statuses are checked once per poll_interval.
+        Between checks, we wait on the file watcher so that changes to the
+        config file, status directory, and host directory show up right away.
+        """
+        with self._executor() as executor, closing(self.file_watcher):
+            while not self.poll_stop_ev.is_set():
+                start_time = time.monotonic()
+                try:
+                    with self.poll_stats.time_phase(PollPhase.SWEEP):
+                        self._inner_poll(executor=executor)
+                except Exception:
+                    # Keep polling, otherwise the table silently stops updating
+                    logger.exception(
+                        "Error in %s poll, will try again", self.engine.hutch
+                    )
+                while not self.poll_stop_ev.is_set():
+                    remaining = self.poll_interval - (time.monotonic() - start_time)
+                    if remaining <= 0:
+                        break
+                    changed = self.file_watcher.wait(timeout=remaining)
+                    if changed and not self.poll_stop_ev.is_set():
+                        try:
+                            self._poll_files(changed=changed)
+                        except Exception:
+                            logger.exception(
+                                "Error reading %s files, will try again",
+                                self.engine.hutch,
+                            )
+
+    def _executor(
+        self,
+    ) -> AbstractContextManager[concurrent.futures.ThreadPoolExecutor]:
+        """The shared thread pool if we have a prober, otherwise a new one."""
+        if self.prober is None:
+            return concurrent.futures.ThreadPoolExecutor()
+        return nullcontext(self.prober.executor)
+
+    def _poll_files(
+        self, changed: set[str], batch: PollBatch | None = None
+    ) -> dict[str, IOCStatusFile]:
+        """
+        Re-read the config file, host info, and status files if they changed.
+
+        Paths that aren't being watched (e.g. a config with an empty path)
+        are always re-read.
+
+        Status files that differ from what we last sent are added to batch,
+        or sent in their own batch if batch is not provided.
+
+        Returns the status files that were read, or an empty dict if the
+        status directory did not change.
+        """
+        config_path = self.engine.config.path
+        watched = self.file_watcher.paths
+        config_changed = config_path in changed or config_path not in watched
+        if config_changed or env_paths.HOST_DIR in changed:
+            try:
+                with self.poll_stats.time_phase(PollPhase.CONFIG_READ):
+                    config = read_config(config_path)
+            except Exception:
+                ...
+            else:
+                with self.poll_stats.time_phase(PollPhase.HOST_OS_READ):
+                    host_os = get_host_os(config.hosts)
+                if self.poll_stop_ev.is_set():
+                    return {}
+                self.on_config_file(config)
+                self.on_host_os(host_os)
+
+        status_files: dict[str, IOCStatusFile] = {}
+        status_dir = env_paths.STATUS_DIR % self.engine.hutch
+        if status_dir in changed or status_dir not in watched:
+            own_batch = batch is None
+            if batch is None:
+                batch = PollBatch()
+            with self.poll_stats.time_phase(PollPhase.STATUS_DIR_READ):
+                new_status_files = read_status_dir(self.engine.hutch)
+            for status_file in new_status_files:
+                if self.poll_stop_ev.is_set():
+                    return {}
+                status_files[status_file.name] = status_file
+                if status_file != self._poll_sent_files.get(status_file.name):
+                    self._poll_sent_files[status_file.name] = status_file
+                    batch.status_files.append(status_file)
+            if own_batch and batch:
+                self.on_poll_batch(batch)
+        return status_files
+
+    def _inner_poll(self, executor: concurrent.futures.ThreadPoolExecutor):
+        """
+        One poll for updates to the IOC.
+
+        This function exists to avoid deep nesting.
+        See _poll_loop.
+
+        Everything new from this sweep is sent as one PollBatch.
+
+        This repeatedly checks if the poll has been stopped to help avoid
+        referencing e.g. cleaned up qt widgets.
+        """
+        batch = PollBatch()
+        # Ensure an up-to-date config and status files
+        status_files_to_check = self._poll_files(
+            changed=self.file_watcher.changed(), batch=batch
+        )
+        if self.poll_stop_ev.is_set():
+            return
+
+        # Due to callback timing, we track the new status files locally,
+        # otherwise we might not check status-only IOCs until next poll.
+        # Include the old status files too if we haven't overriden them
+        # very rarely this is important to do, usually a no-op
+        status_files_to_check.update(self.engine.status_files)
+
+        # For each named IOC, pick one host/port to try
+        # Tracking multiple host/port per ioc is possible but not implemented yet
+        # Source priority:
+        # 1. Config file, so with pending edits we check the original host/port
+        # 2. Status file, so if we add from live and pend an edit, we check live
+        # 3. Next config, so we also include new IOCs
+        iocs_included: set[str] = set()
+        host_port_name: list[tuple[str, int, str]] = []
+        # 1. Config file
+        for ioc_name, ioc_proc in self.engine.config.procs.items():
+            if ioc_name not in iocs_included:
+                iocs_included.add(ioc_name)
+                host_port_name.append((ioc_proc.host, ioc_proc.port, ioc_name))
+        # 2. Status file
+        for ioc_name, ioc_file in status_files_to_check.items():
+            if ioc_name not in iocs_included:
+                iocs_included.add(ioc_name)
+                host_port_name.append((ioc_file.host, ioc_file.port, ioc_name))
+        # 3. Next config
+        for ioc_name, ioc_proc in self.engine.get_next_config_view().procs.items():
+            if ioc_name not in iocs_included:
+                iocs_included.add(ioc_name)
+                host_port_name.append((ioc_proc.host, ioc_proc.port, ioc_name))
+        probe_start = time.monotonic()
+        # IO-bound task, use threads via concurrent.futures module
+        futures: list[concurrent.futures.Future[IOCStatusLive]] = []
+        for host, port, name in host_port_name:
+            futures.append(
+                executor.submit(
+                    self._timed_check_status, host=host, port=port, name=name
+                )
+            )
+
+        # Collect the thread results, keeping only the ones that changed
+        for fut in futures:
+            if self.poll_stop_ev.is_set():
+                return
+            try:
+                status_live = fut.result(timeout=1.0)
+            except TimeoutError:
+                continue
+            if status_live != self._poll_sent_live.get(status_live.name):
+                self._poll_sent_live[status_live.name] = status_live
+                batch.status_live.append(status_live)
+        self.poll_stats.record_phase(
+            phase=PollPhase.PROBE, duration=time.monotonic() - probe_start
+        )
+
+        if batch:
+            with self.poll_stats.time_phase(PollPhase.EMIT):
+                self.on_poll_batch(batch)
+        self.first_poll_done.set()
+        self.on_poll_done()
+
+    def _timed_check_status(self, host: str, port: int, name: str) -> IOCStatusLive:
+        """check_status, but also record how long it took in poll_stats."""
+        start = time.monotonic()
+        try:
+            if self.prober is None:
+                return check_status(host=host, port=port, name=name)
+            return self.prober.check_status(host=host, port=port, name=name)
+        finally:
+            self.poll_stats.record_probe(
+                host=host, name=name, duration=time.monotonic() - start
+            )
@@ -0,0 +1,552 @@
+"""
+The state_store module keeps an optional local SQLite mirror of iocmanager's state.
+
+iocmanager's state lives in three places:
+
+- The iocmanager.cfg file for each hutch (what should be running)
+- The status files in $PYPS_ROOT/config/.status/$hutch (what was started)
+- The procServ instances themselves (what is running right now)
+
+The cfg files remain the source of truth. This module copies snapshots
+of all three into one indexed database so that questions that span them,
+such as "which IOCs ran version X on host Y last week", become simple queries.
+
+Nothing in iocmanager writes to the store automatically.
+Call the ingest_* methods (or sync_store) from a script or cron job
+to keep it up to date.
+
+>>> with StateStore() as store:
+...     sync_store(store)
+...     store.find_iocs(host="ioc-xpp-mot1")
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from .config import (
+    Config,
+    IOCProc,
+    IOCStatusFile,
+    get_hutch_list,
+    old_keymap,
+    read_all_configs,
+    read_status_dir,
+)
+from .env_paths import env_paths
+from .procserv_tools import IOCStatusLive
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+# Stored instead of NULL for a live IOC without a pid, e.g. one that is stopped.
+# NULLs never conflict in a UNIQUE constraint, so repeated sightings of the
+# same stopped IOC would each add a row instead of updating last_seen.
+NO_PID = -1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS config_procs (
+    hutch TEXT NOT NULL,
+    cfg_path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    host TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    alias TEXT NOT NULL,
+    disable INTEGER NOT NULL,
+    cmd TEXT NOT NULL,
+    delay INTEGER NOT NULL,
+    parent TEXT NOT NULL,
+    hard INTEGER NOT NULL,
+    history TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    PRIMARY KEY (hutch, name)
+);
+CREATE INDEX IF NOT EXISTS config_procs_name ON config_procs (name);
+CREATE INDEX IF NOT EXISTS config_procs_host_port ON config_procs (host, port);
+CREATE INDEX IF NOT EXISTS config_procs_path ON config_procs (path);
+
+CREATE TABLE IF NOT EXISTS status_history (
+    hutch TEXT NOT NULL,
+    name TEXT NOT NULL,
+    host TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    UNIQUE (hutch, name, host, port, path, pid)
+);
+CREATE INDEX IF NOT EXISTS status_history_name ON status_history (name);
+CREATE INDEX IF NOT EXISTS status_history_host_port ON status_history (host, port);
+CREATE INDEX IF NOT EXISTS status_history_path ON status_history (path);
+
+CREATE TABLE IF NOT EXISTS live_history (
+    hutch TEXT NOT NULL,
+    name TEXT NOT NULL,
+    host TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    autorestart_mode TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    UNIQUE (hutch, name, host, port, path, pid, status, autorestart_mode)
+);
+CREATE INDEX IF NOT EXISTS live_history_name ON live_history (name, last_seen);
+CREATE INDEX IF NOT EXISTS live_history_host_port ON live_history (host, port);
+CREATE INDEX IF NOT EXISTS live_history_path ON live_history (path);
+"""
+
+# procServ reports this live path when it doesn't know the real one,
+# see state_engine.DesyncInfo
+_UNKNOWN_LIVE_PATH = "/tmp"
+
+# Columns of config_procs that can be used as find_iocs keywords
+_PROC_COLUMNS = (
+    "name",
+    "host",
+    "port",
+    "path",
+    "alias",
+    "disable",
+    "cmd",
+    "delay",
+    "parent",
+    "hard",
+)
+
+
+@dataclass(frozen=True)
+class IOCRun:
+    """
+    One observation of an IOC running somewhere, from the state store.
+
+    Attributes
+    ----------
+    hutch : str
+        The hutch whose status files or procServs we were looking at.
+    name : str
+        The name of the IOC.
+    host : str
+        The host it was running on.
+    port : int
+        The procServ port it was running on.
+    path : str
+        The IOC's path, which includes its version.
+    pid : int | None
+        The process id, if known.
+    first_seen : float
+        The first time we saw this combination, as a unix timestamp.
+    last_seen : float
+        The most recent time we saw this combination, as a unix timestamp.
+    source : str
+        "status" for status files, or "live" for procServ inspection.
+    """
+
+    hutch: str
+    name: str
+    host: str
+    port: int
+    path: str
+    pid: int | None
+    first_seen: float
+    last_seen: float
+    source: str
+
+
+@dataclass(frozen=True)
+class Desync:
+    """
+    An IOC whose latest live state doesn't match its config, from the state store.
+
+    Attributes
+    ----------
+    hutch : str
+        The hutch the IOC is configured in.
+    name : str
+        The name of the IOC.
+    config_host, config_port, config_path : str, int, str
+        Where and what the config says should be running.
+    live_host, live_port, live_path : str, int, str
+        Where and what was most recently seen running.
+    last_seen : float
+        When the live state was last observed, as a unix timestamp.
+    """
+
+    hutch: str
+    name: str
+    config_host: str
+    config_port: int
+    config_path: str
+    live_host: str
+    live_port: int
+    live_path: str
+    last_seen: float
+
+
+def default_store_path() -> str:
+    """The default location of the state store database, in CACHE_DIR."""
+    return os.path.join(env_paths.CACHE_DIR, "state.sqlite")
+
+
+class StateStore:
+    """
+    A local SQLite mirror of configs, status files, and live IOC states.
+
+    Parameters
+    ----------
+    path : str, optional
+        The database file to use. Defaults to state.sqlite in CACHE_DIR.
+        Use ":memory:" for a throwaway store.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or default_store_path()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def __enter__(self) -> StateStore:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def ingest_config(self, hutch: str, config: Config) -> None:
+        """
+        Replace the stored config for hutch with this snapshot.
+
+        Parameters
+        ----------
+        hutch : str
+            The name of the hutch.
+        config : Config
+            The hutch's config, as from read_config.
+        """
+        rows = [
+            (
+                hutch,
+                config.path,
+                proc.name,
+                proc.host,
+                proc.port,
+                proc.path,
+                proc.alias,
+                int(proc.disable),
+                proc.cmd,
+                proc.delay,
+                proc.parent,
+                int(proc.hard),
+                "\n".join(proc.history),
+                config.mtime,
+            )
+            for proc in config.procs.values()
+        ]
+        with self._conn:
+            self._conn.execute("DELETE FROM config_procs WHERE hutch = ?", (hutch,))
+            self._conn.executemany(
+                "INSERT INTO config_procs VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def ingest_status_files(
+        self,
+        hutch: str,
+        status_files: Iterable[IOCStatusFile],
+        seen: float | None = None,
+    ) -> None:
+        """
+        Record a snapshot of a hutch's status files.
+
+        Status files that we've already recorded only have their
+        last_seen time updated.
+
+        Parameters
+        ----------
+        hutch : str
+            The name of the hutch.
+        status_files : iterable of IOCStatusFile
+            The status files, as from read_status_dir.
+        seen : float, optional
+            The time of the snapshot as a unix timestamp, defaults to now.
+        """
+        if seen is None:
+            seen = time.time()
+        rows = [
+            (
+                hutch,
+                stat.name,
+                stat.host,
+                stat.port,
+                stat.path,
+                stat.pid,
+                stat.mtime,
+                min(stat.mtime, seen) if stat.mtime else seen,
+                seen,
+            )
+            for stat in status_files
+        ]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO status_history VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT DO UPDATE SET "
+                "last_seen = max(last_seen, excluded.last_seen), "
+                "mtime = excluded.mtime",
+                rows,
+            )
+
+    def ingest_live(
+        self,
+        hutch: str,
+        statuses: Iterable[IOCStatusLive],
+        seen: float | None = None,
+    ) -> None:
+        """
+        Record the results of inspecting a hutch's procServ instances.
+
+        States that match one we've already recorded only have their
+        last_seen time updated.
+
+        Parameters
+        ----------
+        hutch : str
+            The name of the hutch.
+        statuses : iterable of IOCStatusLive
+            The live states, as from check_status.
+        seen : float, optional
+            The time of the inspection as a unix timestamp, defaults to now.
+        """
+        if seen is None:
+            seen = time.time()
+        rows = [
+            (
+                hutch,
+                status.name,
+                status.host,
+                status.port,
+                status.path,
+                NO_PID if status.pid is None else status.pid,
+                status.status.value,
+                status.autorestart_mode.name,
+                seen,
+                seen,
+            )
+            for status in statuses
+        ]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO live_history VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT DO UPDATE SET "
+                "last_seen = max(last_seen, excluded.last_seen), "
+                "first_seen = min(first_seen, excluded.first_seen)",
+                rows,
+            )
+
+    def find_iocs(self, **kwargs) -> list[tuple[str, IOCProc]]:
+        """
+        Find IOCs matching the inputs in any stored hutch config.
+
+        This is the indexed equivalent of config.find_iocs,
+        using the most recently ingested configs.
+
+        Parameters
+        ----------
+        **kwargs :
+            Any field in an IOC config, mapped to any value
+
+        Returns
+        -------
+        iocs : list of tuple
+            Each IOC's source config file path and config information
+        """
+        kw = kwargs.copy()
+        for old, new in old_keymap.items():
+            try:
+                kw[new] = kw.pop(old)
+            except KeyError:
+                ...
+        clauses = []
+        params = []
+        for key, value in kw.items():
+            if key not in _PROC_COLUMNS:
+                raise ValueError(f"Cannot search for IOCs by {key}")
+            clauses.append(f"{key} = ?")
+            params.append(int(value) if isinstance(value, bool) else value)
+        query = "SELECT * FROM config_procs"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY cfg_path, rowid"
+        return [
+            (row["cfg_path"], _row_to_proc(row))
+            for row in self._conn.execute(query, params)
+        ]
+
+    def history(
+        self,
+        name: str | None = None,
+        host: str | None = None,
+        port: int | None = None,
+        path: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+    ) -> list[IOCRun]:
+        """
+        Find every recorded run of IOCs matching the inputs.
+
+        For example, history(path="ioc/xpp/gige/R1.0.0", host="ioc-xpp-cam1",
+        since=time.time() - 7 * 24 * 60 * 60) shows which IOCs ran that version
+        on that host in the last week.
+
+        Parameters
+        ----------
+        name, host, port, path : optional
+            Only include runs that match these values.
+        since, until : float, optional
+            Only include runs that were seen in this range of unix timestamps.
+
+        Returns
+        -------
+        runs : list of IOCRun
+            The matching runs from both status files and live inspection,
+            oldest first.
+        """
+        clauses = []
+        params: list = []
+        for key, value in (("name", name), ("host", host), ("port", port)):
+            if value is not None:
+                clauses.append(f"{key} = ?")
+                params.append(value)
+        if path is not None:
+            clauses.append("path = ?")
+            params.append(path)
+        if since is not None:
+            clauses.append("last_seen >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("first_seen <= ?")
+            params.append(until)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        columns = (
+            f"hutch, name, host, port, path, nullif(pid, {NO_PID}) AS pid, "
+            "first_seen, last_seen"
+        )
+        query = (
+            f"SELECT {columns}, 'status' AS source FROM status_history{where} "
+            f"UNION ALL SELECT {columns}, 'live' AS source FROM live_history{where} "
+            "ORDER BY first_seen, name"
+        )
+        return [
+            IOCRun(**dict(row)) for row in self._conn.execute(query, params + params)
+        ]
+
+    def desync(self, hutch: str | None = None) -> list[Desync]:
+        """
+        Find configured IOCs whose latest live state doesn't match the config.
+
+        Only IOCs that are enabled in the config and have been
+        inspected at least once are considered.
+
+        As in the GUI, live states without a host, port, or path are skipped,
+        and a live path of /tmp is not compared, because procServ
+        often can't tell us the real path.
+
+        Parameters
+        ----------
+        hutch : str, optional
+            Only check this hutch's config.
+
+        Returns
+        -------
+        desyncs : list of Desync
+            One entry for each mismatched IOC.
+        """
+        query = """
+            WITH latest AS (
+                SELECT live_history.*, row_number() OVER (
+                    PARTITION BY name ORDER BY last_seen DESC
+                ) AS recency
+                FROM live_history
+                WHERE status = 'RUNNING'
+            )
+            SELECT
+                cfg.hutch, cfg.name,
+                cfg.host AS config_host, cfg.port AS config_port,
+                cfg.path AS config_path,
+                latest.host AS live_host, latest.port AS live_port,
+                latest.path AS live_path, latest.last_seen
+            FROM config_procs AS cfg
+            JOIN latest ON latest.name = cfg.name AND latest.recency = 1
+            WHERE cfg.disable = 0 AND cfg.hard = 0
+            AND latest.host != '' AND latest.port != 0 AND latest.path != ''
+            AND (
+                cfg.host != latest.host
+                OR cfg.port != latest.port
+                OR (cfg.path != latest.path AND latest.path != ?)
+            )
+        """
+        params = [_UNKNOWN_LIVE_PATH]
+        if hutch is not None:
+            query += " AND cfg.hutch = ?"
+            params.append(hutch)
+        query += " ORDER BY cfg.hutch, cfg.name"
+        return [Desync(**dict(row)) for row in self._conn.execute(query, params)]
+
+
+def _row_to_proc(row: sqlite3.Row) -> IOCProc:
+    # Keep the parent we found when ingesting instead of searching again
+    return IOCProc(
+        name=row["name"],
+        port=row["port"],
+        host=row["host"],
+        path=row["path"],
+        alias=row["alias"],
+        disable=bool(row["disable"]),
+        cmd=row["cmd"],
+        history=row["history"].split("\n") if row["history"] else [],
+        delay=row["delay"],
+        parent=row["parent"],
+        hard=bool(row["hard"]),
+    )
+
+
+def sync_store(store: StateStore, hutches: Iterable[str] | None = None) -> None:
+    """
+    Ingest the current config and status files for each hutch.
+
+    Parameters
+    ----------
+    store : StateStore
+        The store to update.
+    hutches : iterable of str, optional
+        The hutches to include. Defaults to every hutch from get_hutch_list.
+    """
+    if hutches is None:
+        hutches = get_hutch_list()
+    configs = read_all_configs(hutches)
+    seen = time.time()
+    for hutch, config in configs.items():
+        store.ingest_config(hutch=hutch, config=config)
+        try:
+            status_files = read_status_dir(hutch)
+        except OSError as exc:
+            logger.warning("Could not read status files for %s: %s", hutch, exc)
+            continue
+        store.ingest_status_files(hutch=hutch, status_files=status_files, seen=seen)
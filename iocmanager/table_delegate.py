@@ -9,6 +9,7 @@ See https://doc.qt.io/qt-5/qstyleditemdelegate.html#details
 
 import logging
 import os
+from functools import partial
 
 from qtpy.QtCore import (
     QAbstractItemModel,
@@ -31,7 +32,8 @@ from qtpy.QtWidgets import (
 
 from . import ui_hostname
 from .env_paths import env_paths
-from .epics_paths import get_parent, normalize_path, standard_ioc_paths
+from .epics_paths import normalize_path, standard_ioc_paths
+from .parent_resolver import ParentResolver
 from .table_model import IOCTableModel, TableColumn
 
 STATECOMBOLIST = ["Off", "Dev/Prod"]
@@ -86,7 +88,15 @@ class IOCTableDelegate(QStyledItemDelegate):
         self.hutch = hutch
         self.model = model
         self.proxy_model = proxy_model
-        self.hostdialog = HostnameDialog(parent)
+        self.dialog_parent = parent
+        self._hostdialog: HostnameDialog | None = None
+
+    @property
+    def hostdialog(self) -> HostnameDialog:
+        """The dialog for entering a new host, built on first use."""
+        if self._hostdialog is None:
+            self._hostdialog = HostnameDialog(self.dialog_parent)
+        return self._hostdialog
 
     def _source_index(self, index: QModelIndex) -> QModelIndex:
         """If we have a proxy model, convert to source model."""
@@ -148,7 +158,7 @@ class IOCTableDelegate(QStyledItemDelegate):
             if col == TableColumn.STATE:
                 items = STATECOMBOLIST
             elif col == TableColumn.HOST:
-                items = self.model.get_next_config().hosts
+                items = self.model.get_next_config_view().hosts
             elif col == TableColumn.VERSION:
                 ioc_proc = self.model.get_ioc_proc(ioc=index)
                 items = [ioc_proc.path]
@@ -280,16 +290,25 @@ class IOCTableDelegate(QStyledItemDelegate):
                         parentgui = QLineEdit()
                         parentgui.setReadOnly(True)
                         dialog_layout.addWidget(parentgui, 4, 1)
+                        resolver = ParentResolver(parent=dlg)
+                        resolver.parent_resolved.connect(
+                            partial(self.set_ioc_parent, parentgui)
+                        )
 
                         def fn(dirname):
-                            self.set_ioc_parent(parentgui, ioc_name, dirname)
+                            if dirname != "":
+                                resolver.request(directory=dirname, ioc_name=ioc_name)
 
                         dlg.directoryEntered.connect(fn)
                         dlg.currentChanged.connect(fn)
                     else:
+                        resolver = None
                         logger.error("Qt API changed, QFileDialog not QGridLayout")
 
-                    if dlg.exec_() == QDialog.Accepted:
+                    accepted = dlg.exec_() == QDialog.Accepted
+                    if resolver is not None:
+                        resolver.cancel()
+                    if accepted:
                         try:
                             directory = str(dlg.selectedFiles()[0])
                             directory = normalize_path(directory, ioc_name)
@@ -314,11 +333,10 @@ class IOCTableDelegate(QStyledItemDelegate):
                 else:
                     model.setData(index, editor.currentText())
 
-    def set_ioc_parent(self, gui: QLineEdit, ioc: str, directory: str):
-        """Slot to update the "parent" value in the new version selection dialog."""
-        if directory != "":
-            try:
-                pname = get_parent(directory, ioc)
-            except Exception:
-                pname = ""
-            gui.setText(pname)
+    def set_ioc_parent(self, gui: QLineEdit, directory: str, ioc: str, parent: str):
+        """
+        Slot to update the "parent" value in the new version selection dialog.
+
+        This receives the results from the dialog's ParentResolver.
+        """
+        gui.setText(parent)
@@ -0,0 +1,332 @@
+"""
+The table_filter module defines sorting and filtering for the main GUI table.
+
+This implements a QSortFilterProxyModel that sits between the IOCTableModel
+and the QTableView. The default QSortFilterProxyModel calls data() on the
+source model for every comparison and every filter check, which is slow
+for large hutches. Instead, this keeps precomputed sort keys and
+per-field inverted indexes for each IOC, and only recomputes them
+for the rows that the source model tells us have changed.
+
+See https://doc.qt.io/qt-5/qsortfilterproxymodel.html#details
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+
+from qtpy.QtCore import QModelIndex, QObject, QSortFilterProxyModel
+
+from .table_model import IOCTableModel, TableColumn
+
+logger = logging.getLogger(__name__)
+
+# The fields that can be used as "field:value" in the filter text
+FILTER_FIELDS = ("host", "status", "state", "version", "desync")
+
+
+@dataclass(frozen=True)
+class RowKeys:
+    """
+    The precomputed sort and filter values for one IOC.
+
+    Attributes
+    ----------
+    sort : tuple
+        The value to sort on for each TableColumn, in column order.
+    text : str
+        The lowercase name and alias, for free text matching.
+    fields : dict[str, str]
+        The lowercase value of each of the FILTER_FIELDS.
+    """
+
+    sort: tuple[str | int, ...]
+    text: str
+    fields: dict[str, str]
+
+
+@dataclass
+class IOCFilter:
+    """
+    A parsed filter from the filter text box.
+
+    The text is split on whitespace. Each term can be:
+    - "field:value", to only show IOCs where that field starts with value.
+      See FILTER_FIELDS.
+    - "desync", to only show IOCs where the live IOC doesn't match the config.
+    - Anything else, to only show IOCs with that text in the name or alias.
+
+    All matching is case-insensitive, and every term must match.
+
+    Attributes
+    ----------
+    text : list[str]
+        The free text terms.
+    fields : dict[str, list[str]]
+        The values to match for each field.
+    """
+
+    text: list[str] = field(default_factory=list)
+    fields: dict[str, list[str]] = field(default_factory=dict)
+
+    @classmethod
+    def from_text(cls, text: str) -> IOCFilter:
+        """Parse the user's filter text."""
+        ioc_filter = cls()
+        for term in text.lower().split():
+            key, sep, value = term.partition(":")
+            if not sep and key == "desync":
+                key, sep, value = "desync", ":", "yes"
+            if sep and key in FILTER_FIELDS:
+                if value:
+                    ioc_filter.fields.setdefault(key, []).append(value)
+            else:
+                ioc_filter.text.append(term)
+        return ioc_filter
+
+    def __bool__(self) -> bool:
+        return bool(self.text or self.fields)
+
+    def matches(self, keys: RowKeys) -> bool:
+        """Returns True if the IOC with these keys should be shown."""
+        for key, values in self.fields.items():
+            for value in values:
+                if not keys.fields[key].startswith(value):
+                    return False
+        return all(text in keys.text for text in self.text)
+
+
+class IOCFilterProxyModel(QSortFilterProxyModel):
+    """
+    QSortFilterProxyModel that sorts and filters the IOCTableModel quickly.
+
+    The sort key and filter values for each IOC are computed once and
+    then cached until the source model emits dataChanged for that IOC
+    or inserts or removes its row.
+    Each filter field also has an inverted index from value to IOC names,
+    so that changing the filter text doesn't need to look at every row.
+
+    Parameters
+    ----------
+    parent : QObject, optional
+        The parent object.
+    """
+
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+        self.ioc_filter = IOCFilter()
+        self._keys: dict[str, RowKeys] = {}
+        self._dirty: set[str] = set()
+        self._index: dict[str, dict[str, set[str]]] = {key: {} for key in FILTER_FIELDS}
+        # Names of IOCs that pass the filter, only used if there is a filter
+        self._accepted: set[str] = set()
+        # The sort keys in source row order, rebuilt after any change
+        self._row_sort_keys: list[tuple[str | int, ...]] = []
+
+    def sourceModel(self) -> IOCTableModel:
+        return super().sourceModel()
+
+    def setSourceModel(self, model: IOCTableModel):
+        """
+        Start sorting and filtering an IOCTableModel.
+
+        We need to learn about changes before the base class does,
+        so that the filter and sort are never working with stale keys,
+        so we connect our signals first.
+        """
+        old_model = self.sourceModel()
+        if old_model is not None:
+            old_model.dataChanged.disconnect(self._source_data_changed)
+            old_model.rowsInserted.disconnect(self._source_rows_changed)
+            old_model.rowsAboutToBeRemoved.disconnect(self._source_rows_changed)
+            old_model.modelAboutToBeReset.disconnect(self._source_about_to_reset)
+            old_model.modelReset.disconnect(self._source_reset)
+            old_model.rowsRemoved.disconnect(self._clear_row_sort_keys)
+            old_model.layoutChanged.disconnect(self._clear_row_sort_keys)
+        self._source_about_to_reset()
+        model.dataChanged.connect(self._source_data_changed)
+        model.rowsInserted.connect(self._source_rows_changed)
+        model.rowsAboutToBeRemoved.connect(self._source_rows_changed)
+        model.modelAboutToBeReset.connect(self._source_about_to_reset)
+        model.modelReset.connect(self._source_reset)
+        model.rowsRemoved.connect(self._clear_row_sort_keys)
+        model.layoutChanged.connect(self._clear_row_sort_keys)
+        self._dirty.update(model.get_ioc_row_map())
+        super().setSourceModel(model)
+
+    def set_filter_text(self, text: str):
+        """
+        Filter the table using the text from the filter box.
+
+        See IOCFilter for the syntax.
+        """
+        self.ioc_filter = IOCFilter.from_text(text)
+        self._refresh_dirty()
+        self._accepted = self._find_accepted()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        """
+        Returns True if the IOC at source_row should be shown.
+
+        https://doc.qt.io/qt-5/qsortfilterproxymodel.html#filterAcceptsRow
+        """
+        if not self.ioc_filter:
+            return True
+        if self._dirty:
+            self._refresh_dirty()
+        name = self.sourceModel().get_ioc_name(ioc=source_row)
+        return name in self._accepted
+
+    def lessThan(self, source_left: QModelIndex, source_right: QModelIndex) -> bool:
+        """
+        Returns True if the left cell should sort before the right cell.
+
+        https://doc.qt.io/qt-5/qsortfilterproxymodel.html#lessThan
+        """
+        # This is called O(n log n) times per sort, so keep it minimal
+        row_sort_keys = self._row_sort_keys or self._build_row_sort_keys()
+        column = source_left.column()
+        return (
+            row_sort_keys[source_left.row()][column]
+            < row_sort_keys[source_right.row()][column]
+        )
+
+    def get_row_keys(self, row: int) -> RowKeys:
+        """Get the up-to-date sort and filter values for the IOC at a source row."""
+        name = self.sourceModel().get_ioc_name(ioc=row)
+        if name in self._dirty or name not in self._keys:
+            self._update_keys(name=name)
+        return self._keys[name]
+
+    def _build_row_sort_keys(self) -> list[tuple[str | int, ...]]:
+        """Gather the up-to-date sort keys for every source row."""
+        self._refresh_dirty()
+        row_map = self.sourceModel().get_ioc_row_map()
+        self._row_sort_keys = [
+            self.get_row_keys(row=row).sort for row in range(len(row_map))
+        ]
+        return self._row_sort_keys
+
+    def _clear_row_sort_keys(self, *args):
+        """Forget the sort keys by row, e.g. because the rows moved."""
+        self._row_sort_keys = []
+
+    def _source_data_changed(
+        self, top_left: QModelIndex, bottom_right: QModelIndex, *args
+    ):
+        """Mark the IOCs in a dataChanged range as needing new keys."""
+        self._mark_rows_dirty(first=top_left.row(), last=bottom_right.row())
+
+    def _source_rows_changed(self, parent: QModelIndex, first: int, last: int):
+        """Mark the IOCs in inserted or soon-to-be-removed rows as needing new keys."""
+        self._mark_rows_dirty(first=first, last=last)
+
+    def _mark_rows_dirty(self, first: int, last: int):
+        row_map = self.sourceModel().get_ioc_row_map()
+        self._dirty.update(row_map[max(first, 0) : last + 1])
+        self._row_sort_keys = []
+
+    def _source_about_to_reset(self):
+        """Forget everything we know about the source model."""
+        self._keys.clear()
+        self._dirty.clear()
+        self._accepted.clear()
+        self._row_sort_keys = []
+        for index in self._index.values():
+            index.clear()
+
+    def _source_reset(self):
+        """Every IOC in the reset source model needs new keys."""
+        self._dirty.update(self.sourceModel().get_ioc_row_map())
+
+    def _refresh_dirty(self):
+        """Recompute the keys for every IOC that changed."""
+        dirty = self._dirty
+        self._dirty = set()
+        for name in dirty:
+            self._update_keys(name=name)
+
+    def _update_keys(self, name: str):
+        """
+        Recompute the keys for one IOC and update the indexes to match.
+
+        If the IOC is no longer in the table, it is dropped instead.
+        """
+        self._dirty.discard(name)
+        old_keys = self._keys.pop(name, None)
+        if old_keys is not None:
+            for key, value in old_keys.fields.items():
+                names = self._index[key][value]
+                names.discard(name)
+                if not names:
+                    del self._index[key][value]
+        self._accepted.discard(name)
+        new_keys = self._compute_keys(name=name)
+        if new_keys is None:
+            return
+        self._keys[name] = new_keys
+        for key, value in new_keys.fields.items():
+            self._index[key].setdefault(value, set()).add(name)
+        if self.ioc_filter.matches(new_keys):
+            self._accepted.add(name)
+
+    def _compute_keys(self, name: str) -> RowKeys | None:
+        """Get the keys for one IOC from the source model."""
+        model = self.sourceModel()
+        try:
+            row = model.get_ioc_row(ioc=name)
+        except ValueError:
+            return None
+        row_view = model.get_row_view(ioc=row)
+        ioc_proc = row_view.info.ioc_proc
+        sort: list[str | int] = []
+        for column in TableColumn:
+            match column:
+                case TableColumn.OSVER:
+                    try:
+                        value = model.get_display_data(ioc=row_view.info, column=column)
+                    except (KeyError, ValueError):
+                        value = ""
+                case TableColumn.PORT:
+                    value = ioc_proc.port
+                case _:
+                    value = row_view.display[column]
+            sort.append("" if value is None else value)
+        extra = row_view.display[TableColumn.EXTRA]
+        desync = bool(extra) and not ioc_proc.hard
+        return RowKeys(
+            sort=tuple(sort),
+            text=f"{ioc_proc.name}\n{ioc_proc.alias}".lower(),
+            fields={
+                "host": str(row_view.display[TableColumn.HOST] or "").lower(),
+                "status": str(row_view.display[TableColumn.STATUS] or "").lower(),
+                "state": str(row_view.display[TableColumn.STATE] or "").lower(),
+                "version": str(row_view.display[TableColumn.VERSION] or "").lower(),
+                "desync": "yes" if desync else "no",
+            },
+        )
+
+    def _find_accepted(self) -> set[str]:
+        """Use the indexes to find every IOC that passes the filter."""
+        if not self.ioc_filter:
+            return set()
+        accepted: set[str] | None = None
+        for key, values in self.ioc_filter.fields.items():
+            index = self._index[key]
+            for value in values:
+                names: set[str] = set()
+                for indexed_value, indexed_names in index.items():
+                    if indexed_value.startswith(value):
+                        names.update(indexed_names)
+                accepted = names if accepted is None else accepted & names
+        if accepted is None:
+            accepted = set(self._keys)
+        if self.ioc_filter.text:
+            accepted = {
+                name
+                for name in accepted
+                if all(text in self._keys[name].text for text in self.ioc_filter.text)
+            }
+        return accepted
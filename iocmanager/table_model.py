@@ -13,11 +13,7 @@ The data in the table represents:
 See https://doc.qt.io/qt-5/qabstracttablemodel.html#details
 """
 
-import concurrent.futures
 import logging
-import threading
-import time
-from collections import defaultdict
 from copy import deepcopy
 from dataclasses import dataclass
 from enum import IntEnum, StrEnum
@@ -29,20 +25,26 @@ from qtpy.QtWidgets import QDialog, QMessageBox, QWidget
 
 from .config import (
     Config,
+    ConfigOverlay,
     IOCProc,
     IOCStatusFile,
-    get_host_os,
-    read_config,
-    read_status_dir,
+    PortIndex,
 )
 from .dialog_add_ioc import AddIOCDialog
 from .dialog_edit_details import DetailsDialog
 from .epics_paths import normalize_path
-from .procserv_tools import (
-    AutoRestartMode,
-    IOCStatusLive,
-    ProcServStatus,
-    check_status,
+from .file_watcher import FileWatcher
+from .poll_stats import PollStats
+from .procserv_tools import IOCStatusLive, ProcServStatus
+from .state_engine import (
+    ChangedPart,
+    DesyncInfo,
+    IOCStateEngine,
+    PollBatch,
+    SharedProber,
+    StateObserver,
+    StatusPoller,
+    desync_text,
 )
 
 # Depends on the version, even pylance gets confused
@@ -121,6 +123,28 @@ table_headers = {
 }
 
 
+# Columns that depend on more than their own row, so their values can't be cached:
+# OSVER depends on the host_os mapping, PORT on every IOC's port
+UNCACHED_COLUMNS = frozenset((TableColumn.OSVER, TableColumn.PORT))
+
+
+@dataclass
+class RowView:
+    """
+    The computed display values for one row of the table.
+
+    Used in IOCTableModel.data to avoid recomputing these for every repaint.
+    Each dict maps from TableColumn to the value for that cell,
+    except for the UNCACHED_COLUMNS, which are recomputed from info.
+    A display value of None means there is nothing to show.
+    """
+
+    info: IOCModelInfo
+    display: dict[int, str | int | None]
+    foreground: dict[int, QBrush]
+    background: dict[int, QBrush]
+
+
 class StateOption(StrEnum):
     """
     Possible display values for an IOC's "state" column.
@@ -131,81 +155,72 @@ class StateOption(StrEnum):
     DEV = "Dev"
 
 
-@dataclass(frozen=True)
-class DesyncInfo:
-    """
-    Used in IOCTableModel.get_desync to summarize IOC desync.
+# The columns to refresh for each kind of change in the state engine
+part_columns = {
+    ChangedPart.ROW: (TableColumn.IOCNAME, TableColumn.EXTRA),
+    ChangedPart.ALIAS: (TableColumn.IOCNAME, TableColumn.IOCNAME),
+    ChangedPart.STATUS: (TableColumn.STATUS, TableColumn.STATUS),
+    ChangedPart.DESYNC: (TableColumn.EXTRA, TableColumn.EXTRA),
+    ChangedPart.LIVE: (TableColumn.STATUS, TableColumn.EXTRA),
+    ChangedPart.PORT: (TableColumn.PORT, TableColumn.PORT),
+    ChangedPart.HOST_OS: (TableColumn.OSVER, TableColumn.OSVER),
+}
 
-    IOC desync is when the live IOC and the configured IOC do not match.
-    Any non-None value here represents a live value that is different
-    than the configured value.
 
-    The has_diff parameter will be set to True if there is a desync
-    and False if the live IOC matches the configured IOC.
+class TableObserver(StateObserver):
     """
+    Turn the changes in an IOCStateEngine into the matching Qt model signals.
 
-    port: int | None = None
-    host: str | None = None
-    path: str | None = None
-    disable: bool | None = None
-    has_diff: bool = False
-
-    @classmethod
-    def from_info[T: DesyncInfo](
-        cls: type[T], ioc_proc: IOCProc, status_live: IOCStatusLive
-    ) -> T:
-        has_diff = False
-        if all((status_live.path, status_live.host, status_live.port)):
-            # IOC proc is generally well-formed, we can trust it
-            if ioc_proc.port != status_live.port:
-                port = status_live.port
-                has_diff = True
-            else:
-                port = None
-            if ioc_proc.host != status_live.host:
-                host = status_live.host
-                has_diff = True
-            else:
-                host = None
-            if ioc_proc.path != status_live.path and status_live.path != "/tmp":
-                path = status_live.path
-                has_diff = True
-            else:
-                path = None
-        else:
-            # Skip first part if any of the status info is e.g. 0, empty str
-            # This means we don't know where the IOC is running
-            port = None
-            host = None
-            path = None
-        # Covers enable/disable (if the server is up)
-        match status_live.status:
-            case ProcServStatus.INIT | ProcServStatus.DOWN | ProcServStatus.ERROR:
-                # Cannot be determined
-                disable = None
-            case ProcServStatus.NOCONNECT:
-                # IOC is not up, but could be.
-                # This is a desync if the config wants the IOC enabled.
-                if ioc_proc.disable:
-                    disable = None
-                else:
-                    disable = True
-                    has_diff = True
-            case ProcServStatus.RUNNING:
-                # IOC is up
-                # This is a desync if the config wants the IOC disabled.
-                if ioc_proc.disable:
-                    disable = False
-                    has_diff = True
-                else:
-                    disable = None
-            case ProcServStatus.SHUTDOWN:
-                # This is never correct.
-                # Either we need to restart or we need to fully kill the procServ.
-                # Report disable is exactly what it shouldn't be
-                disable = not ioc_proc.disable
-                has_diff = True
-        return cls(port=port, host=host, path=path, disable=disable, has_diff=has_diff)
+    Parameters
+    ----------
+    model : IOCTableModel
+        The model to emit signals from.
+    """
+
+    def __init__(self, model: "IOCTableModel"):
+        self.model = model
+        self._persistent: list[QModelIndex] = []
+        self._persistent_names: list[str] = []
+
+    def rows_about_to_be_inserted(self, first: int, last: int):
+        self.model.beginInsertRows(QModelIndex(), first, last)
+
+    def rows_inserted(self, first: int, last: int):
+        self.model.endInsertRows()
+
+    def rows_about_to_be_removed(self, first: int, last: int):
+        self.model.beginRemoveRows(QModelIndex(), first, last)
+
+    def rows_removed(self, first: int, last: int):
+        self.model.endRemoveRows()
+
+    def layout_about_to_change(self):
+        self.model.layoutAboutToBeChanged.emit()
+        # Remember which IOC each persistent index points to, e.g. the selection
+        row_names = self.model.get_ioc_row_map()
+        self._persistent = self.model.persistentIndexList()
+        self._persistent_names = [row_names[idx.row()] for idx in self._persistent]
+
+    def layout_changed(self):
+        self.model.changePersistentIndexList(
+            self._persistent,
+            [
+                self.model.index(self.model.get_ioc_row(ioc=name), idx.column())
+                for name, idx in zip(
+                    self._persistent_names, self._persistent, strict=True
+                )
+            ],
+        )
+        self._persistent = []
+        self._persistent_names = []
+        self.model.layoutChanged.emit()
+
+    def rows_changed(self, first: int, last: int, part: ChangedPart):
+        first_column, last_column = part_columns[part]
+        self.model.dataChanged.emit(
+            self.model.index(first, first_column),
+            self.model.index(last, last_column),
+        )
 
 
 class IOCTableModel(QAbstractTableModel):
@@ -216,9 +231,12 @@ class IOCTableModel(QAbstractTableModel):
     1. Allow the user to see data from and related to the config in a table format
     2. Allow the user to modify data in the config using the table
 
-    This reads to and writes from the hosts and procs parts of the
-    configuration. It also inspects the statuses of running processes
-    to show them to the user.
+    The data itself is kept in an IOCStateEngine, which is kept up to date
+    by a StatusPoller. This model shows the engine in a table and passes the
+    user's edits to the engine. See the state_engine module.
+
+    The poll thread's results are sent to the engine through qt signals
+    so that the engine is only ever modified in the gui thread.
 
     Notes on QAbstractTableModel
     (https://doc.qt.io/archives/qt-5.15/qabstracttablemodel.html#subclassing)
@@ -242,44 +260,153 @@ class IOCTableModel(QAbstractTableModel):
     ----------
     config : Config
         The config object that represents the hutch's iocmanager config.
+    hutch : str
+        The name of the hutch.
     parent : QWidget or None
         The parent qt widget if any (standard qt argument).
+    prober : SharedProber, optional
+        Share IOC status checks with the models for other hutches.
     """
 
-    config: Config
-
     signal_new_config_file = Signal(Config)
-    signal_new_status_file = Signal(IOCStatusFile)
-    signal_new_status_live = Signal(IOCStatusLive)
+    signal_new_poll_batch = Signal(PollBatch)
+    signal_new_host_os = Signal(dict)
     signal_poll_done = Signal()
 
-    def __init__(self, config: Config, hutch: str, parent: QWidget | None = None):
+    def __init__(
+        self,
+        config: Config,
+        hutch: str,
+        parent: QWidget | None = None,
+        prober: SharedProber | None = None,
+    ):
         super().__init__(parent)
-        self.config = config
         self.hutch = hutch
-        # Dialogs
+        self.engine = IOCStateEngine(
+            config=config, hutch=hutch, observer=TableObserver(model=self)
+        )
+        # Polling resources, the results come back through our signals
+        self.poller = StatusPoller(
+            engine=self.engine,
+            on_config_file=self.signal_new_config_file.emit,
+            on_host_os=self.signal_new_host_os.emit,
+            on_poll_batch=self.signal_new_poll_batch.emit,
+            on_poll_done=self.signal_poll_done.emit,
+            prober=prober,
+        )
+        # Dialogs, built the first time they are used
         self.dialog_parent = parent
-        self.dialog_add = AddIOCDialog(hutch=hutch, model=self, parent=parent)
-        self.dialog_details = DetailsDialog(parent=parent)
-        # Local changes (not applied yet)
-        self.add_iocs: dict[str, IOCProc] = {}
-        self.edit_iocs: dict[str, IOCProc] = {}
-        self.delete_iocs: set[str] = set()
+        self._dialog_add: AddIOCDialog | None = None
+        self._dialog_details: DetailsDialog | None = None
         # Performance caches
-        self.ports_taken: defaultdict[tuple[str, int], int]
-        self.refresh_ports_taken(self.config)
-        # Live info, collected in poll_thread
-        self.live_only_iocs: dict[str, IOCProc] = {}
-        self.status_live: dict[str, IOCStatusLive] = {}
-        self.status_files: dict[str, IOCStatusFile] = {}
-        self.host_os: dict[str, str] = {}
-        # Polling resources
-        self.poll_thread = threading.Thread(target=self._poll_loop, daemon=True)
-        self.poll_interval = 10.0
-        self.poll_stop_ev = threading.Event()
+        self._row_views: dict[str, RowView] = {}
         self.signal_new_config_file.connect(self.update_from_config_file)
-        self.signal_new_status_file.connect(self.update_from_status_file)
-        self.signal_new_status_live.connect(self.update_from_live_ioc)
+        self.signal_new_poll_batch.connect(self.update_from_poll_batch)
+        self.signal_new_host_os.connect(self.update_host_os)
+        # Any change in which IOC is in which row
+        self.rowsInserted.connect(self._invalidate_row_map)
+        self.rowsRemoved.connect(self._invalidate_row_map)
+        self.layoutChanged.connect(self._invalidate_row_map)
+        self.modelReset.connect(self._invalidate_row_map)
+        # Any change to what is displayed in a row
+        self.dataChanged.connect(self._invalidate_row_views)
+
+    # The engine's state, for convenience
+    @property
+    def config(self) -> Config:
+        """The config file contents, without pending edits."""
+        return self.engine.config
+
+    @property
+    def add_iocs(self) -> dict[str, IOCProc]:
+        """IOCs pending addition."""
+        return self.engine.add_iocs
+
+    @property
+    def edit_iocs(self) -> dict[str, IOCProc]:
+        """IOCs with pending edits."""
+        return self.engine.edit_iocs
+
+    @property
+    def delete_iocs(self) -> set[str]:
+        """Names of IOCs pending deletion."""
+        return self.engine.delete_iocs
+
+    @property
+    def live_only_iocs(self) -> dict[str, IOCProc]:
+        """IOCs that are running but are not in the config."""
+        return self.engine.live_only_iocs
+
+    @property
+    def status_live(self) -> dict[str, IOCStatusLive]:
+        """The latest live status of each IOC."""
+        return self.engine.status_live
+
+    @property
+    def status_files(self) -> dict[str, IOCStatusFile]:
+        """The latest status file of each IOC."""
+        return self.engine.status_files
+
+    @property
+    def host_os(self) -> dict[str, str]:
+        """The OS of each host."""
+        return self.engine.host_os
+
+    @property
+    def port_index(self) -> PortIndex:
+        """The ports used on each host in the pending config."""
+        return self.engine.port_index
+
+    # The poller's state, for convenience
+    @property
+    def poll_thread(self):
+        """The background thread that checks IOC statuses."""
+        return self.poller.poll_thread
+
+    @property
+    def poll_interval(self) -> float:
+        """The time in seconds between full poll sweeps."""
+        return self.poller.poll_interval
+
+    @poll_interval.setter
+    def poll_interval(self, value: float):
+        self.poller.poll_interval = value
+
+    @property
+    def first_poll_done(self):
+        """Event that is set after the first full poll sweep."""
+        return self.poller.first_poll_done
+
+    @property
+    def poll_stats(self) -> PollStats:
+        """Recent timings from the poll thread, for diagnostics."""
+        return self.poller.poll_stats
+
+    @property
+    def file_watcher(self) -> FileWatcher:
+        """Watches the files that the poll thread reads."""
+        return self.poller.file_watcher
+
+    @property
+    def dialog_add(self) -> AddIOCDialog:
+        """
+        The dialog for adding new IOCs.
+
+        This is a file dialog that scans the filesystem, so we wait to
+        build it until the user first asks to add an IOC.
+        """
+        if self._dialog_add is None:
+            self._dialog_add = AddIOCDialog(
+                hutch=self.hutch, model=self, parent=self.dialog_parent
+            )
+        return self._dialog_add
+
+    @property
+    def dialog_details(self) -> DetailsDialog:
+        """The dialog for editing IOC details, built on first use."""
+        if self._dialog_details is None:
+            self._dialog_details = DetailsDialog(parent=self.dialog_parent)
+        return self._dialog_details
 
     # Main external business logic
     def get_next_config(self) -> Config:
@@ -289,43 +416,25 @@ class IOCTableModel(QAbstractTableModel):
         This should be used when the user asks to save and apply config to decide
         which config to apply.
 
-        Note: the order is important: add first, then edit, then delete.
-        This creates a priority for IOCs that are included in multiple local change
-        categories.
-        For example, if the user added the IOC to the table but then edited it,
-        or edited an IOC and then deleted it, we always end in the desired final
-        state.
-        """
-        config = deepcopy(self.config)
-        for ioc_proc in self.add_iocs.values():
-            config.add_proc(proc=ioc_proc)
-        for ioc_proc in self.edit_iocs.values():
-            config.update_proc(proc=ioc_proc)
-        for ioc_name in self.delete_iocs:
-            config.delete_proc(ioc_name=ioc_name)
-        return config
+        See IOCStateEngine.get_next_config.
+        """
+        return self.engine.get_next_config()
+
+    def get_next_config_view(self) -> ConfigOverlay:
+        """
+        View the config including the edits made by the user, without copying it.
+
+        See IOCStateEngine.get_next_config_view.
+        """
+        return self.engine.get_next_config_view()
 
     def reset_edits(self):
         """
         Removes pending configuration edits.
         """
-        # Removes rows equal to the len of self.add_iocs
-        # Order is config, added, live
-        if self.add_iocs:
-            self.beginRemoveRows(
-                QModelIndex(),
-                len(self.config.procs),
-                len(self.config.procs) + len(self.add_iocs) - 1,
-            )
-            finish_remove = True
-        else:
-            finish_remove = False
-        self.add_iocs.clear()
-        self.edit_iocs.clear()
-        self.delete_iocs.clear()
-        if finish_remove:
-            self.endRemoveRows()
-        self.refresh_all()
+        self.engine.reset_edits()
+        # Make sure the poll re-reads everything too
+        self.file_watcher.mark_changed()
 
     # Basic helpers
     def get_ioc_info(self, ioc: IOCModelIdentifier) -> IOCModelInfo:
@@ -383,14 +492,60 @@ class IOCTableModel(QAbstractTableModel):
         """
         Define the row -> name mapping for the table.
 
-        We'll define the rows in the apparent dictionary order:
-        - First, the config file contents
-        - Second, any IOCs that are being added
-        - Third, any discovered IOCs that are not in the config
+        See IOCStateEngine.get_ioc_names.
+        This is cached, so it should not be modified.
+        """
+        return self.engine.get_ioc_names()
+
+    def _invalidate_row_map(self, *args):
+        """Clear the cached row map, e.g. after inserting or removing rows."""
+        self.engine.invalidate_rows()
+        self._row_views.clear()
+
+    def _invalidate_row_views(
+        self, top_left: QModelIndex, bottom_right: QModelIndex, *args
+    ):
+        """Clear the cached RowView for every row in a dataChanged range."""
+        first = max(top_left.row(), 0)
+        last = bottom_right.row()
+        if last - first + 1 >= len(self._row_views):
+            self._row_views.clear()
+            return
+        row_map = self.get_ioc_row_map()
+        for row in range(first, min(last + 1, len(row_map))):
+            self._row_views.pop(row_map[row], None)
 
-        See get_ioc_proc.
+    def get_row_view(self, ioc: IOCModelIdentifier) -> RowView:
         """
-        return list(self.config.procs) + list(self.add_iocs) + list(self.live_only_iocs)
+        Get the cached display values for one row, computing them if needed.
+
+        The cache for a row is cleared whenever dataChanged is emitted for it,
+        which we already need to do for the view to show the new values.
+        Columns in UNCACHED_COLUMNS only have their IOCModelInfo cached.
+        """
+        ioc_name = self.get_ioc_name(ioc=ioc)
+        try:
+            return self._row_views[ioc_name]
+        except KeyError:
+            ...
+        ioc_info = self.get_ioc_info(ioc=ioc_name)
+        row_view = RowView(info=ioc_info, display={}, foreground={}, background={})
+        for column in TableColumn:
+            if column in UNCACHED_COLUMNS:
+                continue
+            try:
+                display = self.get_display_data(ioc=ioc_info, column=column)
+            except (KeyError, ValueError):
+                display = None
+            row_view.display[column] = display
+            row_view.foreground[column] = QBrush(
+                self.get_foreground_color(ioc=ioc_info, column=column)
+            )
+            row_view.background[column] = QBrush(
+                self.get_background_color(ioc=ioc_info, column=column)
+            )
+        self._row_views[ioc_name] = row_view
+        return row_view
 
     def get_ioc_name(self, ioc: IOCModelIdentifier) -> str:
         """For any valid ioc identifier, get the name."""
@@ -412,53 +567,17 @@ class IOCTableModel(QAbstractTableModel):
         """
         For any valid ioc identifier, get the correct IOCProc instance.
 
-        When picking an IOCProc instance to return, one from the edit_iocs dict
-        will be chosen first, to make sure we display and edit the values that
-        include the user's edits.
+        This includes the user's edits, see IOCStateEngine.get_ioc_proc.
         """
-        ioc_name = self.get_ioc_name(ioc=ioc)
-        for source in (
-            self.edit_iocs,
-            self.add_iocs,
-            self.config.procs,
-            self.live_only_iocs,
-        ):
-            try:
-                return source[ioc_name]
-            except KeyError:
-                ...
-        raise RuntimeError(f"No data associated with {ioc_name}!")
+        return self.engine.get_ioc_proc(name=self.get_ioc_name(ioc=ioc))
 
     def get_live_info(self, ioc: IOCModelIdentifier) -> IOCStatusLive:
         """
         Return the information about a live ioc.
 
-        This uses the cached IOCStatusLive if it is fully populated,
-        but auguments it with values from the IOCStatusFile if not.
+        See IOCStateEngine.get_live_info.
         """
-        ioc_name = self.get_ioc_name(ioc=ioc)
-        try:
-            live_info = deepcopy(self.status_live[ioc_name])
-        except KeyError:
-            # This might get called too early,
-            # use some default values for display purposes
-            live_info = IOCStatusLive(
-                name=ioc_name,
-                port=0,
-                host="",
-                path="",
-                pid=None,
-                status=ProcServStatus.INIT,
-                autorestart_mode=AutoRestartMode.OFF,
-            )
-        if ioc_name in self.status_files:
-            st_file = self.status_files[ioc_name]
-            for attr in ("port", "host", "pid"):
-                if not getattr(live_info, attr):
-                    setattr(live_info, attr, getattr(st_file, attr))
-            # Replace tmp with the true path
-            live_info.path = st_file.path
-        return live_info
+        return self.engine.get_live_info(name=self.get_ioc_name(ioc=ioc))
 
     def get_ioc_row(self, ioc: IOCModelIdentifier) -> int:
         """
@@ -466,8 +585,7 @@ class IOCTableModel(QAbstractTableModel):
         """
         if isinstance(ioc, int):
             return ioc
-        ioc_name = self.get_ioc_name(ioc=ioc)
-        return self.get_ioc_row_map().index(ioc_name)
+        return self.engine.get_ioc_row(name=self.get_ioc_name(ioc=ioc))
 
     # Implement QAbstractTableModel API
     def rowCount(self, parent: QModelIndex | None = None) -> int:
@@ -508,16 +626,35 @@ class IOCTableModel(QAbstractTableModel):
             # Invalid or off the table
             return QVariant()
         column = index.column()
+        row_view = self.get_row_view(ioc=index.row())
+        if column in UNCACHED_COLUMNS:
+            match role:
+                case Qt.DisplayRole | Qt.EditRole:
+                    try:
+                        return self.get_display_data(ioc=row_view.info, column=column)
+                    except (KeyError, ValueError):
+                        return QVariant()
+                case Qt.ForegroundRole:
+                    return QBrush(
+                        self.get_foreground_color(ioc=row_view.info, column=column)
+                    )
+                case Qt.BackgroundRole:
+                    return QBrush(
+                        self.get_background_color(ioc=row_view.info, column=column)
+                    )
+                case _:
+                    # Unsupported role
+                    return QVariant()
         match role:
             case Qt.DisplayRole | Qt.EditRole:
-                try:
-                    return self.get_display_data(ioc=index, column=column)
-                except (KeyError, ValueError):
+                display = row_view.display[column]
+                if display is None:
                     return QVariant()
+                return display
             case Qt.ForegroundRole:
-                return QBrush(self.get_foreground_color(ioc=index, column=column))
+                return row_view.foreground[column]
             case Qt.BackgroundRole:
-                return QBrush(self.get_background_color(ioc=index, column=column))
+                return row_view.background[column]
             case _:
                 # Unsupported role
                 return QVariant()
@@ -554,47 +691,12 @@ class IOCTableModel(QAbstractTableModel):
             case TableColumn.PARENT:
                 return ioc_proc.parent
             case TableColumn.EXTRA:
-                if ioc_proc.hard:
-                    return "HARD IOC"
                 # Goal: summarize differences between configured and running
-                if ioc_live.status not in (
-                    ProcServStatus.RUNNING,
-                    ProcServStatus.SHUTDOWN,
-                    ProcServStatus.ERROR,
-                ):
-                    # There isn't a meaningful comparison to check
-                    return ""
-                if ioc_info.name in self.live_only_iocs:
-                    return "Untracked IOC: Not in config!"
-                desync_info = self.get_desync_info(ioc=ioc_info)
-                if not desync_info.has_diff:
-                    # There's nothing different
-                    return ""
-                text_parts = []
-                if desync_info.disable is not None:
-                    if desync_info.disable:
-                        if ioc_live.status == ProcServStatus.SHUTDOWN:
-                            if ioc_live.autorestart_mode in (
-                                AutoRestartMode.OFF,
-                                AutoRestartMode.ONESHOT,
-                            ):
-                                text_parts.append("Idle procServ")
-                            else:
-                                text_parts.append("Restarting")
-                        else:
-                            text_parts.append("Offline")
-                    else:
-                        text_parts.append("Enabled")
-                if desync_info.path is not None:
-                    text_parts.append(desync_info.path)
-                if desync_info.host is not None or desync_info.port is not None:
-                    host = desync_info.host or ioc_proc.host
-                    port = desync_info.port or ioc_proc.port
-                    text_parts.append(f"on {host}:{port}")
-                if text_parts:
-                    text_parts.insert(0, "Live:")
-                    return " ".join(text_parts)
-                return ""
+                return desync_text(
+                    ioc_proc=ioc_proc,
+                    ioc_live=ioc_live,
+                    live_only=ioc_info.name in self.live_only_iocs,
+                )
             case _:
                 raise ValueError(f"Invalid column {column}")
 
@@ -734,7 +836,7 @@ class IOCTableModel(QAbstractTableModel):
                 ...
             case TableColumn.PORT:
                 # Port conflicts are bad! Red bad!
-                if self.ports_taken[(ioc_proc.host, ioc_proc.port)] > 1:
+                if self.port_index.count(host=ioc_proc.host, port=ioc_proc.port) > 1:
                     return Qt.red
             case TableColumn.VERSION:
                 ...
@@ -809,11 +911,8 @@ class IOCTableModel(QAbstractTableModel):
                 logger.debug(f"Invalid column {index.column()}")
                 return False
         # Write succeeded!
-        self.edit_iocs[new_proc.name] = new_proc
-        # Port cache handling
-        if index.column() in (TableColumn.HOST, TableColumn.PORT):
-            self.ports_taken[(ioc_proc.host, ioc_proc.port)] -= 1
-            self.ports_taken[(new_proc.host, new_proc.port)] += 1
+        # Port color might have changed for other IOCs too, the engine handles it
+        self.engine.edit_ioc(ioc_proc=new_proc, part=None)
         self.dataChanged.emit(index, index)
         if index.column() == TableColumn.HOST:
             # Port color might have changed
@@ -870,277 +969,52 @@ class IOCTableModel(QAbstractTableModel):
     # Methods for updating the data using our dataclasses
     def start_poll_thread(self):
         """Public API to start checking IOC statuses in the background."""
-        self.poll_stop_ev.clear()
-        self.poll_thread.start()
+        self.poller.start()
 
     def stop_poll_thread(self):
-        self.poll_stop_ev.set()
+        self.poller.stop()
 
-    def _poll_loop(self):
+    def update_from_config_file(self, config: Config):
         """
-        Continually check the status of configured IOCs.
+        Update the GUI when the config file changes, e.g. from other users.
 
-        Uses the following sources to update the table:
-        - iocmanager.cfg config file
-        - status directory
-        - check ioc statuses e.g. via ping, telnet from info in the above
+        Only the rows that changed are updated, which keeps the user's
+        selection and scroll position intact.
+        See IOCStateEngine.update_from_config_file.
         """
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            stopped = False
-            while not stopped:
-                start_time = time.monotonic()
-                self._inner_poll(executor=executor)
-                duration = time.monotonic() - start_time
-                if duration < self.poll_interval:
-                    stopped = self.poll_stop_ev.wait(self.poll_interval - duration)
-                else:
-                    stopped = self.poll_stop_ev.is_set()
+        self.engine.update_from_config_file(config=config)
 
-    def _inner_poll(self, executor: concurrent.futures.ThreadPoolExecutor):
+    def update_host_os(self, host_os: dict[str, str]):
         """
-        One poll for updates to the IOC.
-
-        This function exists to avoid deep nesting.
-        See _poll_loop.
+        Update the GUI when a host's OS information changes.
 
-        This repeatedly checks if the poll has been stopped to help avoid
-        referencing cleaned up qt widgets.
+        Only the OS column is refreshed.
         """
-        # Ensure an up-to-date config
-        try:
-            config = read_config(self.config.path)
-        except Exception:
-            ...
-        else:
-            self.host_os = get_host_os(config.hosts)
-            if self.poll_stop_ev.is_set():
-                return
-            self.signal_new_config_file.emit(config)
-
-        # Due to signal/slot timing, if we don't track these locally
-        # we might not check status-only IOCs until next poll
-        status_files_to_check: dict[str, IOCStatusFile] = {}
-        for status_file in read_status_dir(self.hutch):
-            if self.poll_stop_ev.is_set():
-                return
-            self.signal_new_status_file.emit(status_file)
-            status_files_to_check[status_file.name] = status_file
-        # Include the old status files too if we haven't overriden them
-        # very rarely this is important to do, usually a no-op
-        status_files_to_check.update(self.status_files)
-
-        # For each named IOC, pick one host/port to try
-        # Tracking multiple host/port per ioc is possible but not implemented yet
-        # Source priority:
-        # 1. Config file, so with pending edits we check the original host/port
-        # 2. Status file, so if we add from live and pend an edit, we check live
-        # 3. Next config, so we also include new IOCs
-        iocs_included: set[str] = set()
-        host_port_name: list[tuple[str, int, str]] = []
-        # 1. Config file
-        for ioc_name, ioc_proc in self.config.procs.items():
-            if ioc_name not in iocs_included:
-                iocs_included.add(ioc_name)
-                host_port_name.append((ioc_proc.host, ioc_proc.port, ioc_name))
-        # 2. Status file
-        for ioc_name, ioc_file in status_files_to_check.items():
-            if ioc_name not in iocs_included:
-                iocs_included.add(ioc_name)
-                host_port_name.append((ioc_file.host, ioc_file.port, ioc_name))
-        # 3. Next config
-        for ioc_name, ioc_proc in self.get_next_config().procs.items():
-            if ioc_name not in iocs_included:
-                iocs_included.add(ioc_name)
-                host_port_name.append((ioc_proc.host, ioc_proc.port, ioc_name))
-        # IO-bound task, use threads via concurrent.futures module
-        futures: list[concurrent.futures.Future[IOCStatusLive]] = []
-        for host, port, name in host_port_name:
-            futures.append(
-                executor.submit(check_status, host=host, port=port, name=name)
-            )
+        self.engine.update_host_os(host_os=host_os)
 
-        # Collect the thread results and apply them
-        for fut in futures:
-            if self.poll_stop_ev.is_set():
-                return
-            try:
-                self.signal_new_status_live.emit(fut.result(timeout=1.0))
-            except TimeoutError:
-                ...
-
-        self.signal_poll_done.emit()
-
-    def update_from_config_file(self, config: Config):
+    def update_from_poll_batch(self, batch: PollBatch):
         """
-        Update the GUI when the config file changes, e.g. from other users.
+        Apply everything that changed in one sweep of the poll thread.
 
-        The config file contains information about:
-        - Each IOC's intended launch host, port, and other settings
-        - The configured hosts
-
-        The StatusPollThread calls this function cyclically with an up-to-date Config.
-
-        Parameters
-        ----------
-        config : Config
-            The config object that represents the hutch's iocmanager config.
+        See IOCStateEngine.update_from_poll_batch.
         """
-        if config.mtime <= self.config.mtime:
-            return
-        # This might add or remove rows in the config section
-        # Order is config, added, live
-        old_size = len(self.config.procs)
-        new_size = len(config.procs)
-        delta = new_size - old_size
-        if delta > 0:
-            self.beginInsertRows(
-                QModelIndex(),
-                old_size,
-                new_size - 1,
-            )
-        elif delta < 0:
-            self.beginRemoveRows(
-                QModelIndex(),
-                new_size,
-                old_size - 1,
-            )
-        self.config = config
-        if delta > 0:
-            self.endInsertRows()
-        elif delta < 0:
-            self.endRemoveRows()
-        # It should be faster to tell most everything to update than to pick cells
-        # Technically we could skip the status columns but it's ok
-        self._emit_config_changed()
-        self.refresh_ports_taken()
+        self.engine.update_from_poll_batch(batch=batch)
 
     def update_from_status_file(self, status_file: IOCStatusFile):
         """
         Update the GUI from information in a status file.
 
-        Status files are generated on IOC boot and contain information about
-        the IOC's pid, host, port, and version at the time of last boot.
-
-        The StatusPollThread calls this function cyclically with up-to-date
-        status files.
-
-        This is primarily used to find candidates for IOCs that are live but
-        not in the configuration.
-
-        This also impacts the contents of the "extra" column in the table,
-        which can help us identify what the real running
-        IOC is when different from the configuration.
-
-        Parameters
-        ----------
-        status_file : IOCStatusFile
-            Boot-time information about an IOC
+        See IOCStateEngine.update_from_status_file.
         """
-        if status_file != self.status_files.get(status_file.name):
-            self.status_files[status_file.name] = status_file
-            # Update extra cell if IOC exists
-            try:
-                row = self.get_ioc_row(ioc=status_file.name)
-            except Exception:
-                return
-            idx = self.index(row, TableColumn.EXTRA)
-            self.dataChanged.emit(idx, idx)
+        self.engine.update_from_status_file(status_file=status_file)
 
     def update_from_live_ioc(self, status_live: IOCStatusLive):
         """
         Update the GUI from information inspected from a live IOC.
 
-        This is typically gathered by using diagnostic tools like
-        ping and telnet and contains information like whether or not
-        the IOC is running, in addition to the same boot-time information
-        found in the status files.
-
-        Functionally, this can impact the "status" and "extra" information.
-        It has priority over the status file when their shared information
-        is in conflict.
-
-        Parameters
-        ----------
-        status_live : IOCStatusLive
-            Live-inspected information about an IOC
+        See IOCStateEngine.update_from_live_ioc.
         """
-        if status_live != self.status_live.get(status_live.name):
-            self.status_live[status_live.name] = status_live
-            self.refresh_live_only_iocs()
-            # Update status, extra cells if IOC exists
-            try:
-                row = self.get_ioc_row(ioc=status_live)
-            except Exception:
-                return
-            idx1 = self.index(row, TableColumn.STATUS)
-            idx2 = self.index(row, TableColumn.EXTRA)
-            self.dataChanged.emit(idx1, idx1)
-            self.dataChanged.emit(idx2, idx2)
-
-    def refresh_live_only_iocs(self):
-        """
-        Update our cache of IOCs that are only live (and not in the config).
-
-        An IOC is live if it has a non-erroring entry in self.status_live.
-        An IOC is in the config if it is present in any of:
-        - self.config.procs
-        - self.add_iocs
-        - self.edit_iocs
-        """
-        old_live_only = self.live_only_iocs
-        new_live_only = {}
-        for ioc_name, ioc_live in self.status_live.items():
-            if ioc_name in self.config.procs:
-                continue
-            if ioc_name in self.add_iocs:
-                continue
-            if ioc_name in self.edit_iocs:
-                continue
-            # We were able to connect to it and get a status
-            if ioc_live.status in ("RUNNING", "SHUTDOWN"):
-                # IOC live never has a useful path, use status file instead
-                if ioc_name in self.status_files:
-                    path = self.status_files[ioc_name].path
-                else:
-                    path = ioc_live.path
-                new_live_only[ioc_name] = IOCProc(
-                    name=ioc_name,
-                    port=ioc_live.port,
-                    host=ioc_live.host,
-                    path=path,
-                )
-        # This might add or remove rows
-        old_size = len(old_live_only)
-        new_size = len(new_live_only)
-        delta = new_size - old_size
-        # Add rows to the end
-        if delta > 0:
-            self.beginInsertRows(
-                QModelIndex(),
-                self.rowCount(),
-                self.rowCount() + delta - 1,
-            )
-        # Remove rows from the end
-        elif delta < 0:
-            self.beginRemoveRows(
-                QModelIndex(),
-                self.rowCount() + delta,
-                self.rowCount() - 1,
-            )
-        self.live_only_iocs = new_live_only
-        if delta > 0:
-            self.endInsertRows()
-        elif delta < 0:
-            self.endRemoveRows()
-        if self.live_only_iocs:
-            self._emit_live_only_changed()
-
-    def refresh_ports_taken(self, config: Config | None = None):
-        if config is None:
-            config = self.get_next_config()
-        self.ports_taken = defaultdict(int)
-        for ioc_proc in config.procs.values():
-            self.ports_taken[(ioc_proc.host, ioc_proc.port)] += 1
+        self.engine.update_from_live_ioc(status_live=status_live)
 
     def refresh_all(self):
         """
@@ -1149,19 +1023,10 @@ class IOCTableModel(QAbstractTableModel):
         This includes:
         - The config file information
         - The live IOC information
-
-        Note: added IOCs only exist as items
-        in this application and do not need to
-        be refreshed.
         """
-        try:
-            config = read_config(self.config.path)
-        except Exception:
-            ...
-        else:
-            self.update_from_config_file(config)
-        self.refresh_live_only_iocs()
-        self.refresh_ports_taken()
+        self.engine.refresh()
+        # Make sure the poll re-reads everything too
+        self.file_watcher.mark_changed()
 
     # User Dialogs
     def add_ioc_dialog(self) -> str:
@@ -1214,7 +1079,7 @@ class IOCTableModel(QAbstractTableModel):
                 QMessageBox.Ok,
             )
             return (True, "")
-        if ioc_proc.name in self.get_next_config().procs:
+        if ioc_proc.name in self.get_next_config_view().procs:
             QMessageBox.critical(
                 self.dialog_parent,
                 "Error",
@@ -1240,34 +1105,19 @@ class IOCTableModel(QAbstractTableModel):
         new_proc = self.dialog_details.get_ioc_proc()
 
         if new_proc != ioc_proc:
-            self.edit_iocs[new_proc.name] = new_proc
-            self.ports_taken[(ioc_proc.host, ioc_proc.port)] -= 1
-            self.ports_taken[(new_proc.host, new_proc.port)] += 1
-        if new_proc.alias != ioc_proc.alias:
-            index = self.index(ioc_info.row, TableColumn.IOCNAME)
-            self.dataChanged.emit(index, index)
+            # The alias is the only detail shown in the table
+            if new_proc.alias != ioc_proc.alias:
+                part = ChangedPart.ALIAS
+            else:
+                part = None
+            self.engine.edit_ioc(ioc_proc=new_proc, part=part)
 
     # Basic utility helpers
     def add_ioc(self, ioc_proc: IOCProc):
         """
         Add a completely new IOC to the config.
         """
-        add_row = len(self.config.procs) + len(self.add_iocs)
-        try:
-            ioc_proc.path = normalize_path(
-                directory=ioc_proc.path, ioc_name=ioc_proc.name
-            )
-        except Exception:
-            ...
-        self.beginInsertRows(
-            QModelIndex(),
-            add_row,
-            add_row,
-        )
-        self.add_iocs[ioc_proc.name] = ioc_proc
-        self.ports_taken[(ioc_proc.host, ioc_proc.port)] += 1
-        self.endInsertRows()
-        self.refresh_live_only_iocs()
+        self.engine.add_ioc(ioc_proc=ioc_proc)
 
     def delete_ioc(self, ioc: IOCModelIdentifier):
         """
@@ -1275,73 +1125,16 @@ class IOCTableModel(QAbstractTableModel):
 
         Refreshes that row to pick up the color updates.
         """
-        ioc_info = self.get_ioc_info(ioc=ioc)
-        self.delete_iocs.add(ioc_info.name)
-        self.ports_taken[(ioc_info.ioc_proc.host, ioc_info.ioc_proc.port)] -= 1
-        self._emit_row_changed(ioc_info.row)
+        self.engine.delete_ioc(name=self.get_ioc_info(ioc=ioc).name)
 
     def revert_ioc(self, ioc: IOCModelIdentifier):
         """
         Revert all pending adds, edits, and deletes for an IOC.
 
         Refreshes the row in the case of reverting edits and deletes,
-        or the added rows section in the case of reverting an add.
+        or removes the row in the case of reverting an add.
         """
-        ioc_info = self.get_ioc_info(ioc=ioc)
-        ioc_name = ioc_info.name
-        row = ioc_info.row
-        if ioc_name in self.add_iocs:
-            self.beginRemoveRows(
-                QModelIndex(),
-                row,
-                row,
-            )
-        undo_add = self.add_iocs.pop(ioc_name, None)
-        undo_edit = self.edit_iocs.pop(ioc_name, None)
-        try:
-            undo_delete = self.delete_iocs.remove(ioc_name)
-        except KeyError:
-            undo_delete = None
-        if undo_add is not None:
-            self.endRemoveRows()
-        elif undo_edit is not None or undo_delete is not None:
-            self._emit_row_changed(row=row)
-        self.refresh_live_only_iocs()
-        self.refresh_ports_taken()
-
-    def _emit_all_changed(self):
-        """Helper for causing a full table update."""
-        self.dataChanged.emit(
-            self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1)
-        )
-
-    def _emit_config_changed(self):
-        """Helper for causing an update of only the config file IOCs."""
-        self.dataChanged.emit(
-            self.index(0, 0),
-            self.index(len(self.config.procs) - 1, self.columnCount() - 1),
-        )
-
-    def _emit_added_changed(self):
-        """Helper for causing an update of only the added IOCs."""
-        added_iocs_row = len(self.config.procs)
-        added_iocs_count = len(self.add_iocs)
-        idx1 = self.index(added_iocs_row, 0)
-        idx2 = self.index(added_iocs_row + added_iocs_count - 1, self.columnCount() - 1)
-        self.dataChanged.emit(idx1, idx2)
-
-    def _emit_live_only_changed(self):
-        """Helper for causing an update of only the live-only IOCs."""
-        live_only_row = len(self.config.procs) + len(self.add_iocs)
-        idx1 = self.index(live_only_row, 0)
-        idx2 = self.index(self.rowCount() - 1, self.columnCount() - 1)
-        self.dataChanged.emit(idx1, idx2)
-
-    def _emit_row_changed(self, row: int):
-        """Helper for updating a single row."""
-        idx1 = self.index(row, 0)
-        idx2 = self.index(row, self.columnCount() - 1)
-        self.dataChanged.emit(idx1, idx2)
+        self.engine.revert_ioc(name=self.get_ioc_info(ioc=ioc).name)
 
     # Helper functions that are simpler to maintain here than in IOCMainWindow
     # due to proximity to related code
@@ -1351,15 +1144,11 @@ class IOCTableModel(QAbstractTableModel):
 
         This is treated as a pending edit.
         """
-        ioc_proc = deepcopy(self.get_ioc_proc(ioc=ioc))
-        if ioc_proc.path not in ioc_proc.history:
-            ioc_proc.history.insert(0, ioc_proc.path)
-            self.edit_iocs[ioc_proc.name] = ioc_proc
+        self.engine.save_version(name=self.get_ioc_name(ioc=ioc))
 
     def save_all_versions(self):
         """For all IOCs in the table, call save_version."""
-        for row in range(self.rowCount()):
-            self.save_version(ioc=row)
+        self.engine.save_all_versions()
 
     def get_desync_info(self, ioc: IOCModelIdentifier) -> DesyncInfo:
         """
@@ -1374,38 +1163,15 @@ class IOCTableModel(QAbstractTableModel):
 
     def pending_edits(self, ioc: IOCModelIdentifier) -> bool:
         """Return True if the ioc has pending edits."""
-        ioc_info = self.get_ioc_info(ioc=ioc)
-        # Deleted is a pending edit regardless of the fields
-        if ioc_info.deleted and ioc_info.name not in self.add_iocs:
-            return True
-        # Covers any normal add, edit scenario via comparing fields or to None
-        if ioc_info.ioc_proc != ioc_info.file_proc:
-            return True
-        return False
+        return self.engine.pending_edits(name=self.get_ioc_name(ioc=ioc))
 
     def set_from_running(self, ioc: IOCModelIdentifier) -> None:
         """
         Edit the IOC's config such that it matches the values found in the live status.
 
-        The IOC might be in any state: newly added, edited, deleted, or unchanged.
-        Check edited first, then added, then base config for IOCProc.
+        See IOCStateEngine.set_from_running.
         """
-        ioc_info = self.get_ioc_info(ioc=ioc)
-        ioc_proc = ioc_info.ioc_proc
-        ioc_live = ioc_info.ioc_live
-        edit_proc = deepcopy(ioc_proc)
-        # Check port, host, and path
-        if ioc_live.port:
-            edit_proc.port = ioc_live.port
-        if ioc_live.host:
-            edit_proc.host = ioc_live.host
-        if ioc_live.path:
-            edit_proc.path = ioc_live.path
-        # If setting from running, it must not be disabled
-        edit_proc.disable = False
-        self.edit_iocs[ioc_info.name] = edit_proc
-        self.refresh_live_only_iocs()
-        self.refresh_ports_taken()
+        self.engine.set_from_running(name=self.get_ioc_name(ioc=ioc))
 
     def get_unused_port(self, host: str, closed: bool) -> int:
         """
@@ -1414,4 +1180,4 @@ class IOCTableModel(QAbstractTableModel):
         Works in the context of the current config including
         pending edits.
         """
-        return self.get_next_config().get_unused_port(host=host, closed=closed)
+        return self.engine.get_unused_port(host=host, closed=closed)
@@ -1,8 +1,8 @@
 """
 The terminal module implements functions for opening floating terminal windows.
 
-These are useful in the GUI for e.g. helping the user telnet to a host
-or tail a logfile.
+These are useful for e.g. helping the user telnet to a host or tail a logfile.
+The GUI itself uses the in-app widgets from the console_dock module instead.
 
 Note: this file needs to be tested manually on various operating systems.
 
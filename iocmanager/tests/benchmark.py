@@ -0,0 +1,550 @@
+"""
+Benchmarks for the performance-sensitive parts of iocmanager.
+
+By default these run against the real environment (e.g. the real PYPS_ROOT).
+Pass --fake to run against the fake data from the test suite instead.
+
+Usage:
+
+python -m iocmanager.tests.benchmark memory [--fake] [hutch ...]
+python -m iocmanager.tests.benchmark table [--fake] [--rows N]
+python -m iocmanager.tests.benchmark next_config [--fake] [--rows N]
+python -m iocmanager.tests.benchmark startup [--fake] [hutch ...]
+python -m iocmanager.tests.benchmark poll [--fake] [hutch]
+python -m iocmanager.tests.benchmark engine [--fake] [--rows N]
+
+Each benchmark is also available as a function that returns its measurements,
+so that the test suite can make assertions about them.
+"""
+
+import argparse
+import gc
+import logging
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from copy import deepcopy
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any
+
+from pytest import MonkeyPatch
+from qtpy.QtCore import Qt
+from qtpy.QtWidgets import QApplication, QTableView
+
+from ..config import (
+    Config,
+    IOCProc,
+    IOCStatusFile,
+    get_hutch_list,
+    read_config,
+    read_status_dir,
+)
+from ..gui import main as gui_main
+from ..procserv_tools import AutoRestartMode, IOCStatusLive, ProcServStatus
+from ..records import IOCProcRecord, IOCStatusFileRecord, RecordTable
+from ..state_engine import IOCStateEngine, PollBatch, StatusPoller
+from ..table_delegate import IOCTableDelegate
+from ..table_filter import IOCFilterProxyModel
+from ..table_model import IOCTableModel, TableColumn
+
+logger = logging.getLogger(__name__)
+
+
+def _traced_size[T](build: Callable[[], T]) -> tuple[T, int]:
+    """Return the result of build and the bytes it allocated that are still alive."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, after - before
+
+
+def memory_benchmark(hutches: list[str] | None = None) -> dict[str, int]:
+    """
+    Compare the memory used to hold every hutch's IOCs in each representation.
+
+    Loads the config and status files for every hutch, then measures how many
+    bytes it takes to keep all of them alive as:
+
+    - The mutable dataclasses (IOCProc, IOCStatusFile)
+    - The compact records (IOCProcRecord, IOCStatusFileRecord)
+    - RecordTable collections of the compact records
+
+    Parameters
+    ----------
+    hutches : list of str, optional
+        The hutches to load. Defaults to all of them.
+
+    Returns
+    -------
+    results : dict of str to int
+        The IOC and status file counts, and the size in bytes of each variant.
+    """
+    if hutches is None:
+        hutches = get_hutch_list()
+    procs: list[IOCProc] = []
+    status_files: list[IOCStatusFile] = []
+    for hutch in hutches:
+        try:
+            procs.extend(read_config(hutch).procs.values())
+        except Exception:
+            logger.warning("Could not read config for %s", hutch)
+        try:
+            status_files.extend(read_status_dir(hutch))
+        except Exception:
+            logger.warning("Could not read status dir for %s", hutch)
+
+    _, dataclass_bytes = _traced_size(lambda: deepcopy((procs, status_files)))
+    _, record_bytes = _traced_size(
+        lambda: (
+            [IOCProcRecord.from_dataclass(proc) for proc in procs],
+            [IOCStatusFileRecord.from_dataclass(stat) for stat in status_files],
+        )
+    )
+    # Table rows are keyed on name, and the same IOC can be in multiple hutches
+    unique_procs = _unique_names(procs)
+    unique_status_files = _unique_names(status_files)
+    _, table_bytes = _traced_size(
+        lambda: (
+            RecordTable(IOCProcRecord, unique_procs),
+            RecordTable(IOCStatusFileRecord, unique_status_files),
+        )
+    )
+    return {
+        "hutches": len(hutches),
+        "iocs": len(procs),
+        "status_files": len(status_files),
+        "dataclass_bytes": dataclass_bytes,
+        "record_bytes": record_bytes,
+        "table_bytes": table_bytes,
+    }
+
+
+def make_config(rows: int) -> Config:
+    """
+    Create a synthetic config of the given size.
+
+    Each fake host gets 500 IOCs so that the ports are realistic.
+    """
+    config = Config(path="")
+    for num in range(rows):
+        config.add_proc(
+            IOCProc(
+                name=f"ioc-benchmark-{num:05}",
+                port=30001 + num % 500,
+                host=f"ioc-benchmark-host{num // 500:02}",
+                path=f"ioc/benchmark/R{num % 7}.0.0",
+            )
+        )
+    return config
+
+
+def make_table_model(rows: int, hutch: str = "pytest") -> IOCTableModel:
+    """Create an IOCTableModel with a synthetic config of the given size."""
+    return IOCTableModel(config=make_config(rows=rows), hutch=hutch)
+
+
+def table_benchmark(rows: int = 2000, scroll_steps: int = 50) -> dict[str, float]:
+    """
+    Time how long it takes to render and scroll a large IOC table.
+
+    This sets up the same model, sort proxy, and delegate as the main window
+    in a QTableView and measures:
+
+    - data_sweep: calling data() for every cell with the roles the view uses
+    - repeat_sweep: the same thing again, e.g. for a full repaint
+    - first_paint: painting the table for the first time
+    - scroll_frame: the average time to paint after scrolling by one page
+    - sort: re-sorting the whole table by host
+    - filter_keystroke: the average time to re-filter the table while typing
+
+    Parameters
+    ----------
+    rows : int, optional
+        The number of IOCs to put in the table.
+    scroll_steps : int, optional
+        The number of pages to scroll through.
+
+    Returns
+    -------
+    results : dict of str to float
+        The row count and the time in seconds for each measurement.
+    """
+    app = QApplication.instance() or QApplication([])
+    model = make_table_model(rows=rows)
+    sort_model = IOCFilterProxyModel()
+    sort_model.setSourceModel(model)
+    delegate = IOCTableDelegate(hutch=model.hutch, model=model, proxy_model=sort_model)
+    view = QTableView()
+    view.setModel(sort_model)
+    view.setItemDelegate(delegate)
+    view.setSortingEnabled(True)
+    view.sortByColumn(0, Qt.AscendingOrder)
+    view.resize(1600, 1000)
+
+    roles = (Qt.DisplayRole, Qt.ForegroundRole, Qt.BackgroundRole)
+
+    def sweep() -> float:
+        start = time.perf_counter()
+        for row in range(model.rowCount()):
+            for col in range(model.columnCount()):
+                index = model.index(row, col)
+                for role in roles:
+                    model.data(index, role)
+        return time.perf_counter() - start
+
+    data_sweep = sweep()
+    # Again, now that anything the model caches is warm
+    repeat_sweep = sweep()
+
+    view.show()
+    app.processEvents()
+    start = time.perf_counter()
+    view.viewport().grab()
+    first_paint = time.perf_counter() - start
+
+    scroll_bar = view.verticalScrollBar()
+    start = time.perf_counter()
+    for step in range(scroll_steps):
+        scroll_bar.setValue(
+            (step + 1) * scroll_bar.pageStep() % (scroll_bar.maximum() + 1)
+        )
+        view.viewport().grab()
+    scroll_frame = (time.perf_counter() - start) / max(scroll_steps, 1)
+
+    start = time.perf_counter()
+    view.sortByColumn(TableColumn.HOST, Qt.DescendingOrder)
+    sort = time.perf_counter() - start
+
+    filter_text = "ioc-benchmark-0001 host:ioc-benchmark-host00"
+    start = time.perf_counter()
+    for end in range(1, len(filter_text) + 1):
+        sort_model.set_filter_text(filter_text[:end])
+    sort_model.set_filter_text("")
+    filter_keystroke = (time.perf_counter() - start) / (len(filter_text) + 1)
+
+    view.close()
+    view.deleteLater()
+    app.processEvents()
+    return {
+        "rows": rows,
+        "data_sweep": data_sweep,
+        "repeat_sweep": repeat_sweep,
+        "first_paint": first_paint,
+        "scroll_frame": scroll_frame,
+        "sort": sort,
+        "filter_keystroke": filter_keystroke,
+    }
+
+
+def _copy_next_config(model: IOCTableModel) -> Config:
+    """The next config the old way: copy the whole config and replay the edits."""
+    config = deepcopy(model.config)
+    for ioc_proc in model.add_iocs.values():
+        config.add_proc(proc=ioc_proc)
+    for ioc_proc in model.edit_iocs.values():
+        config.update_proc(proc=ioc_proc)
+    for ioc_name in model.delete_iocs:
+        config.delete_proc(ioc_name=ioc_name)
+    return config
+
+
+def next_config_benchmark(rows: int = 2000, sweeps: int = 20) -> dict[str, float]:
+    """
+    Time how long it takes to look at the pending config once per poll sweep.
+
+    The poll visits every IOC in the pending config on every sweep.
+    This compares doing so through a full copy of the config with
+    doing so through the ConfigOverlay view, with a few pending
+    adds, edits, and deletes. Writing still needs a real Config,
+    so the cost of materializing the view is also included.
+
+    Parameters
+    ----------
+    rows : int, optional
+        The number of IOCs to put in the config.
+    sweeps : int, optional
+        The number of sweeps to average over.
+
+    Returns
+    -------
+    results : dict of str to float
+        The row count and the average time in seconds for each measurement.
+    """
+    app = QApplication.instance() or QApplication([])
+    model = make_table_model(rows=rows)
+    names = list(model.config.procs)
+    for name in names[:10]:
+        proc = deepcopy(model.config.procs[name])
+        proc.disable = True
+        model.edit_iocs[name] = proc
+    model.delete_iocs.update(names[10:15])
+    for num in range(5):
+        model.add_iocs[f"ioc-benchmark-added{num}"] = IOCProc(
+            name=f"ioc-benchmark-added{num}",
+            port=39100 + num,
+            host="ioc-benchmark-host00",
+            path="ioc/benchmark/added",
+        )
+
+    def sweep(get_config: Callable[[], Any]) -> float:
+        start = time.perf_counter()
+        for _ in range(sweeps):
+            # The same thing the poll does with each IOC
+            [
+                (ioc_proc.host, ioc_proc.port, name)
+                for name, ioc_proc in get_config().procs.items()
+            ]
+        return (time.perf_counter() - start) / max(sweeps, 1)
+
+    copy_sweep = sweep(lambda: _copy_next_config(model))
+    view_sweep = sweep(model.get_next_config_view)
+    start = time.perf_counter()
+    model.get_next_config()
+    materialize = time.perf_counter() - start
+
+    app.processEvents()
+    return {
+        "rows": rows,
+        "copy_sweep": copy_sweep,
+        "view_sweep": view_sweep,
+        "materialize": materialize,
+    }
+
+
+def startup_benchmark(hutches: list[str]) -> dict[str, float]:
+    """
+    Time each phase of starting the gui, from gui.main through first paint.
+
+    The phases are recorded by gui.main itself, see gui._main.
+    Run this in a fresh process (e.g. from the command line) to include
+    the full cost of the imports.
+
+    Parameters
+    ----------
+    hutches : list of str
+        The hutches to open the gui for. More than one opens them in tabs.
+
+    Returns
+    -------
+    results : dict of str to float
+        The time in seconds for each phase, and the total through first paint.
+    """
+    timings: dict[str, float] = {}
+    start = time.monotonic()
+    gui_main(hutches, timings=timings)
+    total = time.monotonic() - start
+    timings["total_to_first_paint"] = (
+        total - timings.get("first_poll", 0.0) - timings.get("pydm_ready", 0.0)
+    )
+    return timings
+
+
+def poll_benchmark(hutch: str, sweeps: int = 3) -> dict[str, float | str]:
+    """
+    Time each phase of the poll loop for a real hutch config.
+
+    This runs the StatusPoller against an IOCStateEngine without any gui.
+    The measurements come from the poller's own PollStats, so these are the
+    same numbers that the gui shows in its poll diagnostics.
+
+    Parameters
+    ----------
+    hutch : str
+        The hutch whose config and status directory to poll.
+    sweeps : int, optional
+        The number of poll sweeps to run.
+
+    Returns
+    -------
+    results : dict of str to float or str
+        The average time in seconds for each poll phase,
+        and the name and average status check time of the slowest host and IOC.
+    """
+    engine = IOCStateEngine(config=read_config(hutch), hutch=hutch)
+    poller = StatusPoller(engine=engine)
+    for _ in range(sweeps):
+        poller.poll_once()
+    results: dict[str, float | str] = {
+        str(phase): summary.mean
+        for phase, summary in poller.poll_stats.phase_summary().items()
+    }
+    for kind, slowest in (
+        ("host", poller.poll_stats.slowest_hosts(count=1)),
+        ("ioc", poller.poll_stats.slowest_iocs(count=1)),
+    ):
+        if slowest:
+            results[f"slowest_{kind}"] = slowest[0].name
+            results[f"slowest_{kind}_mean"] = slowest[0].mean
+    return results
+
+
+def engine_benchmark(rows: int = 2000, sweeps: int = 20) -> dict[str, float]:
+    """
+    Load test the IOCStateEngine with synthetic poll results, without any gui.
+
+    This measures:
+
+    - full_batch: applying a poll sweep where every IOC changed, e.g. at startup
+    - small_batch: the average time to apply a sweep where 1% of the IOCs changed
+    - live_only_batch: applying a sweep that finds 1% more IOCs not in the config
+    - desync_sweep: computing the desync text for every IOC
+
+    Parameters
+    ----------
+    rows : int, optional
+        The number of IOCs to put in the config.
+    sweeps : int, optional
+        The number of small sweeps to average over.
+
+    Returns
+    -------
+    results : dict of str to float
+        The row count and the time in seconds for each measurement.
+    """
+    engine = IOCStateEngine(config=make_config(rows=rows), hutch="pytest")
+
+    def status(ioc_proc: IOCProc, status: ProcServStatus) -> IOCStatusLive:
+        return IOCStatusLive(
+            name=ioc_proc.name,
+            port=ioc_proc.port,
+            host=ioc_proc.host,
+            path="/tmp",
+            pid=None,
+            status=status,
+            autorestart_mode=AutoRestartMode.ON,
+        )
+
+    procs = list(engine.config.procs.values())
+    batch = PollBatch(
+        status_live=[status(proc, ProcServStatus.RUNNING) for proc in procs]
+    )
+    start = time.perf_counter()
+    engine.update_from_poll_batch(batch=batch)
+    full_batch = time.perf_counter() - start
+
+    step = max(rows // 100, 1)
+    start = time.perf_counter()
+    for num in range(sweeps):
+        new_status = (ProcServStatus.NOCONNECT, ProcServStatus.RUNNING)[num % 2]
+        batch = PollBatch(
+            status_live=[status(proc, new_status) for proc in procs[num % step :: step]]
+        )
+        engine.update_from_poll_batch(batch=batch)
+    small_batch = (time.perf_counter() - start) / max(sweeps, 1)
+
+    extra_procs = [
+        IOCProc(
+            name=f"ioc-benchmark-live{num:05}",
+            port=39100 + num % 100,
+            host="ioc-benchmark-live-host",
+            path="ioc/benchmark/live",
+        )
+        for num in range(step)
+    ]
+    batch = PollBatch(
+        status_live=[status(proc, ProcServStatus.RUNNING) for proc in extra_procs]
+    )
+    start = time.perf_counter()
+    engine.update_from_poll_batch(batch=batch)
+    live_only_batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name in engine.get_ioc_names():
+        engine.get_desync_text(name=name)
+    desync_sweep = time.perf_counter() - start
+
+    return {
+        "rows": rows,
+        "full_batch": full_batch,
+        "small_batch": small_batch,
+        "live_only_batch": live_only_batch,
+        "desync_sweep": desync_sweep,
+    }
+
+
+def _unique_names[T: (IOCProc, IOCStatusFile)](items: list[T]) -> list[T]:
+    """Rename duplicate names (e.g. the same IOC in two hutches) to keep them all."""
+    seen: dict[str, int] = {}
+    unique = []
+    for item in items:
+        count = seen.get(item.name, 0)
+        seen[item.name] = count + 1
+        if count:
+            item = deepcopy(item)
+            item.name = f"{item.name}#{count}"
+        unique.append(item)
+    return unique
+
+
+def print_results(name: str, results: dict[str, Any]) -> None:
+    print(f"{name} results:")
+    width = max(len(key) for key in results)
+    for key, value in results.items():
+        if isinstance(value, float):
+            value = f"{value:.6f}"
+        print(f"  {key:<{width}} = {value}")
+
+
+def main(args: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m iocmanager.tests.benchmark",
+        description="Run iocmanager performance benchmarks.",
+    )
+    parser.add_argument(
+        "benchmark",
+        choices=("memory", "table", "next_config", "startup", "poll", "engine"),
+    )
+    parser.add_argument(
+        "--fake",
+        action="store_true",
+        help="Use the fake data from the test suite instead of the real environment.",
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=2000,
+        help="Table size for the table, next_config, and engine benchmarks.",
+    )
+    parser.add_argument("hutches", nargs="*", help="Hutches to include, default all.")
+    parsed = parser.parse_args(args)
+
+    with MonkeyPatch.context() as monkeypatch:
+        with TemporaryDirectory(ignore_cleanup_errors=True) as tmpdir:
+            if parsed.fake:
+                from .conftest import setup_test_env
+
+                setup_test_env(tmp_path=Path(tmpdir), monkeypatch=monkeypatch)
+            match parsed.benchmark:
+                case "memory":
+                    results = memory_benchmark(hutches=parsed.hutches or None)
+                case "table":
+                    results = table_benchmark(rows=parsed.rows)
+                case "next_config":
+                    results = next_config_benchmark(rows=parsed.rows)
+                case "engine":
+                    results = engine_benchmark(rows=parsed.rows)
+                case "startup" | "poll":
+                    if parsed.hutches:
+                        hutches = parsed.hutches
+                    elif parsed.fake:
+                        hutches = ["pytest"]
+                    else:
+                        parser.error(f"The {parsed.benchmark} benchmark needs a hutch.")
+                    if parsed.benchmark == "startup":
+                        results = startup_benchmark(hutches=hutches)
+                    else:
+                        results = poll_benchmark(hutch=hutches[0])
+            print_results(parsed.benchmark, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,7 +13,13 @@ from pytestqt.qtbot import QtBot
 
 from ..config import Config
 from ..env_paths import env_paths
-from ..procserv_tools import BASEPORT, AutoRestartMode, IOCProc
+from ..procserv_tools import (
+    BASEPORT,
+    AutoRestartMode,
+    IOCProc,
+    IOCStatusLive,
+    ProcServStatus,
+)
 from ..table_delegate import IOCTableDelegate
 from ..table_model import IOCTableModel
 
@@ -31,6 +37,7 @@ def setup_test_env(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
     for interactive testing.
     """
     monkeypatch.setenv("CAMRECORD_ROOT", str(tmp_path))
+    monkeypatch.setenv("IOCMANAGER_CACHE_DIR", str(tmp_path / "cache"))
     try:
         procserv_path = get_procserv_bin_path()
         monkeypatch.setenv("PROCSERV_EXE", str(procserv_path))
@@ -339,6 +346,26 @@ def ctrl(char: str) -> bytes:
     return bytes([ord(char.lower()) - ord("a") + 1])
 
 
+def make_live(
+    name: str,
+    port: int,
+    path: str = "",
+    status: ProcServStatus = ProcServStatus.RUNNING,
+) -> IOCStatusLive:
+    """
+    Make a live status on "host" for tests that feed the model live updates.
+    """
+    return IOCStatusLive(
+        name=name,
+        port=port,
+        host="host",
+        path=path,
+        pid=0,
+        status=status,
+        autorestart_mode=AutoRestartMode.ON,
+    )
+
+
 @pytest.fixture(scope="function")
 def pvs(monkeypatch: pytest.MonkeyPatch) -> Iterator[list[str]]:
     """
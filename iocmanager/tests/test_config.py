@@ -2,27 +2,37 @@ from __future__ import annotations
 
 import os
 import shutil
-from copy import copy
+from copy import copy, deepcopy
 from pathlib import Path
 
 import pytest
 
+from .. import epics_paths
 from ..config import (
     Config,
+    ConfigConflictError,
+    ConfigOverlay,
     DuplicatePortError,
+    HostDirReader,
     IOCProc,
     IOCStatusFile,
+    PolicyFileCache,
+    StatusDirReader,
     check_auth,
     check_special,
     check_ssh,
+    diff_configs,
     find_iocs,
     get_host_os,
     get_hutch_list,
+    get_status_dir_reader,
+    read_all_configs,
     read_config,
     read_status_dir,
     write_config,
 )
 from ..env_paths import env_paths
+from ..epics_paths import ParentRecordCache
 from . import CFG_FOLDER
 
 
@@ -93,6 +103,24 @@ def test_read_config(cfg: str):
     assert config.allow_console
 
 
+def test_read_config_saves_parents(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """
+    read_config should only write the parent cache if it found new parents.
+    """
+    parent_cache = ParentRecordCache(path=str(tmp_path / "parents.json"))
+    monkeypatch.setattr(epics_paths, "_parent_cache", parent_cache)
+    saves = []
+    monkeypatch.setattr(parent_cache, "save", lambda: saves.append(True))
+    cfg = tmp_path / "iocmanager.cfg"
+    shutil.copy(CFG_FOLDER / "pytest" / "iocmanager.cfg", cfg)
+    read_config(str(cfg))
+    assert len(saves) == 1
+    # Read the file again, the parents are the same
+    os.utime(cfg, (0, os.stat(cfg).st_mtime + 1))
+    read_config(str(cfg))
+    assert len(saves) == 1
+
+
 @pytest.mark.parametrize(
     "host,expected",
     (
@@ -111,6 +139,61 @@ def test_get_host_os(host: str, expected: str):
             host_os[host]
 
 
+def test_host_dir_reader(tmp_path: Path):
+    (tmp_path / "host1").write_text("rocky9\n")
+    (tmp_path / "host2").write_text("rhel7\nextra info\n\nmore info\n")
+    (tmp_path / "empty").write_text("")
+    reader = HostDirReader(str(tmp_path))
+
+    host_info = reader.read()
+    assert set(host_info) == {"host1", "host2"}
+    assert host_info["host1"].os == "rocky9"
+    assert host_info["host1"].extra == []
+    assert host_info["host2"].os == "rhel7"
+    assert host_info["host2"].extra == ["extra info", "more info"]
+    assert reader.reads == 3
+
+    # Only new or changed files get opened again
+    (tmp_path / "host1").write_text("rhel9\n")
+    (tmp_path / "host3").write_text("rhel5\n")
+    (tmp_path / "host2").unlink()
+    host_info = reader.read()
+    assert {name: info.os for name, info in host_info.items()} == {
+        "host1": "rhel9",
+        "host3": "rhel5",
+    }
+    assert reader.reads == 2
+    assert reader.skipped_reads == 1
+
+    # Recent results can be reused without scanning
+    (tmp_path / "host4").write_text("rocky9\n")
+    assert "host4" not in reader.read(max_age=1000)
+    assert "host4" in reader.read()
+
+    # Single lookups share the same scan
+    (tmp_path / "host5").write_text("rocky9\n")
+    assert reader.get("host5", max_age=1000) is None
+    assert reader.get("host5").os == "rocky9"
+    assert reader.get("empty") is None
+    assert reader.get("nowhere") is None
+
+
+def test_read_all_configs():
+    timings = {}
+    configs = read_all_configs(timings=timings)
+    assert sorted(configs) == sorted(get_hutch_list())
+    assert set(timings) == set(configs)
+    for hutch, config in configs.items():
+        assert config == read_config(hutch)
+        assert timings[hutch] >= 0
+
+    configs = read_all_configs(["second_hutch", "pytest"], max_workers=1)
+    assert list(configs) == ["second_hutch", "pytest"]
+
+    with pytest.raises(FileNotFoundError):
+        read_all_configs(["pytest", "not_a_hutch"])
+
+
 def test_write_config(tmp_path: Path):
     # Just write back our example config, it should be the same
     config = read_config("pytest")
@@ -152,6 +235,25 @@ def test_write_config_invalid(tmp_path: Path):
     assert not (tmp_path / "iocmanager.cfg").exists()
 
 
+def test_write_config_conflict(tmp_path: Path):
+    cfgname = str(tmp_path / "iocmanager.cfg")
+    config = read_config("pytest")
+    mtime = write_config(cfgname=cfgname, config=config)
+    assert mtime == os.stat(cfgname).st_mtime
+
+    # Nobody else wrote in the meantime: ok
+    config.procs["ioc-counter"].disable = True
+    mtime = write_config(cfgname=cfgname, config=config, expected_mtime=mtime)
+
+    # Someone else wrote in the meantime: conflict, and we don't overwrite
+    os.utime(cfgname, (mtime - 10, mtime - 10))
+    before = Path(cfgname).read_text()
+    config.procs["ioc-counter"].disable = False
+    with pytest.raises(ConfigConflictError):
+        write_config(cfgname=cfgname, config=config, expected_mtime=mtime)
+    assert Path(cfgname).read_text() == before
+
+
 def test_check_auth():
     assert check_auth("user_for_test_check_auth", "pytest")
     assert not check_auth("some_rando", "pytest")
@@ -175,6 +277,39 @@ def test_check_ssh():
     assert not check_ssh("tstopr", "pytest")
 
 
+def test_policy_file_cache(tmp_path: Path):
+    auth_file = tmp_path / "iocmanager.auth"
+    auth_file.write_text("user1\nuser2\n")
+    cache = PolicyFileCache(recheck_interval=0)
+
+    def parser(lines: list[str]) -> frozenset[str]:
+        return frozenset(lines)
+
+    assert cache.get(str(auth_file), parser) == {"user1", "user2"}
+    assert cache.reads == 1
+    # Unchanged file: no re-read
+    assert cache.get(str(auth_file), parser) == {"user1", "user2"}
+    assert cache.reads == 1
+    # Edited file: re-read
+    auth_file.write_text("user1\nuser2\nuser3\n")
+    assert cache.get(str(auth_file), parser) == {"user1", "user2", "user3"}
+    assert cache.reads == 2
+    # Missing file: raise every time
+    auth_file.unlink()
+    for _ in range(2):
+        with pytest.raises(FileNotFoundError):
+            cache.get(str(auth_file), parser)
+
+    # With a long recheck interval, we don't look at the file at all
+    auth_file.write_text("user1\n")
+    slow_cache = PolicyFileCache(recheck_interval=1000)
+    assert slow_cache.get(str(auth_file), parser) == {"user1"}
+    auth_file.write_text("user1\nuser2\n")
+    assert slow_cache.get(str(auth_file), parser) == {"user1"}
+    slow_cache.invalidate(str(auth_file))
+    assert slow_cache.get(str(auth_file), parser) == {"user1", "user2"}
+
+
 def test_find_iocs():
     search1 = find_iocs(id="ioc-counter")
     assert len(search1) == 1
@@ -210,6 +345,121 @@ def test_validate_config():
         bad_config.validate()
 
 
+def test_port_index():
+    config = Config(path="")
+    assert config.get_unused_port(host="host1", closed=True) == 30001
+    assert config.get_unused_port(host="host1", closed=False) == 39100
+
+    one = IOCProc(name="one", host="host1", port=30001, path="")
+    config.add_proc(one)
+    config.add_proc(IOCProc(name="two", host="host1", port=30002, path=""))
+    config.add_proc(IOCProc(name="thr", host="host1", port=39100, path=""))
+    config.add_proc(IOCProc(name="fou", host="host2", port=30001, path=""))
+    assert config.get_unused_port(host="host1", closed=True) == 30003
+    assert config.get_unused_port(host="host1", closed=False) == 39101
+    assert config.get_unused_port(host="host2", closed=True) == 30002
+    assert config.port_index.count(host="host1", port=30001) == 1
+    assert not config.port_index.conflicts
+
+    # Updating an ioc in place frees its old port
+    one.port = 30002
+    config.update_proc(one)
+    assert config.get_unused_port(host="host1", closed=True) == 30001
+    assert config.port_index.conflicts == {("host1", 30002)}
+    assert config.port_index.users(host="host1", port=30002) == ["two", "one"]
+    with pytest.raises(DuplicatePortError):
+        config.validate()
+
+    # Deleting resolves the conflict but keeps the port in use
+    config.delete_proc("two")
+    assert not config.port_index.conflicts
+    config.validate()
+    assert config.get_unused_port(host="host1", closed=True) == 30001
+
+    # Replacing procs wholesale causes a rebuild
+    config.procs = {"fiv": IOCProc(name="fiv", host="host1", port=30001, path="")}
+    assert config.get_unused_port(host="host1", closed=True) == 30002
+    assert config.port_index.count(host="host1", port=30002) == 0
+
+
+def test_diff_configs():
+    old_config = Config(path="")
+    old_config.add_proc(IOCProc(name="one", host="host1", port=10000, path=""))
+    old_config.add_proc(IOCProc(name="two", host="host1", port=20000, path=""))
+    old_config.add_proc(IOCProc(name="thr", host="host2", port=20000, path=""))
+
+    # Identical configs have no diff, even if the mtime changes
+    new_config = deepcopy(old_config)
+    new_config.mtime = 100
+    diff = diff_configs(old=old_config, new=new_config)
+    assert not diff.has_changes
+
+    # Add, remove, and modify some IOCs
+    new_config.delete_proc("one")
+    new_config.add_proc(IOCProc(name="fou", host="host3", port=30000, path=""))
+    new_config.procs["two"].port = 20001
+    new_config.procs["thr"].alias = "Three"
+    new_config.procs["thr"].disable = True
+    diff = diff_configs(old=old_config, new=new_config)
+    assert diff.has_changes
+    assert diff.added == ["fou"]
+    assert diff.removed == ["one"]
+    assert diff.modified == {"two": {"port"}, "thr": {"alias", "disable"}}
+    assert diff.settings == {"hosts"}
+    assert not diff.reordered
+
+    # Swap the order of two IOCs
+    new_config = deepcopy(old_config)
+    new_config.procs = {name: new_config.procs[name] for name in ("two", "one", "thr")}
+    diff = diff_configs(old=old_config, new=new_config)
+    assert diff.has_changes
+    assert not diff.modified
+    assert diff.reordered
+
+
+def test_config_overlay():
+    config = Config(path="/some/path", commithost="commit")
+    for num in range(5):
+        config.add_proc(
+            IOCProc(name=f"ioc{num}", port=30001 + num, host="host1", path="ioc/path")
+        )
+    added = IOCProc(name="added", port=30001, host="host0", path="ioc/added")
+    edited = IOCProc(name="ioc1", port=30010, host="host1", path="ioc/edited")
+    # An edit to an IOC that is not in the config, e.g. one that is only live
+    live = IOCProc(name="live", port=30020, host="host1", path="ioc/live")
+    overlay = ConfigOverlay(
+        config=config,
+        add_procs={"added": added},
+        edit_procs={"ioc1": edited, "live": live},
+        delete_names={"ioc3"},
+    )
+    assert list(overlay.procs) == ["ioc0", "ioc1", "ioc2", "ioc4", "added", "live"]
+    assert len(overlay.procs) == 6
+    assert overlay.procs["ioc1"] is edited
+    assert overlay.procs["ioc0"] is config.procs["ioc0"]
+    assert "ioc3" not in overlay.procs
+    with pytest.raises(KeyError):
+        overlay.procs["ioc3"]
+    assert overlay.hosts == ["host0", "host1"]
+    assert not overlay.port_index.conflicts
+    # ioc1 moved off of 30002
+    assert overlay.get_unused_port(host="host1", closed=True) == 30002
+    assert overlay.path == config.path
+    assert overlay.commithost == config.commithost
+
+    # Same result as copying the config and applying the changes
+    expected = deepcopy(config)
+    expected.add_proc(added)
+    expected.update_proc(edited)
+    expected.update_proc(live)
+    expected.delete_proc("ioc3")
+    materialized = overlay.materialize()
+    assert materialized == expected
+    assert materialized.procs["ioc1"] is not edited
+    assert config.hosts == ["host1"]
+    assert len(config.procs) == 5
+
+
 def test_read_status_dir():
     # Status directory is at $PYPS_ROOT/config/.status/$HUTCH
     # During this test suite, that's a temp dir
@@ -277,6 +527,7 @@ def test_read_status_dir():
 
     # Run again: should have new info, the old and bad files should be gone
     iocs2 = read_status_dir("pytest")
+    assert get_status_dir_reader("pytest").wait_for_cleanup(timeout=5.0)
     assert len(iocs2) == 2
     assert new_counter_info in iocs2
     assert new_shouter_info in iocs2
@@ -286,3 +537,40 @@ def test_read_status_dir():
     assert new_counter_path.is_file()
     assert new_shouter_path.is_file()
     assert empty_file_path.is_file()
+
+
+def test_status_dir_reader_skips_unchanged():
+    status_dir = Path(env_paths.STATUS_DIR % "pytest")
+    reader = StatusDirReader("pytest")
+
+    # First read: everything is new
+    iocs1 = reader.read()
+    assert len(iocs1) == 2
+    assert reader.reads == 2
+    assert reader.skipped_reads == 0
+
+    # Second read: nothing changed, nothing to open
+    iocs2 = reader.read()
+    assert iocs2 == iocs1
+    assert reader.reads == 0
+    assert reader.skipped_reads == 2
+
+    # Change one of the files: only that one needs to be opened
+    counter_path = status_dir / "ioc-counter"
+    counter_path.write_text("54321 test-server2 30002 iocs/new_counter\n")
+    iocs3 = reader.read()
+    assert reader.reads == 1
+    assert reader.skipped_reads == 1
+    assert reader.total_skipped_reads == 3
+    counter_info = [ioc for ioc in iocs3 if ioc.name == "ioc-counter"][0]
+    assert counter_info.pid == 54321
+    assert counter_info.path == "iocs/new_counter"
+
+    # Corrupt files get cleaned up in the background
+    bad_file_path = status_dir / "not-an-ioc"
+    bad_file_path.write_text("12345 PIZZA SODA")
+    iocs4 = reader.read()
+    assert len(iocs4) == 2
+    assert reader.wait_for_cleanup(timeout=5.0)
+    assert not bad_file_path.exists()
+    assert len(reader.read()) == 2
@@ -0,0 +1,144 @@
+from pathlib import Path
+
+import pytest
+from pytestqt.qtbot import QtBot
+from qtpy.QtCore import Qt
+from qtpy.QtNetwork import QHostAddress, QTcpServer, QTcpSocket
+
+from .. import console_dock
+from ..console_dock import LogViewer, ProcServConsole, TelnetFilter
+
+
+@pytest.mark.parametrize(
+    "chunks,expected",
+    (
+        ([b"plain text"], b"plain text"),
+        # Option negotiation: IAC WILL ECHO
+        ([b"a\xff\xfb\x01b"], b"ab"),
+        # Split in the middle of the command
+        ([b"a\xff", b"\xfb", b"\x01b"], b"ab"),
+        # Escaped 0xff
+        ([b"a\xff\xffb"], b"a\xffb"),
+        # Subnegotiation is skipped entirely
+        ([b"a\xff\xfa\x18\x01\xff\xf0b"], b"ab"),
+    ),
+)
+def test_telnet_filter(chunks: list[bytes], expected: bytes):
+    telnet_filter = TelnetFilter()
+    assert b"".join(telnet_filter.feed(chunk) for chunk in chunks) == expected
+
+
+def test_log_viewer(tmp_path: Path, qtbot: QtBot):
+    """
+    The log viewer should show the tail, follow new lines, and handle truncation.
+    """
+    logfile = tmp_path / "ioc.log"
+    logfile.write_text("".join(f"line {num}\n" for num in range(200)))
+    viewer = LogViewer(path=str(logfile), scrollback=150, initial_lines=100)
+    qtbot.add_widget(viewer)
+    viewer.stop()
+
+    def shown() -> list[str]:
+        return viewer.output.toPlainText().splitlines()
+
+    assert shown() == [f"line {num}" for num in range(100, 200)]
+
+    with logfile.open("a") as fd:
+        fd.write("line 200\nline 2")
+    viewer.check_file()
+    assert shown()[-1] == "line 200"
+    with logfile.open("a") as fd:
+        fd.write("01\n")
+    viewer.check_file()
+    assert shown()[-1] == "line 201"
+
+    # Bounded scrollback
+    with logfile.open("a") as fd:
+        fd.write("".join(f"more {num}\n" for num in range(200)))
+    viewer.check_file()
+    assert viewer.output.blockCount() <= 150
+    assert shown()[-1] == "more 199"
+
+    logfile.write_text("rebooted\n")
+    viewer.check_file()
+    assert "truncated" in shown()[-2]
+    assert shown()[-1] == "rebooted"
+
+
+def test_log_viewer_long_line(
+    tmp_path: Path, qtbot: QtBot, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    The tail of a file should be kept even if it has no newline in it.
+    """
+    monkeypatch.setattr(console_dock, "LOG_INITIAL_BYTES", 16)
+    logfile = tmp_path / "ioc.log"
+    logfile.write_text("first\n" + "x" * 100)
+    viewer = LogViewer(path=str(logfile))
+    qtbot.add_widget(viewer)
+    viewer.stop()
+    assert viewer.output.toPlainText() == ""
+    with logfile.open("a") as fd:
+        fd.write("\nnext\n")
+    viewer.check_file()
+    assert viewer.output.toPlainText().splitlines() == ["x" * 16, "next"]
+
+
+def test_log_viewer_missing_file(tmp_path: Path, qtbot: QtBot):
+    """
+    A missing logfile should be shown once it exists.
+    """
+    logfile = tmp_path / "ioc.log"
+    viewer = LogViewer(path=str(logfile))
+    qtbot.add_widget(viewer)
+    viewer.stop()
+    assert "No such file" in viewer.status_label.text()
+    logfile.write_text("hello\n")
+    viewer.check_file()
+    assert viewer.output.toPlainText() == "hello\n"
+
+
+def test_procserv_console(qtbot: QtBot):
+    """
+    The console should show procServ output and send the user's input.
+    """
+    server = QTcpServer()
+    assert server.listen(QHostAddress.LocalHost)
+    connections: list[QTcpSocket] = []
+    received = bytearray()
+
+    def on_connection():
+        conn = server.nextPendingConnection()
+        conn.readyRead.connect(lambda: received.extend(bytes(conn.readAll())))
+        conn.write(b"\xff\xfb\x01@@@ Welcome to procServ\r\n")
+        connections.append(conn)
+
+    server.newConnection.connect(on_connection)
+    console = ProcServConsole(host="127.0.0.1", port=server.serverPort())
+    qtbot.add_widget(console)
+
+    qtbot.wait_until(
+        lambda: "Welcome to procServ" in console.output.toPlainText(), timeout=1000
+    )
+    assert console.output.toPlainText() == "@@@ Welcome to procServ\n"
+    assert "Connected" in console.status_label.text()
+
+    console.input.setText("help")
+    qtbot.keyClick(console.input, Qt.Key_Return)
+    qtbot.keyClick(console.input, Qt.Key_X, Qt.ControlModifier)
+    qtbot.wait_until(lambda: bytes(received) == b"help\n\x18", timeout=1000)
+    assert console.input.text() == ""
+
+    # Editing shortcuts stay in the input box
+    console.input.setText("dbl")
+    qtbot.keyClick(console.input, Qt.Key_A, Qt.ControlModifier)
+    assert console.input.selectedText() == "dbl"
+    qtbot.keyClick(console.input, Qt.Key_C, Qt.ControlModifier)
+    console.input.clear()
+    qtbot.keyClick(console.input, Qt.Key_V, Qt.ControlModifier)
+    assert console.input.text() == "dbl"
+    qtbot.keyClick(console.input, Qt.Key_C, Qt.ControlModifier)
+    qtbot.wait_until(lambda: bytes(received) == b"help\n\x18\x03", timeout=1000)
+
+    console.close_connection()
+    server.close()
@@ -10,3 +10,14 @@ def test_env_var_globals(monkeypatch: pytest.MonkeyPatch):
     assert env_paths.PROCSERV_EXE == "/some/path/to/procServ"
     monkeypatch.setenv("PROCSERV_EXE", "/another/path/to/procServ")
     assert env_paths.PROCSERV_EXE == "/another/path/to/procServ"
+
+
+def test_cache_dir(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("IOCMANAGER_CACHE_DIR", "/some/cache/")
+    assert env_paths.CACHE_DIR == "/some/cache"
+    monkeypatch.delenv("IOCMANAGER_CACHE_DIR")
+    monkeypatch.setenv("XDG_CACHE_HOME", "/xdg/cache")
+    assert env_paths.CACHE_DIR == "/xdg/cache/iocmanager"
+    monkeypatch.delenv("XDG_CACHE_HOME")
+    monkeypatch.setenv("HOME", "/home/someone")
+    assert env_paths.CACHE_DIR == "/home/someone/.cache/iocmanager"
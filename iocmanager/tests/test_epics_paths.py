@@ -1,11 +1,18 @@
 import os
 from itertools import product
+from pathlib import Path
 
 import pytest
 
 from .. import epics_paths
 from ..env_paths import env_paths
-from ..epics_paths import epics_readlines, get_parent, has_stcmd, normalize_path
+from ..epics_paths import (
+    ParentRecordCache,
+    epics_readlines,
+    get_parent,
+    has_stcmd,
+    normalize_path,
+)
 from . import IOC_FOLDER, TESTS_FOLDER
 
 # Possible pieces to normalize
@@ -121,7 +128,8 @@ def test_get_parent(monkeypatch: pytest.MonkeyPatch):
 
     for trial_parts in lines:
         release_line = "".join(trial_parts)
-        assert get_parent("/some/dir", "some_ioc") == answer, (
+        # The fake files don't change, so skip the cache
+        assert get_parent("/some/dir", "some_ioc", use_cache=False) == answer, (
             f"Issue with {release_line}"
         )
 
@@ -138,3 +146,71 @@ def test_epics_readlines():
     assert epics_readlines(str(TESTS_FOLDER / "ioc" / "test_read_all.txt")) == my_lines
     with pytest.raises(OSError):
         epics_readlines("defo_not_a_path")
+
+
+def test_parent_record_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """
+    Parents should be reused until a file they came from changes,
+    including from another process via the cache file.
+    """
+    release = tmp_path / "ioc" / "child" / "R1.0.0"
+    cfg = release / "children" / "ioc_name.cfg"
+    cfg.parent.mkdir(parents=True)
+    cfg.write_text("RELEASE = /first/parent\n")
+    cache_path = str(tmp_path / "parents.json")
+    cache = ParentRecordCache(path=cache_path)
+    assert cache.resolve(str(release), "ioc_name") == "/first/parent"
+    record = next(iter(cache._records.values()))
+    assert record.strategy == "cfg"
+    assert record.depends[str(cfg)] is not None
+    # Missing files are dependencies too: the first .cfg location was checked
+    assert record.depends[str(release / "ioc_name.cfg")] is None
+
+    # Nothing changed, so we shouldn't read anything
+    def no_reading(*args, **kwargs):
+        raise AssertionError("Should have used the cache")
+
+    with monkeypatch.context() as ctx:
+        ctx.setattr(epics_paths, "cfg_parent", no_reading)
+        ctx.setitem(epics_paths.parent_getters, "cfg", no_reading)
+        assert cache.resolve(str(release), "ioc_name") == "/first/parent"
+
+    # Another process starts from the cache file
+    cache.save()
+    other_cache = ParentRecordCache(path=cache_path)
+    assert other_cache.get(str(release), "ioc_name") == "/first/parent"
+
+    # A change to the file means we need to look again
+    cfg.write_text("RELEASE = /second/parent\n")
+    os.utime(cfg, ns=(0, record.depends[str(cfg)] + 1_000_000_000))
+    assert other_cache.get(str(release), "ioc_name") is None
+    assert other_cache.resolve(str(release), "ioc_name") == "/second/parent"
+    # Other processes' results are kept when we save
+    other_cache.save()
+    cache.save()
+    assert ParentRecordCache(path=cache_path).get(str(release), "ioc_name") == (
+        "/second/parent"
+    )
+
+
+def test_parent_record_cache_subdirs(tmp_path: Path):
+    """
+    Python files added in the subdirectories pyioc_parent globs should be noticed.
+    """
+    release = tmp_path / "ioc" / "pyioc" / "R1.0.0"
+    subdir = release / "pkg" / "sub"
+    subdir.mkdir(parents=True)
+    (release / "st.cmd").write_text("export PCDS_CONDA_VER=5.8.1\n")
+    # Make sure adding a file changes the mtime, even on a coarse clock
+    os.utime(subdir, ns=(0, 0))
+    cache = ParentRecordCache(path=str(tmp_path / "parents.json"))
+    assert cache.resolve(str(release), "ioc_name") == " conda 5.8.1"
+    assert cache.changes == 1
+
+    # Nothing changed, so the result isn't new
+    assert cache.resolve(str(release), "ioc_name") == " conda 5.8.1"
+    assert cache.changes == 1
+
+    (subdir / "ioc.py").write_text("import caproto\n")
+    assert cache.resolve(str(release), "ioc_name") == "caproto conda 5.8.1"
+    assert cache.changes == 2
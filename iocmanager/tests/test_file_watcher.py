@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from .. import file_watcher
+from ..file_watcher import FileWatcher, get_fs_type, inotify_available
+
+
+@pytest.fixture(params=["inotify", "polled"])
+def use_inotify(request: pytest.FixtureRequest) -> bool:
+    if request.param == "inotify":
+        if not inotify_available():
+            pytest.skip("inotify not available on this system")
+        return True
+    return False
+
+
+def test_file_watcher_basic(tmp_path: Path, use_inotify: bool):
+    """
+    The watcher should report each path once at startup, then only on changes.
+    """
+    watched_dir = tmp_path / "dir"
+    watched_dir.mkdir()
+    watched_file = tmp_path / "file.cfg"
+    watched_file.write_text("original")
+    other_file = tmp_path / "other.cfg"
+
+    watcher = FileWatcher(
+        paths=(str(watched_dir), str(watched_file)),
+        use_inotify=use_inotify,
+        scan_interval=0,
+    )
+    if use_inotify:
+        assert not watcher.polled_paths
+        # Nothing to report unless something changed
+        unchanged = set()
+    else:
+        assert watcher.polled_paths == watcher.paths
+        # Can't see in-place edits without inotify, so the caller re-reads dirs
+        unchanged = {str(watched_dir)}
+
+    # Everything is new at startup
+    assert watcher.changed() == {str(watched_dir), str(watched_file)}
+    assert watcher.changed() == unchanged
+
+    # Unrelated file in the same directory as our file: no change
+    other_file.write_text("unrelated")
+    assert watcher.changed() == unchanged
+
+    # New file in the directory
+    (watched_dir / "status").write_text("1234 host 30001 some/path")
+    assert watcher.changed() == {str(watched_dir)}
+
+    # Modify a file in the directory
+    time.sleep(0.01)
+    (watched_dir / "status").write_text("4321 host 30002 some/path")
+    assert watcher.changed() == {str(watched_dir)}
+
+    # Replace the file via rename, like write_config does
+    replacement = tmp_path / "replacement"
+    replacement.write_text("replaced")
+    os.rename(replacement, watched_file)
+    assert watcher.changed() == {str(watched_file)} | unchanged
+
+    # Manually request a change
+    watcher.mark_changed(str(watched_file))
+    assert watcher.changed() == {str(watched_file)} | unchanged
+    watcher.mark_changed()
+    assert watcher.changed() == watcher.paths
+    watcher.close()
+
+
+def test_file_watcher_wait(tmp_path: Path, use_inotify: bool):
+    """
+    wait should return early on changes (inotify only) or on interrupt.
+    """
+    watcher = FileWatcher(paths=(str(tmp_path),), use_inotify=use_inotify)
+    assert watcher.changed() == {str(tmp_path)}
+
+    if use_inotify:
+
+        def make_file():
+            time.sleep(0.1)
+            (tmp_path / "new_file").touch()
+
+        threading.Thread(target=make_file, daemon=True).start()
+        start = time.monotonic()
+        assert watcher.wait(timeout=5) == {str(tmp_path)}
+        assert time.monotonic() - start < 5
+
+    threading.Timer(0.1, watcher.interrupt).start()
+    start = time.monotonic()
+    watcher.wait(timeout=5)
+    assert time.monotonic() - start < 5
+    watcher.close()
+
+
+def test_file_watcher_missing_path(tmp_path: Path, use_inotify: bool):
+    """
+    Missing paths are polled until they show up.
+    """
+    later_dir = tmp_path / "later"
+    watcher = FileWatcher(
+        paths=(str(later_dir),), use_inotify=use_inotify, scan_interval=0
+    )
+    assert watcher.polled_paths == {str(later_dir)}
+    assert watcher.changed() == {str(later_dir)}
+    assert watcher.changed() == set()
+    later_dir.mkdir()
+    assert watcher.changed() == {str(later_dir)}
+    if use_inotify:
+        assert not watcher.polled_paths
+    (later_dir / "new_file").touch()
+    assert watcher.changed() == {str(later_dir)}
+    watcher.close()
+
+
+def test_file_watcher_polled_wait(tmp_path: Path):
+    """
+    Without inotify, wait should check metadata while waiting and return early.
+    """
+    (tmp_path / "status").write_text("1234 host 30001 some/path")
+    watcher = FileWatcher(paths=(str(tmp_path),), use_inotify=False, scan_interval=0.1)
+    assert watcher.wait(timeout=0) == {str(tmp_path)}
+    # A rewrite in place doesn't change the directory, wait can't see it
+    (tmp_path / "status").write_text("4321 host 30002 some/path")
+    assert watcher.wait(timeout=0.3) == set()
+
+    # A new file changes the directory
+    def make_file():
+        time.sleep(0.3)
+        (tmp_path / "new_status").touch()
+
+    threading.Thread(target=make_file, daemon=True).start()
+    start = time.monotonic()
+    assert watcher.wait(timeout=5) == {str(tmp_path)}
+    assert time.monotonic() - start < 2
+    watcher.close()
+
+
+def test_network_fs_fallback(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """
+    inotify can't see changes from other hosts on NFS, so we should poll instead.
+    """
+    monkeypatch.setattr(file_watcher, "is_network_fs", lambda path: True)
+    watcher = FileWatcher(paths=(str(tmp_path),))
+    assert watcher.polled_paths == {str(tmp_path)}
+    watcher.close()
+
+
+def test_get_fs_type(tmp_path: Path):
+    if not os.path.exists("/proc/mounts"):
+        pytest.skip("No /proc/mounts on this system")
+    assert get_fs_type(str(tmp_path))
@@ -0,0 +1,86 @@
+import pytest
+from pytestqt.modeltest import ModelTester
+
+from ..config import IOCProc
+from ..host_tree import HostColumn, HostTreeModel
+from ..procserv_tools import ProcServStatus
+from ..table_model import IOCTableModel
+from .conftest import make_live
+
+
+@pytest.fixture(scope="function")
+def host_model(model: IOCTableModel) -> HostTreeModel:
+    return HostTreeModel(model=model)
+
+
+def summaries(host_model: HostTreeModel) -> dict[str, tuple]:
+    """Every host's summary values, to compare with a freshly built tree."""
+    return {
+        host: (
+            host_model.get_host_iocs(host=host),
+            dict(host_model.get_host_summary(host=host).status_counts),
+            host_model.get_host_summary(host=host).desync_count,
+        )
+        for host in host_model.get_hosts()
+    }
+
+
+def test_host_tree_initial(host_model: HostTreeModel, qtmodeltester: ModelTester):
+    qtmodeltester.check(host_model)
+    assert host_model.get_hosts() == ["host"]
+    assert host_model.get_host_iocs(host="host") == [f"ioc{num}" for num in range(10)]
+    assert host_model.get_host_iocs(host="nowhere") == []
+    host_index = host_model.index(0, 0)
+    assert host_model.rowCount(host_index) == 10
+    assert host_model.data(host_model.index(0, HostColumn.IOCS)) == 10
+    ioc_index = host_model.index(3, HostColumn.NAME, host_index)
+    assert host_model.get_ioc_name(ioc_index) == "ioc3"
+    assert host_model.get_ioc_name(host_index) is None
+    assert host_model.parent(ioc_index) == host_index
+
+
+def test_host_tree_incremental(
+    model: IOCTableModel, host_model: HostTreeModel, qtmodeltester: ModelTester
+):
+    """
+    Changes to the table should update the tree without a rebuild.
+    """
+    qtmodeltester.check(host_model)
+    resets = []
+    host_model.modelReset.connect(lambda: resets.append(True))
+
+    # Status change: same host, new counts
+    model.update_from_live_ioc(status_live=make_live("ioc3", port=30004))
+    summary = host_model.get_host_summary(host="host")
+    assert summary.status_counts[ProcServStatus.RUNNING.value] == 1
+    assert host_model.data(host_model.index(0, HostColumn.STATUS)).startswith(
+        f"{ProcServStatus.INIT.value}: 9"
+    )
+    # Running on the wrong port is a desync
+    model.update_from_live_ioc(
+        status_live=make_live("ioc5", port=40000, path="ioc/some/path/5")
+    )
+    assert summary.desync_count == 1
+
+    # Host change: moves to a new host row
+    model.engine.edit_ioc(
+        ioc_proc=IOCProc(name="ioc2", port=30003, host="other", path="ioc/x")
+    )
+    assert host_model.get_hosts() == ["host", "other"]
+    assert host_model.get_host_iocs(host="other") == ["ioc2"]
+    assert "ioc2" not in host_model.get_host_iocs(host="host")
+
+    # New IOC on a new host, then removed again
+    model.add_ioc(IOCProc(name="abc", port=30001, host="aaa", path="ioc/abc"))
+    assert host_model.get_hosts() == ["aaa", "host", "other"]
+    model.revert_ioc(ioc="abc")
+    assert host_model.get_hosts() == ["host", "other"]
+
+    # Live-only IOC added to the config: briefly has two rows
+    model.update_from_live_ioc(status_live=make_live("newioc", port=39000))
+    assert "newioc" in host_model.get_host_iocs(host="host")
+    model.add_ioc(IOCProc(name="newioc", port=39000, host="host", path=""))
+    assert "newioc" in host_model.get_host_iocs(host="host")
+
+    assert not resets
+    assert summaries(host_model) == summaries(HostTreeModel(model=model))
@@ -1,15 +1,23 @@
 import dataclasses
 import io
+import os
 import socket
 import sys
 import time
+from copy import copy
 from unittest.mock import Mock
 
 import pytest
 from epics import PV
 
 from .. import imgr
-from ..config import Config, IOCProc, read_config
+from ..config import (
+    Config,
+    ConfigConflictError,
+    IOCProc,
+    read_config,
+    write_config,
+)
 from ..imgr import (
     ImgrArgs,
     add_cmd,
@@ -439,13 +447,97 @@ def setup_mock_write_apply(
     """
     call_history = []
 
-    def mock_write_apply(config: Config, ioc_name: str, hutch: str):
+    def mock_write_apply(
+        config: Config, ioc_name: str, hutch: str, original: IOCProc | None
+    ):
         call_history.append((config, ioc_name, hutch))
 
     monkeypatch.setattr(imgr, "_write_apply", mock_write_apply)
     return call_history
 
 
+def test_write_apply_merge(monkeypatch: pytest.MonkeyPatch):
+    """
+    If someone else saves first, _write_apply should keep both sets of changes.
+    """
+    apply_calls = []
+    monkeypatch.setattr(
+        imgr, "apply_config", lambda **kwargs: apply_calls.append(kwargs)
+    )
+    hutch = "pytest"
+    config = read_config(hutch)
+    original = copy(config.procs["ioc-counter"])
+    config.procs["ioc-counter"].disable = True
+
+    # Someone else edits a different IOC and saves before we do
+    other_config = read_config(hutch)
+    other_config.procs["ioc-shouter"].alias = "SOMEONE_ELSE"
+    mtime = write_config(cfgname=hutch, config=other_config)
+    os.utime(other_config.path, (mtime + 5, mtime + 5))
+
+    imgr._write_apply(
+        config=config, ioc_name="ioc-counter", hutch=hutch, original=original
+    )
+    assert len(apply_calls) == 1
+    merged = read_config(hutch)
+    assert merged.procs["ioc-counter"].disable
+    assert merged.procs["ioc-shouter"].alias == "SOMEONE_ELSE"
+
+
+def save_as_someone_else(hutch: str, ioc_name: str, **changes):
+    """Edit one IOC in the config file, making it newer than our copy."""
+    other_config = read_config(hutch)
+    for name, value in changes.items():
+        setattr(other_config.procs[ioc_name], name, value)
+    mtime = write_config(cfgname=hutch, config=other_config)
+    os.utime(other_config.path, (mtime + 5, mtime + 5))
+
+
+def test_write_apply_merge_same_ioc(monkeypatch: pytest.MonkeyPatch):
+    """
+    Edits to different settings of the same IOC should both be kept.
+    """
+    monkeypatch.setattr(imgr, "apply_config", lambda **kwargs: None)
+    hutch = "pytest"
+    config = read_config(hutch)
+    original = copy(config.procs["ioc-counter"])
+    assert not original.disable
+    config.procs["ioc-counter"].disable = True
+
+    # Someone else upgrades the IOC while we disable it
+    save_as_someone_else(hutch, "ioc-counter", path="ioc/someone/else")
+
+    imgr._write_apply(
+        config=config, ioc_name="ioc-counter", hutch=hutch, original=original
+    )
+    merged = read_config(hutch).procs["ioc-counter"]
+    assert merged.disable
+    assert merged.path == "ioc/someone/else"
+
+
+def test_write_apply_merge_conflict(monkeypatch: pytest.MonkeyPatch):
+    """
+    Different edits to the same setting should not be merged.
+    """
+    apply_calls = []
+    monkeypatch.setattr(
+        imgr, "apply_config", lambda **kwargs: apply_calls.append(kwargs)
+    )
+    hutch = "pytest"
+    config = read_config(hutch)
+    original = copy(config.procs["ioc-counter"])
+    config.procs["ioc-counter"].path = "ioc/our/upgrade"
+
+    save_as_someone_else(hutch, "ioc-counter", path="ioc/their/upgrade")
+
+    with pytest.raises(ConfigConflictError, match="path"):
+        imgr._write_apply(
+            config=config, ioc_name="ioc-counter", hutch=hutch, original=original
+        )
+    assert not apply_calls
+    assert read_config(hutch).procs["ioc-counter"].path == "ioc/their/upgrade"
+
+
 # Pick one failure case and a few simple success cases, not as thorough as auth test
 @pytest.mark.parametrize(
     "user,ioc_name,should_run",
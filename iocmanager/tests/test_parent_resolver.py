@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+from pytestqt.qtbot import QtBot
+
+from .. import parent_resolver
+from ..parent_resolver import ParentCache, ParentResolver
+
+
+@pytest.fixture(scope="function")
+def lookups(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, str]]:
+    """Fake get_parent that records its calls."""
+    calls = []
+
+    def get_parent_patch(directory: str, ioc_name: str) -> str:
+        calls.append((directory, ioc_name))
+        if ioc_name == "bad":
+            raise OSError("No such file")
+        return f"{directory}/parent_of_{ioc_name}"
+
+    monkeypatch.setattr(parent_resolver, "get_parent", get_parent_patch)
+    return calls
+
+
+@pytest.fixture(scope="function")
+def resolver(qtbot: QtBot) -> ParentResolver:
+    return ParentResolver(debounce_ms=50, cache=ParentCache())
+
+
+def test_debounce(
+    resolver: ParentResolver, lookups: list[tuple[str, str]], qtbot: QtBot
+):
+    """
+    Requests made in quick succession should only look up the last one.
+    """
+    for num in range(5):
+        resolver.request(directory=f"/dir{num}", ioc_name="ioc")
+    with qtbot.wait_signal(resolver.parent_resolved, timeout=1000) as blocker:
+        ...
+    assert blocker.args == ["/dir4", "ioc", "/dir4/parent_of_ioc"]
+    assert lookups == [("/dir4", "ioc")]
+
+    # Now it's cached, so we get it right away
+    results = []
+    resolver.parent_resolved.connect(lambda *args: results.append(args))
+    resolver.request(directory="/dir4", ioc_name="ioc")
+    assert results == [("/dir4", "ioc", "/dir4/parent_of_ioc")]
+    assert len(lookups) == 1
+
+
+def test_empty_and_errors(
+    resolver: ParentResolver, lookups: list[tuple[str, str]], qtbot: QtBot
+):
+    """
+    Missing inputs and failed lookups should both give an empty parent.
+    """
+    results = []
+    resolver.parent_resolved.connect(lambda *args: results.append(args))
+    resolver.request(directory="/dir", ioc_name="")
+    assert results == [("/dir", "", "")]
+    resolver.request(directory="/dir", ioc_name="bad")
+    qtbot.wait_until(lambda: len(results) == 2, timeout=1000)
+    assert results[1] == ("/dir", "bad", "")
+    assert not resolver.cache.get(directory="/dir", ioc_name="bad")
+
+
+def test_stale_result(
+    resolver: ParentResolver, monkeypatch: pytest.MonkeyPatch, qtbot: QtBot
+):
+    """
+    A lookup that finishes after the user moved on should not be shown.
+    """
+    release = threading.Event()
+
+    def slow_get_parent(directory: str, ioc_name: str) -> str:
+        if ioc_name == "slow":
+            release.wait(timeout=5)
+        return ioc_name
+
+    monkeypatch.setattr(parent_resolver, "get_parent", slow_get_parent)
+    results = []
+    resolver.parent_resolved.connect(lambda *args: results.append(args))
+    resolver.request(directory="/dir", ioc_name="slow")
+    qtbot.wait(100)
+    # The slow lookup has started, move on to another ioc
+    resolver.request(directory="/dir", ioc_name="fast")
+    qtbot.wait_until(lambda: bool(results), timeout=1000)
+    release.set()
+    qtbot.wait_until(
+        lambda: resolver.cache.get(directory="/dir", ioc_name="slow") is not None,
+        timeout=1000,
+    )
+    qtbot.wait(50)
+    assert results == [("/dir", "fast", "fast")]
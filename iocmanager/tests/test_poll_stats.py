@@ -0,0 +1,48 @@
+import pytest
+
+from ..poll_stats import PollPhase, PollStats
+
+
+def test_rolling_window():
+    """
+    Only the most recent measurements should count.
+    """
+    stats = PollStats(window=3)
+    for duration in (10.0, 1.0, 2.0, 3.0):
+        stats.record_phase(phase=PollPhase.PROBE, duration=duration)
+    summary = stats.phase_summary()[PollPhase.PROBE]
+    assert summary.count == 3
+    assert summary.mean == pytest.approx(2.0)
+    assert summary.max == 3.0
+    assert summary.last == 3.0
+    assert PollPhase.SWEEP not in stats.phase_summary()
+    assert not stats.last_sweep_time
+
+    stats.record_phase(phase=PollPhase.SWEEP, duration=1.0)
+    assert stats.last_sweep_time
+    stats.clear()
+    assert not stats.phase_summary()
+    assert not stats.last_sweep_time
+
+
+def test_slowest():
+    """
+    Hosts and IOCs should be ranked by their average status check time.
+    """
+    stats = PollStats()
+    stats.record_probe(host="fast", name="ioc1", duration=0.1)
+    stats.record_probe(host="slow", name="ioc2", duration=1.0)
+    stats.record_probe(host="slow", name="ioc3", duration=3.0)
+    stats.record_probe(host="fast", name="ioc1", duration=0.3)
+
+    hosts = stats.slowest_hosts()
+    assert [summary.name for summary in hosts] == ["slow", "fast"]
+    assert hosts[0].mean == pytest.approx(2.0)
+    assert hosts[1].count == 2
+    iocs = stats.slowest_iocs(count=2)
+    assert [summary.name for summary in iocs] == ["ioc3", "ioc2"]
+
+    report = stats.format_report(count=1)
+    assert "slow" in report
+    assert "fast" not in report
+    assert "ioc3" in report
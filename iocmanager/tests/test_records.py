@@ -0,0 +1,131 @@
+from copy import deepcopy
+from dataclasses import replace
+
+import pytest
+
+from .. import config
+from ..config import IOCProc, IOCStatusFile
+from ..procserv_tools import AutoRestartMode, IOCStatusLive, ProcServStatus
+from ..records import (
+    IOCProcRecord,
+    IOCStatusFileRecord,
+    IOCStatusLiveRecord,
+    MutableIOCProcRecord,
+    MutableIOCStatusLiveRecord,
+    RecordTable,
+)
+from .benchmark import _traced_size, memory_benchmark
+
+
+def make_proc(num: int) -> IOCProc:
+    return IOCProc(
+        name=f"ioc{num}",
+        port=30001 + num,
+        host="".join(("ho", "st")),
+        path="".join(("ioc/some/", "path")),
+        disable=bool(num % 2),
+        history=["ioc/some/old_path"],
+    )
+
+
+def test_records_round_trip():
+    proc = make_proc(1)
+    record = IOCProcRecord.from_dataclass(proc)
+    assert record.history == ("ioc/some/old_path",)
+    assert record.to_dataclass() == proc
+    assert not hasattr(record, "__dict__")
+    with pytest.raises(AttributeError):
+        record.port = 40000  # type: ignore
+    assert replace(record, port=40000).port == 40000
+    # Strings are interned and shared between records
+    other = IOCProcRecord.from_dataclass(make_proc(2))
+    assert record.host is other.host
+    assert record.path is other.path
+
+    status_file = IOCStatusFile(name="ioc1", port=30001, host="host", path="a", pid=1)
+    assert IOCStatusFileRecord.from_dataclass(status_file).to_dataclass() == status_file
+
+    status_live = IOCStatusLive(
+        name="ioc1",
+        port=30001,
+        host="host",
+        path="a",
+        pid=None,
+        status=ProcServStatus.RUNNING,
+        autorestart_mode=AutoRestartMode.ON,
+    )
+    assert IOCStatusLiveRecord.from_dataclass(status_live).to_dataclass() == status_live
+
+
+def test_record_keeps_parent(monkeypatch: pytest.MonkeyPatch):
+    """
+    Converting back to an IOCProc should not look up the parent again.
+    """
+    record = replace(IOCProcRecord.from_dataclass(make_proc(1)), parent="ioc/parent")
+
+    def no_lookup(*args, **kwargs):
+        raise AssertionError("Should have used the record's parent")
+
+    monkeypatch.setattr(config, "get_parent", no_lookup)
+    assert record.to_dataclass().parent == "ioc/parent"
+
+
+def test_mutable_records():
+    proc = make_proc(1)
+    record = MutableIOCProcRecord.from_dataclass(proc)
+    assert not hasattr(record, "__dict__")
+    record.port = 40000
+    assert record.to_dataclass() == replace(proc, port=40000)
+    # Convert between frozen and mutable
+    assert IOCProcRecord.from_dataclass(record).port == 40000
+    table = RecordTable(MutableIOCProcRecord, [proc])
+    assert isinstance(table["ioc1"], MutableIOCProcRecord)
+    live_record = MutableIOCStatusLiveRecord(
+        name="ioc1",
+        port=30001,
+        host="host",
+        path="a",
+        pid=None,
+        status=ProcServStatus.RUNNING,
+        autorestart_mode=AutoRestartMode.ON,
+    )
+    assert live_record.to_dataclass().status == ProcServStatus.RUNNING
+
+
+def test_record_table():
+    procs = [make_proc(num) for num in range(5)]
+    table = RecordTable(IOCProcRecord, procs)
+    assert len(table) == 5
+    assert "ioc3" in table
+    assert table.names() == [proc.name for proc in procs]
+    assert [record.to_dataclass() for record in table] == procs
+    assert table[2] == IOCProcRecord.from_dataclass(procs[2])
+    assert table[-1].name == "ioc4"
+    assert table["ioc1"].disable is True
+    assert table.get("nope") is None
+    assert table.column("port") == [30001, 30002, 30003, 30004, 30005]
+    assert table.column("disable") == [False, True, False, True, False]
+    with pytest.raises(IndexError):
+        table[5]
+
+    # Same name replaces the existing row
+    table.append(replace(table["ioc1"], port=40000))
+    assert len(table) == 5
+    assert table["ioc1"].port == 40000
+
+
+def test_memory_benchmark():
+    results = memory_benchmark()
+    assert results["hutches"] > 0
+    assert results["iocs"] > 0
+    assert results["record_bytes"] < results["dataclass_bytes"]
+
+
+def test_record_table_memory():
+    """
+    The fake hutches are too small to pay for the columns, so check at scale.
+    """
+    procs = [make_proc(num) for num in range(2000)]
+    _, dataclass_bytes = _traced_size(lambda: deepcopy(procs))
+    _, table_bytes = _traced_size(lambda: RecordTable(IOCProcRecord, procs))
+    assert table_bytes < dataclass_bytes
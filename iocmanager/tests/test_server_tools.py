@@ -1,7 +1,18 @@
+import threading
+import time
+from pathlib import Path
+
 import pytest
 
 from .. import server_tools
-from ..server_tools import _netconfig, _sdfconfig, netconfig, reboot_server, sdfconfig
+from ..server_tools import (
+    HostInfoCache,
+    _netconfig,
+    _sdfconfig,
+    netconfig,
+    reboot_server,
+    sdfconfig,
+)
 
 _example_netconfig_text = """
         name: ctl-pytest-cam-01
@@ -91,6 +102,84 @@ def test_sdfconfig_call():
     assert _sdfconfig(host, "domain").strip() == f"sdfconfig view --json {host}.domain"
 
 
+def test_host_info_cache(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    Lookups should run in parallel, up to the worker limit, and persist.
+    """
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+    calls: list[str] = []
+
+    def fake_sdfconfig(host: str, domain: str = "pcdsn"):
+        nonlocal running, max_running
+        with lock:
+            calls.append(host)
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        if host == "broken":
+            raise RuntimeError("sdfconfig is not configured")
+        if host == "unknown":
+            return "{}"
+        return f'{{"Description": "{host}"}}'
+
+    monkeypatch.setattr(server_tools, "_sdfconfig", fake_sdfconfig)
+    path = str(tmp_path / "sdfconfig.json")
+    hosts = [f"host{num}" for num in range(6)]
+    saves: list[str] = []
+    temp_file = server_tools.NamedTemporaryFile
+
+    def counting_temp_file(*args, **kwargs):
+        saves.append(path)
+        return temp_file(*args, **kwargs)
+
+    monkeypatch.setattr(server_tools, "NamedTemporaryFile", counting_temp_file)
+
+    cache = HostInfoCache(path=path, max_workers=3)
+    assert cache.get("host0") is None
+    futures = cache.refresh(hosts + ["unknown", "broken"])
+    for host in hosts:
+        assert futures[host].result(timeout=5) == {"Description": host}
+    assert futures["unknown"].result(timeout=5) == {}
+    with pytest.raises(RuntimeError):
+        futures["broken"].result(timeout=5)
+    assert 1 < max_running <= 3
+    cache.shutdown(wait=True)
+    # The whole batch is saved at once
+    assert len(saves) == 1
+
+    # A new session should start from the file without calling sdfconfig
+    calls.clear()
+    cache = HostInfoCache(path=path)
+    assert cache.get("host3") == {"Description": "host3"}
+    assert cache.fetch("unknown") == {}
+    assert cache.get("broken") is None
+    assert not cache.refresh(hosts)
+    assert not calls
+    cache.shutdown(wait=True)
+
+    # Stale info is still served, but gets refreshed in the background
+    cache = HostInfoCache(path=path, ttl=0)
+    assert cache.fetch("host1") == {"Description": "host1"}
+    cache.shutdown(wait=True)
+    assert calls == ["host1"]
+
+    # Two sessions saving at once should keep each other's results
+    first = HostInfoCache(path=path)
+    second = HostInfoCache(path=path)
+    first.fetch("first")
+    second.fetch("second")
+    first.shutdown(wait=True)
+    second.shutdown(wait=True)
+    cache = HostInfoCache(path=path)
+    assert cache.get("first") == {"Description": "first"}
+    assert cache.get("second") == {"Description": "second"}
+    cache.shutdown(wait=True)
+
+
 def test_reboot_server(capfd: pytest.CaptureFixture):
     # Fake reboot script tools/bin/psipmi just echoes our command
     host = "asdfsdfasdf"
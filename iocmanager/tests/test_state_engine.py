@@ -0,0 +1,272 @@
+import pytest
+
+from .. import state_engine
+from ..config import Config, IOCProc, IOCStatusFile
+from ..poll_stats import PollPhase
+from ..procserv_tools import AutoRestartMode, IOCStatusLive, ProcServStatus
+from ..state_engine import (
+    ChangedPart,
+    IOCStateEngine,
+    SharedProber,
+    StateObserver,
+    StatusPoller,
+    _contiguous_ranges,
+)
+from .benchmark import engine_benchmark, poll_benchmark
+
+
+class RecordingObserver(StateObserver):
+    """Keep a list of every change the engine reports."""
+
+    def __init__(self):
+        self.events: list[tuple] = []
+
+    def rows_inserted(self, first: int, last: int):
+        self.events.append(("inserted", first, last))
+
+    def rows_removed(self, first: int, last: int):
+        self.events.append(("removed", first, last))
+
+    def layout_changed(self):
+        self.events.append(("layout",))
+
+    def rows_changed(self, first: int, last: int, part: ChangedPart):
+        self.events.append(("changed", first, last, part))
+
+
+@pytest.fixture(scope="function")
+def engine() -> IOCStateEngine:
+    """Engine with the same starting data as the model fixture, but no gui."""
+    config = Config(path="")
+    for num in range(10):
+        config.add_proc(
+            IOCProc(
+                name=f"ioc{num}",
+                port=30001 + num,
+                host="host",
+                path=f"ioc/some/path/{num}",
+            )
+        )
+    return IOCStateEngine(config=config, hutch="pytest", observer=RecordingObserver())
+
+
+def events(engine: IOCStateEngine) -> list[tuple]:
+    """Return and forget the changes that the engine reported."""
+    assert isinstance(engine.observer, RecordingObserver)
+    recorded = engine.observer.events
+    engine.observer.events = []
+    return recorded
+
+
+def test_contiguous_ranges():
+    assert _contiguous_ranges([]) == []
+    assert _contiguous_ranges([1, 2, 3, 7, 9, 10]) == [(1, 3), (7, 7), (9, 10)]
+
+
+def test_pending_edits(engine: IOCStateEngine):
+    """
+    Edits should be staged in the engine and reported to the observer.
+    """
+    new_proc = IOCProc(name="new", port=30001, host="host", path="ioc/new")
+    engine.add_ioc(ioc_proc=new_proc)
+    # Row 10, and now the port conflicts with ioc0
+    assert events(engine) == [
+        ("inserted", 10, 10),
+        ("changed", 10, 10, ChangedPart.PORT),
+        ("changed", 0, 0, ChangedPart.PORT),
+    ]
+    assert engine.get_ioc_names()[10] == "new"
+    assert engine.pending_edits(name="new")
+
+    edit_proc = IOCProc(name="ioc3", port=30004, host="host", path="ioc/edited")
+    engine.edit_ioc(ioc_proc=edit_proc)
+    assert events(engine) == [("changed", 3, 3, ChangedPart.ROW)]
+    assert engine.get_ioc_proc(name="ioc3") is edit_proc
+
+    engine.delete_ioc(name="ioc5")
+    assert events(engine) == [("changed", 5, 5, ChangedPart.ROW)]
+    assert engine.pending_edits(name="ioc5")
+    assert "ioc5" not in engine.get_next_config_view().procs
+
+    engine.revert_ioc(name="new")
+    assert events(engine) == [
+        ("removed", 10, 10),
+        ("changed", 0, 0, ChangedPart.PORT),
+    ]
+    assert "new" not in engine.get_ioc_names()
+
+    engine.reset_edits()
+    assert events(engine) == [("changed", 0, 9, ChangedPart.ROW)]
+    assert not any(engine.pending_edits(name=name) for name in engine.get_ioc_names())
+
+
+def test_poll_once(engine: IOCStateEngine, monkeypatch: pytest.MonkeyPatch):
+    """
+    One headless poll sweep should update the live status and the desync info.
+    """
+
+    def read_status_dir_patch(cfg: str) -> list[IOCStatusFile]:
+        return [
+            IOCStatusFile(
+                name="live0",
+                port=39100,
+                host="host",
+                path="ioc/live0",
+                pid=1234,
+            )
+        ]
+
+    def check_status_patch(host: str, port: int, name: str) -> IOCStatusLive:
+        if name == "ioc2":
+            # Running somewhere other than its config
+            port = 39000
+        return IOCStatusLive(
+            name=name,
+            port=port,
+            host=host,
+            path="/tmp",
+            pid=None,
+            status=ProcServStatus.RUNNING,
+            autorestart_mode=AutoRestartMode.ON,
+        )
+
+    monkeypatch.setattr(state_engine, "read_status_dir", read_status_dir_patch)
+    monkeypatch.setattr(state_engine, "check_status", check_status_patch)
+
+    poller = StatusPoller(engine=engine)
+    poller.poll_once()
+
+    assert poller.first_poll_done.is_set()
+    assert PollPhase.SWEEP in poller.poll_stats.phase_summary()
+    assert len(engine.status_live) == 11
+    assert engine.get_ioc_names()[10] == "live0"
+    assert engine.live_only_iocs["live0"].path == "ioc/live0"
+    assert engine.get_desync_text(name="ioc0") == ""
+    assert engine.get_desync_text(name="ioc2") == "Live: on host:39000"
+    assert engine.get_desync_text(name="live0") == "Untracked IOC: Not in config!"
+    assert engine.get_desync_info(name="ioc2").port == 39000
+    assert events(engine) == [
+        ("inserted", 10, 10),
+        ("changed", 0, 10, ChangedPart.LIVE),
+    ]
+
+    # Nothing changed, nothing to report
+    poller.poll_once()
+    assert not events(engine)
+
+
+def test_config_update_while_polling(engine: IOCStateEngine):
+    """
+    A new config must not change a procs dict the poll thread may be reading.
+    """
+    new_config = Config(path="", mtime=engine.config.mtime + 1)
+    for num in range(0, 10, 2):
+        new_config.add_proc(engine.config.procs[f"ioc{num}"])
+    new_config.add_proc(IOCProc(name="new", port=30100, host="host", path="ioc/new"))
+    # Start iterating partway through the update, like the poll thread could
+    polled = []
+
+    def start_polling(first: int, last: int):
+        names = iter(engine.config.procs)
+        next(names)
+        polled.append(names)
+
+    engine.observer.rows_about_to_be_removed = start_polling
+    engine.update_from_config_file(config=new_config)
+    # Would raise RuntimeError if the dict changed size during iteration
+    for names in polled:
+        list(names)
+    assert polled
+    assert engine.get_ioc_names() == [*new_config.procs]
+
+
+def test_poll_loop_survives_errors(
+    engine: IOCStateEngine, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    An error in one sweep should be logged, not stop the polling.
+    """
+    sweeps = []
+
+    def inner_poll_patch(executor):
+        sweeps.append(True)
+        if len(sweeps) == 1:
+            raise RuntimeError("dictionary changed size during iteration")
+        poller.stop()
+
+    poller = StatusPoller(engine=engine, poll_interval=0.01)
+    monkeypatch.setattr(poller, "_inner_poll", inner_poll_patch)
+    poller.start()
+    poller.poll_thread.join(timeout=5)
+    assert not poller.poll_thread.is_alive()
+    assert len(sweeps) == 2
+    # The thread cleans up its file watcher when it's done
+    assert poller.file_watcher._fd is None
+
+
+def test_shared_prober(engine: IOCStateEngine, monkeypatch: pytest.MonkeyPatch):
+    """
+    Pollers that share a prober should only check each host and port once.
+    """
+    # A second hutch with half of the same IOCs under different names
+    config = Config(path="")
+    for num in range(5, 15):
+        config.add_proc(
+            IOCProc(
+                name=f"other{num}",
+                port=30001 + num,
+                host="host",
+                path=f"ioc/other/path/{num}",
+            )
+        )
+    other_engine = IOCStateEngine(config=config, hutch="other")
+    checked: list[tuple[str, int]] = []
+
+    def check_status_patch(host: str, port: int, name: str) -> IOCStatusLive:
+        checked.append((host, port))
+        return IOCStatusLive(
+            name=name,
+            port=port,
+            host=host,
+            path="",
+            pid=None,
+            status=ProcServStatus.NOCONNECT,
+            autorestart_mode=AutoRestartMode.OFF,
+        )
+
+    monkeypatch.setattr(state_engine, "read_status_dir", lambda cfg: [])
+    monkeypatch.setattr(state_engine, "check_status", check_status_patch)
+
+    prober = SharedProber()
+    try:
+        for eng in (engine, other_engine):
+            StatusPoller(engine=eng, prober=prober).poll_once()
+    finally:
+        prober.shutdown()
+
+    assert len(checked) == len(set(checked)) == 15
+    assert prober.probe_count == 15
+    # Each hutch still sees its own names for the shared ports
+    assert engine.status_live["ioc7"].name == "ioc7"
+    assert other_engine.status_live["other7"].name == "other7"
+
+
+def test_poll_benchmark():
+    """
+    The poll benchmark should report every phase of the poll sweep.
+    """
+    results = poll_benchmark(hutch="pytest", sweeps=2)
+    for phase in PollPhase:
+        assert results[str(phase)] > 0
+    assert results["slowest_host"]
+    assert results["slowest_ioc"]
+
+
+def test_engine_benchmark():
+    """
+    The engine benchmark should run without a QApplication.
+    """
+    results = engine_benchmark(rows=500, sweeps=5)
+    assert results["rows"] == 500
+    for key in ("full_batch", "small_batch", "live_only_batch", "desync_sweep"):
+        assert results[key] > 0
@@ -0,0 +1,158 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from ..config import find_iocs, read_config
+from ..env_paths import env_paths
+from ..procserv_tools import AutoRestartMode, IOCStatusLive, ProcServStatus
+from ..state_store import StateStore, default_store_path, sync_store
+
+
+@pytest.fixture(scope="function")
+def store() -> StateStore:
+    with StateStore(":memory:") as store:
+        sync_store(store, hutches=["pytest"])
+        yield store
+
+
+def live(
+    name: str, host: str, port: int, path: str, status=ProcServStatus.RUNNING
+) -> IOCStatusLive:
+    return IOCStatusLive(
+        name=name,
+        port=port,
+        host=host,
+        path=path,
+        pid=1234,
+        status=status,
+        autorestart_mode=AutoRestartMode.ON,
+    )
+
+
+def test_default_store_path():
+    with StateStore() as store:
+        assert store.path == default_store_path()
+        assert store.path.startswith(env_paths.CACHE_DIR)
+    assert os.path.exists(default_store_path())
+
+
+def test_find_iocs(store: StateStore):
+    for kwargs in (
+        {"host": "test-server1"},
+        {"port": 30002},
+        {"id": "ioc-counter"},
+        {"disable": False},
+        {"name": "not-an-ioc"},
+    ):
+        expected = [
+            (cfg, ioc)
+            for cfg, ioc in find_iocs(**kwargs)
+            if cfg == env_paths.CONFIG_FILE % "pytest"
+        ]
+        assert store.find_iocs(**kwargs) == expected
+
+    with pytest.raises(ValueError):
+        store.find_iocs(mtime=0)
+
+
+def test_ingest_config_replaces(store: StateStore):
+    config = read_config("pytest")
+    config.delete_proc("ioc-shouter")
+    store.ingest_config(hutch="pytest", config=config)
+    assert [ioc.name for _, ioc in store.find_iocs()] == ["ioc-counter"]
+
+
+def test_history(store: StateStore):
+    # Status files from sync_store
+    runs = store.history(name="ioc-counter")
+    assert len(runs) == 1
+    assert runs[0].source == "status"
+    assert runs[0].path == "iocs/counter"
+
+    store.ingest_live(
+        hutch="pytest",
+        statuses=[live("ioc-counter", "test-server2", 30002, "ioc/new")],
+        seen=1000,
+    )
+    # Same state again later only extends it
+    store.ingest_live(
+        hutch="pytest",
+        statuses=[live("ioc-counter", "test-server2", 30002, "ioc/new")],
+        seen=2000,
+    )
+    runs = store.history(path="ioc/new", host="test-server2")
+    assert len(runs) == 1
+    assert runs[0].source == "live"
+    assert (runs[0].first_seen, runs[0].last_seen) == (1000, 2000)
+    assert store.history(path="ioc/new", since=2500) == []
+    assert store.history(path="ioc/new", until=500) == []
+    assert len(store.history(path="ioc/new", since=1500, until=1800)) == 1
+
+
+def test_desync(store: StateStore):
+    # Nothing inspected yet, nothing to report
+    assert store.desync() == []
+    store.ingest_live(
+        hutch="pytest",
+        statuses=[
+            live("ioc-counter", "test-server2", 30002, "ioc/counter"),
+            live("ioc-shouter", "test-server2", 30001, "ioc/shouter"),
+        ],
+        seen=1000,
+    )
+    desyncs = store.desync(hutch="pytest")
+    assert [(item.name, item.live_host) for item in desyncs] == [
+        ("ioc-shouter", "test-server2")
+    ]
+    # Newer live info wins
+    store.ingest_live(
+        hutch="pytest",
+        statuses=[live("ioc-shouter", "test-server1", 30001, "ioc/shouter")],
+        seen=2000,
+    )
+    assert store.desync() == []
+
+
+def test_history_no_pid(store: StateStore):
+    """
+    A stopped IOC has no pid, seeing it again should still only extend its run.
+    """
+    stopped = live("ioc-counter", "test-server2", 30002, "", ProcServStatus.NOCONNECT)
+    stopped.pid = None
+    for seen in range(1000, 6000, 1000):
+        store.ingest_live(hutch="pytest", statuses=[stopped], seen=seen)
+    runs = [run for run in store.history(name="ioc-counter") if run.source == "live"]
+    assert len(runs) == 1
+    assert runs[0].pid is None
+    assert (runs[0].first_seen, runs[0].last_seen) == (1000, 5000)
+
+
+def test_desync_unknown_live_path(store: StateStore):
+    """
+    procServ often reports /tmp or nothing as the path, that's not a desync.
+    """
+    store.ingest_live(
+        hutch="pytest",
+        statuses=[
+            live("ioc-counter", "test-server2", 30002, "/tmp"),
+            live("ioc-shouter", "test-server1", 30001, ""),
+        ],
+        seen=1000,
+    )
+    assert store.desync() == []
+    # The host and port are still checked
+    store.ingest_live(
+        hutch="pytest",
+        statuses=[live("ioc-counter", "test-server1", 30002, "/tmp")],
+        seen=2000,
+    )
+    assert [item.name for item in store.desync()] == ["ioc-counter"]
+
+
+def test_store_persists(tmp_path: Path):
+    path = str(tmp_path / "store.sqlite")
+    with StateStore(path) as store:
+        sync_store(store, hutches=["pytest"])
+    with StateStore(path) as store:
+        assert len(store.find_iocs()) == 2
@@ -0,0 +1,152 @@
+import pytest
+from qtpy.QtCore import Qt
+
+from ..config import IOCProc
+from ..procserv_tools import ProcServStatus
+from ..table_filter import IOCFilter, IOCFilterProxyModel
+from ..table_model import IOCTableModel, TableColumn
+from .conftest import make_live
+
+
+@pytest.fixture(scope="function")
+def proxy(model: IOCTableModel) -> IOCFilterProxyModel:
+    proxy = IOCFilterProxyModel()
+    proxy.setSourceModel(model)
+    return proxy
+
+
+def shown_names(proxy: IOCFilterProxyModel) -> list[str]:
+    """The IOC names in the order that the proxy shows them."""
+    return [
+        proxy.sourceModel().get_ioc_name(ioc=proxy.mapToSource(proxy.index(row, 0)))
+        for row in range(proxy.rowCount())
+    ]
+
+
+@pytest.mark.parametrize(
+    "text,expected_text,expected_fields",
+    (
+        ("", [], {}),
+        ("IOC1", ["ioc1"], {}),
+        ("ioc host:Host1 host:h", ["ioc"], {"host": ["host1", "h"]}),
+        ("desync state:", [], {"desync": ["yes"]}),
+        ("other:thing", ["other:thing"], {}),
+    ),
+)
+def test_ioc_filter_from_text(
+    text: str, expected_text: list[str], expected_fields: dict[str, list[str]]
+):
+    ioc_filter = IOCFilter.from_text(text)
+    assert ioc_filter.text == expected_text
+    assert ioc_filter.fields == expected_fields
+    assert bool(ioc_filter) == bool(expected_text or expected_fields)
+
+
+def test_filter_fields(model: IOCTableModel, proxy: IOCFilterProxyModel):
+    """
+    Each filter field should show only the matching IOCs.
+    """
+    assert proxy.rowCount() == 10
+    model.edit_iocs["ioc2"] = IOCProc(
+        name="ioc2", port=30003, host="other", path="ioc/some/path/2", disable=True
+    )
+    model.edit_iocs["ioc4"] = IOCProc(
+        name="ioc4", port=30005, host="host", path="ioc/some/path/4", alias="Four"
+    )
+    model.dataChanged.emit(model.index(2, 0), model.index(4, model.columnCount() - 1))
+    model.update_from_live_ioc(status_live=make_live("ioc3", port=30004))
+    # Running on the wrong port
+    model.update_from_live_ioc(
+        status_live=make_live("ioc5", port=40000, path="ioc/some/path/5")
+    )
+
+    proxy.set_filter_text("ioc1")
+    assert shown_names(proxy) == ["ioc1"]
+    proxy.set_filter_text("FOUR")
+    assert shown_names(proxy) == ["ioc4"]
+    proxy.set_filter_text("host:oth")
+    assert shown_names(proxy) == ["ioc2"]
+    proxy.set_filter_text("state:off")
+    assert shown_names(proxy) == ["ioc2"]
+    proxy.set_filter_text("status:running")
+    assert sorted(shown_names(proxy)) == ["ioc3", "ioc5"]
+    proxy.set_filter_text("desync")
+    assert shown_names(proxy) == ["ioc5"]
+    proxy.set_filter_text("version:ioc/some/path/7")
+    assert shown_names(proxy) == ["ioc7"]
+    proxy.set_filter_text("ioc host:host status:run")
+    assert sorted(shown_names(proxy)) == ["ioc3", "ioc5"]
+    proxy.set_filter_text("")
+    assert proxy.rowCount() == 10
+
+
+def test_filter_incremental(
+    model: IOCTableModel, proxy: IOCFilterProxyModel, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    Model changes should update the filter one IOC at a time.
+
+    Changing the filter text should not need to recompute anything.
+    """
+    proxy.set_filter_text("status:running")
+    assert proxy.rowCount() == 0
+    computed: list[str] = []
+    compute_keys = proxy._compute_keys
+
+    def counting_compute_keys(name: str):
+        computed.append(name)
+        return compute_keys(name=name)
+
+    monkeypatch.setattr(proxy, "_compute_keys", counting_compute_keys)
+
+    model.update_from_live_ioc(status_live=make_live("ioc3", port=30004))
+    assert shown_names(proxy) == ["ioc3"]
+    assert set(computed) == {"ioc3"}
+
+    # A new live-only IOC is included as soon as it appears
+    model.update_from_live_ioc(status_live=make_live("live", port=40000))
+    assert sorted(shown_names(proxy)) == ["ioc3", "live"]
+
+    # And removed when it goes away
+    model.update_from_live_ioc(
+        status_live=make_live("live", port=40000, status=ProcServStatus.NOCONNECT)
+    )
+    assert shown_names(proxy) == ["ioc3"]
+
+    # Added IOCs are included too
+    model.add_ioc(IOCProc(name="added", port=40001, host="host", path="ioc/added"))
+    proxy.set_filter_text("add")
+    assert shown_names(proxy) == ["added"]
+
+    computed.clear()
+    for text in ("i", "io", "ioc", "ioc1", "host:", "host:h", ""):
+        proxy.set_filter_text(text)
+    assert not computed
+
+    # A live-only IOC that gets added to the config briefly has two rows
+    proxy.set_filter_text("new")
+    model.update_from_live_ioc(status_live=make_live("newioc", port=40002))
+    assert shown_names(proxy) == ["newioc"]
+    model.add_ioc(IOCProc(name="newioc", port=40002, host="host", path=""))
+    assert shown_names(proxy) == ["newioc"]
+    # It is no longer an untracked IOC
+    proxy.set_filter_text("desync:no new")
+    assert shown_names(proxy) == ["newioc"]
+    assert proxy.mapToSource(proxy.index(0, 0)).row() == model.get_ioc_row("newioc")
+
+
+def test_sort(model: IOCTableModel, proxy: IOCFilterProxyModel):
+    """
+    Sorting should use the precomputed keys and follow model changes.
+    """
+    proxy.sort(TableColumn.PORT, Qt.DescendingOrder)
+    assert shown_names(proxy)[:2] == ["ioc9", "ioc8"]
+
+    # Editing a port should move the row
+    assert model.setData(model.index(0, TableColumn.PORT), 30050)
+    assert shown_names(proxy)[0] == "ioc0"
+
+    proxy.sort(TableColumn.IOCNAME, Qt.AscendingOrder)
+    assert shown_names(proxy) == [f"ioc{num}" for num in range(10)]
+    proxy.set_filter_text("ioc1")
+    assert shown_names(proxy) == ["ioc1"]
@@ -2,6 +2,7 @@ import concurrent.futures
 import dataclasses
 import time
 from copy import deepcopy
+from pathlib import Path
 from typing import Any
 from unittest.mock import Mock
 
@@ -11,8 +12,10 @@ from qtpy.QtCore import QModelIndex, Qt, QVariant
 from qtpy.QtGui import QBrush
 from qtpy.QtWidgets import QDialog, QMessageBox
 
-from .. import table_model
+from .. import state_engine
 from ..config import Config, IOCProc
+from ..env_paths import env_paths
+from ..poll_stats import PollPhase
 from ..procserv_tools import (
     AutoRestartMode,
     IOCStatusFile,
@@ -22,10 +25,12 @@ from ..procserv_tools import (
 from ..table_model import (
     DesyncInfo,
     IOCTableModel,
+    PollBatch,
     StateOption,
     TableColumn,
     table_headers,
 )
+from .benchmark import next_config_benchmark, table_benchmark
 
 
 @pytest.mark.parametrize(
@@ -289,6 +294,214 @@ def test_get_ioc_row_map(model: IOCTableModel):
     assert model.get_ioc_row_map() == starting_map + ext_map
 
 
+def test_lazy_dialogs(qtbot: QtBot):
+    """
+    The model's dialogs should not be built until they are used.
+    """
+    model = IOCTableModel(config=Config(path=""), hutch="pytest")
+    assert model._dialog_add is None
+    assert model._dialog_details is None
+    dialog_add = model.dialog_add
+    qtbot.add_widget(dialog_add)
+    assert model.dialog_add is dialog_add
+    assert model._dialog_details is None
+    qtbot.add_widget(model.dialog_details)
+    assert model.dialog_details is model._dialog_details
+
+
+def test_row_map_cache(model: IOCTableModel):
+    """
+    The cached row map should follow every change to which IOC is in which row.
+    """
+    assert model.get_ioc_row(ioc="ioc3") == 3
+    assert model.get_ioc_name(ioc=3) == "ioc3"
+    with pytest.raises(ValueError):
+        model.get_ioc_row(ioc="live_only0")
+
+    def make_live(
+        name: str, status: ProcServStatus = ProcServStatus.RUNNING
+    ) -> IOCStatusLive:
+        return IOCStatusLive(
+            name=name,
+            port=40000,
+            host="host",
+            path="",
+            pid=0,
+            status=status,
+            autorestart_mode=AutoRestartMode.ON,
+        )
+
+    model.update_from_live_ioc(status_live=make_live("live_only0"))
+    assert model.get_ioc_row(ioc="live_only0") == 10
+    assert model.rowCount() == 11
+
+    # Same number of live-only IOCs, but a different one
+    model.update_from_live_ioc(
+        status_live=make_live("live_only0", status=ProcServStatus.NOCONNECT)
+    )
+    model.update_from_live_ioc(status_live=make_live("live_only1"))
+    assert model.get_ioc_row(ioc="live_only1") == 10
+    assert model.get_ioc_name(ioc=10) == "live_only1"
+    assert model.rowCount() == 11
+
+    # Added IOCs go before the live-only IOCs
+    model.add_ioc(
+        ioc_proc=IOCProc(name="added", port=40001, host="host", path="ioc/added")
+    )
+    assert model.get_ioc_row(ioc="added") == 10
+    assert model.get_ioc_row(ioc="live_only1") == 11
+    model.revert_ioc(ioc="added")
+    assert model.get_ioc_row(ioc="live_only1") == 10
+    with pytest.raises(ValueError):
+        model.get_ioc_row(ioc="added")
+
+
+def test_live_only_incremental(model: IOCTableModel):
+    """
+    Live-only IOCs should be inserted and removed one row at a time.
+
+    Rows should be removed from where they are rather than from the end,
+    and an IOC whose live status changes without moving should keep its
+    existing IOCProc.
+    """
+    inserts: list[tuple[int, int]] = []
+    removes: list[tuple[int, int]] = []
+    model.rowsInserted.connect(lambda _, first, last: inserts.append((first, last)))
+    model.rowsRemoved.connect(lambda _, first, last: removes.append((first, last)))
+
+    def make_live(
+        name: str, status: ProcServStatus = ProcServStatus.RUNNING
+    ) -> IOCStatusLive:
+        return IOCStatusLive(
+            name=name,
+            port=40000,
+            host="host",
+            path=f"ioc/{name}",
+            pid=0,
+            status=status,
+            autorestart_mode=AutoRestartMode.ON,
+        )
+
+    for num in range(3):
+        model.update_from_live_ioc(status_live=make_live(f"live{num}"))
+    assert inserts == [(10, 10), (11, 11), (12, 12)]
+    assert model.get_ioc_row_map()[10:] == ["live0", "live1", "live2"]
+
+    # Changing only the status keeps the same provisional IOCProc
+    live_proc = model.live_only_iocs["live0"]
+    model.update_from_live_ioc(
+        status_live=make_live("live0", status=ProcServStatus.SHUTDOWN)
+    )
+    assert model.live_only_iocs["live0"] is live_proc
+
+    # Losing the middle one removes the middle row
+    model.update_from_live_ioc(
+        status_live=make_live("live1", status=ProcServStatus.NOCONNECT)
+    )
+    assert removes == [(11, 11)]
+    assert model.get_ioc_row_map()[10:] == ["live0", "live2"]
+
+    # A status file updates the path of a live-only IOC
+    model.update_from_status_file(
+        status_file=IOCStatusFile(
+            name="live2", port=40000, host="host", path="ioc/live2/R1.0.0", pid=0
+        )
+    )
+    assert model.live_only_iocs["live2"].path == "ioc/live2/R1.0.0"
+    assert model.get_ioc_row(ioc="live2") == 11
+
+    # Adding it to the config removes it from the live-only section
+    model.add_ioc(
+        ioc_proc=IOCProc(name="live0", port=40000, host="host", path="ioc/live0")
+    )
+    assert model.get_ioc_row_map()[10:] == ["live0", "live2"]
+    assert "live0" not in model.live_only_iocs
+    assert removes == [(11, 11), (11, 11)]
+
+
+def test_row_view_cache(model: IOCTableModel):
+    """
+    data() should be cached per row, but always show the latest values.
+    """
+    index = model.index(0, TableColumn.IOCNAME)
+    assert model.data(index) == "ioc0"
+    assert model.get_row_view(ioc=0) is model.get_row_view(ioc="ioc0")
+
+    # Edits
+    assert model.setData(index, "alias0")
+    assert model.data(index) == "alias0"
+    assert model.data(index, Qt.ForegroundRole).color() == Qt.blue
+    # Other rows keep their cache
+    row_view = model.get_row_view(ioc=1)
+    model.delete_ioc(ioc=0)
+    assert model.data(index, Qt.ForegroundRole).color() == Qt.red
+    assert model.get_row_view(ioc=1) is row_view
+    model.revert_ioc(ioc=0)
+    assert model.data(index) == "ioc0"
+    model.setData(index, "alias0")
+    model.reset_edits()
+    assert model.data(index) == "ioc0"
+
+    # Live status
+    status_index = model.index(0, TableColumn.STATUS)
+    assert model.data(status_index) == ProcServStatus.INIT
+    model.update_from_live_ioc(
+        status_live=IOCStatusLive(
+            name="ioc0",
+            port=30001,
+            host="host",
+            path="ioc/some/path/0",
+            pid=0,
+            status=ProcServStatus.RUNNING,
+            autorestart_mode=AutoRestartMode.ON,
+        )
+    )
+    assert model.data(status_index) == ProcServStatus.RUNNING
+    assert model.data(status_index, Qt.BackgroundRole).color() == Qt.green
+
+    # Status file with a different path
+    model.update_from_status_file(
+        status_file=IOCStatusFile(
+            name="ioc0", port=30001, host="host", path="ioc/other/path", pid=0
+        )
+    )
+    assert model.data(status_index, Qt.BackgroundRole).color() == Qt.yellow
+    assert "ioc/other/path" in model.data(model.index(0, TableColumn.EXTRA))
+
+    # Uncached columns are always up to date
+    port_index = model.index(1, TableColumn.PORT)
+    assert model.data(port_index, Qt.BackgroundRole).color() == Qt.white
+    model.setData(model.index(0, TableColumn.PORT), 30002)
+    assert model.data(port_index, Qt.BackgroundRole).color() == Qt.red
+
+
+def test_table_benchmark(qtbot: QtBot):
+    """
+    The table benchmark should run, a quick smoke test with fewer rows.
+    """
+    results = table_benchmark(rows=200, scroll_steps=5)
+    assert results["rows"] == 200
+    for key in (
+        "data_sweep",
+        "repeat_sweep",
+        "first_paint",
+        "scroll_frame",
+        "sort",
+        "filter_keystroke",
+    ):
+        assert results[key] > 0
+
+
+def test_next_config_benchmark(qtbot: QtBot):
+    """
+    The next config benchmark should run, and the view should beat the copy.
+    """
+    results = next_config_benchmark(rows=500, sweeps=5)
+    assert results["rows"] == 500
+    assert results["materialize"] > 0
+    assert 0 < results["view_sweep"] < results["copy_sweep"]
+
+
 def test_get_live_info(model: IOCTableModel):
     """
     model.get_live_info should return information about the live IOC.
@@ -1049,10 +1262,10 @@ def test_poll(model: IOCTableModel, monkeypatch: pytest.MonkeyPatch, qtbot: QtBo
             for proc in fake_config.procs.values()
         ]
 
-    monkeypatch.setattr(table_model, "read_config", read_config_patch)
-    monkeypatch.setattr(table_model, "get_host_os", get_host_os_patch)
-    monkeypatch.setattr(table_model, "check_status", check_status_patch)
-    monkeypatch.setattr(table_model, "read_status_dir", read_status_dir_patch)
+    monkeypatch.setattr(state_engine, "read_config", read_config_patch)
+    monkeypatch.setattr(state_engine, "get_host_os", get_host_os_patch)
+    monkeypatch.setattr(state_engine, "check_status", check_status_patch)
+    monkeypatch.setattr(state_engine, "read_status_dir", read_status_dir_patch)
 
     assert model.config.commithost != "psbuild-lmao"
     assert not model.host_os
@@ -1076,6 +1289,8 @@ def test_poll(model: IOCTableModel, monkeypatch: pytest.MonkeyPatch, qtbot: QtBo
         qtbot.wait_until(assert_poll_works)
         fake_host_os = "rhel7"
         fake_live_status = ProcServStatus.SHUTDOWN
+        # Host info is only re-read when the host directory changes
+        (Path(env_paths.HOST_DIR) / "new-host").write_text("rhel7\n")
         qtbot.wait_until(assert_poll_works)
     finally:
         model.stop_poll_thread()
@@ -1083,6 +1298,42 @@ def test_poll(model: IOCTableModel, monkeypatch: pytest.MonkeyPatch, qtbot: QtBo
     assert not model.poll_thread.is_alive()
 
 
+def test_poll_stats(model: IOCTableModel, monkeypatch: pytest.MonkeyPatch):
+    """
+    A poll sweep should record its phase timings and each status check.
+    """
+
+    def read_status_dir_patch(cfg: str) -> list[IOCStatusFile]:
+        return []
+
+    def check_status_patch(host: str, port: int, name: str) -> IOCStatusLive:
+        if name == "ioc3":
+            time.sleep(0.05)
+        return IOCStatusLive(
+            name=name,
+            port=port,
+            host=host,
+            path="",
+            pid=None,
+            status=ProcServStatus.NOCONNECT,
+            autorestart_mode=AutoRestartMode.ON,
+        )
+
+    monkeypatch.setattr(state_engine, "read_status_dir", read_status_dir_patch)
+    monkeypatch.setattr(state_engine, "check_status", check_status_patch)
+
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        model.poller._inner_poll(executor=executor)
+
+    phases = model.poll_stats.phase_summary()
+    assert PollPhase.STATUS_DIR_READ in phases
+    assert PollPhase.EMIT in phases
+    assert phases[PollPhase.PROBE].last >= 0.05
+    assert model.poll_stats.slowest_iocs(count=1)[0].name == "ioc3"
+    assert model.poll_stats.slowest_hosts()[0].name == "host"
+    assert model.poll_stats.slowest_hosts()[0].count == 10
+
+
 def test_update_from_config_file(model: IOCTableModel):
     """
     model.update_from_config_file should introduce a new config file to the model.
@@ -1090,15 +1341,26 @@ def test_update_from_config_file(model: IOCTableModel):
     If the new config file is newer than the most recently read config file,
     we'll use it as our new base truth config.
 
-    If we store a new config, we'll emit dataChanged across the entire valid
-    range of the table.
+    If we store a new config, we'll only emit signals for the rows that changed:
+    rows removed for removed IOCs, rows inserted for new IOCs,
+    and dataChanged for modified IOCs.
     """
     data_emits: list[tuple[QModelIndex, QModelIndex]] = []
+    insert_emits: list[tuple[int, int]] = []
+    remove_emits: list[tuple[int, int]] = []
 
     def save_data_emit(index1: QModelIndex, index2: QModelIndex):
         data_emits.append((index1, index2))
 
+    def save_insert_emit(parent: QModelIndex, first: int, last: int):
+        insert_emits.append((first, last))
+
+    def save_remove_emit(parent: QModelIndex, first: int, last: int):
+        remove_emits.append((first, last))
+
     model.dataChanged.connect(save_data_emit)
+    model.rowsInserted.connect(save_insert_emit)
+    model.rowsRemoved.connect(save_remove_emit)
 
     original_config = model.config
 
@@ -1116,11 +1378,32 @@ def test_update_from_config_file(model: IOCTableModel):
     new_config.mtime = time.time()
     model.update_from_config_file(config=new_config)
     assert model.config == new_config
-    assert data_emits
-    assert data_emits[0][0].row() == 0
+    # No IOC changed, so no rows need to be redrawn
+    assert not data_emits
+    assert not insert_emits
+    assert not remove_emits
+
+    # Modify ioc3 and ioc4, remove ioc1, add a new ioc after ioc7
+    new_config = deepcopy(model.config)
+    new_config.procs["ioc3"].alias = "Three"
+    new_config.procs["ioc4"].path = "ioc/some/other/path"
+    new_config.delete_proc("ioc1")
+    procs = list(new_config.procs.values())
+    procs.insert(7, IOCProc(name="new", port=40000, host="host", path="new/path"))
+    new_config.procs = {proc.name: proc for proc in procs}
+    new_config.mtime = time.time() + 1
+    model.update_from_config_file(config=new_config)
+    assert model.config == new_config
+    assert model.get_ioc_row_map() == list(new_config.procs)
+    assert remove_emits == [(1, 1)]
+    assert insert_emits == [(7, 7)]
+    assert len(data_emits) == 1
+    assert data_emits[0][0].row() == 2
     assert data_emits[0][0].column() == 0
-    assert data_emits[0][1].row() == model.rowCount() - 1
+    assert data_emits[0][1].row() == 3
     assert data_emits[0][1].column() == model.columnCount() - 1
+    assert model.port_index.count(host="host", port=30002) == 0
+    assert model.port_index.count(host="host", port=40000) == 1
 
 
 def test_update_from_status_file(model: IOCTableModel):
@@ -1202,6 +1485,66 @@ def test_update_from_live_ioc(model: IOCTableModel):
     assert data_emits[1][1].column() == TableColumn.EXTRA
 
 
+def test_update_from_poll_batch(model: IOCTableModel):
+    """
+    model.update_from_poll_batch should apply a whole sweep at once.
+
+    Rows that changed next to each other should share one dataChanged emit
+    covering the status through extra columns, and unchanged records should
+    not emit at all.
+    """
+    data_emits: list[tuple[QModelIndex, QModelIndex]] = []
+
+    def save_data_emit(index1: QModelIndex, index2: QModelIndex):
+        data_emits.append((index1, index2))
+
+    model.dataChanged.connect(save_data_emit)
+
+    def status_live(num: int) -> IOCStatusLive:
+        return IOCStatusLive(
+            name=f"ioc{num}",
+            port=30001 + num,
+            host="host",
+            path=f"ioc/some/path/{num}",
+            pid=num,
+            status=ProcServStatus.RUNNING,
+            autorestart_mode=AutoRestartMode.ON,
+        )
+
+    batch = PollBatch(
+        status_files=[
+            IOCStatusFile(
+                name="ioc2",
+                port=30003,
+                host="host",
+                path="ioc/some/path/2",
+                pid=2,
+            )
+        ],
+        status_live=[status_live(num) for num in (0, 1, 2, 5, 6)],
+    )
+    model.update_from_poll_batch(batch)
+    assert model.status_files["ioc2"] == batch.status_files[0]
+    for live in batch.status_live:
+        assert model.status_live[live.name] == live
+    ranges = [
+        (start.row(), end.row(), start.column(), end.column())
+        for start, end in data_emits
+    ]
+    assert ranges == [
+        (0, 2, TableColumn.STATUS, TableColumn.EXTRA),
+        (5, 6, TableColumn.STATUS, TableColumn.EXTRA),
+    ]
+
+    # Same batch again = no change
+    model.update_from_poll_batch(batch)
+    assert len(data_emits) == 2
+
+    # Empty batches are falsy so the poll thread can skip them
+    assert not PollBatch()
+    assert batch
+
+
 def test_live_only_iocs(
     model: IOCTableModel, monkeypatch: pytest.MonkeyPatch, qtbot: QtBot
 ):
@@ -1248,10 +1591,10 @@ def test_live_only_iocs(
             autorestart_mode=AutoRestartMode.ON,
         )
 
-    monkeypatch.setattr(table_model, "read_config", read_config_patch)
-    monkeypatch.setattr(table_model, "get_host_os", get_host_os_patch)
-    monkeypatch.setattr(table_model, "read_status_dir", read_status_dir_patch)
-    monkeypatch.setattr(table_model, "check_status", check_status_patch)
+    monkeypatch.setattr(state_engine, "read_config", read_config_patch)
+    monkeypatch.setattr(state_engine, "get_host_os", get_host_os_patch)
+    monkeypatch.setattr(state_engine, "read_status_dir", read_status_dir_patch)
+    monkeypatch.setattr(state_engine, "check_status", check_status_patch)
 
     # One status file for each possible status
     base_port = 40001
@@ -1272,7 +1615,7 @@ def test_live_only_iocs(
 
     # Poll once
     with concurrent.futures.ThreadPoolExecutor() as executor:
-        model._inner_poll(executor=executor)
+        model.poller._inner_poll(executor=executor)
     qtbot.wait_signal(model.signal_poll_done, timeout=1000)
 
     # Check that the correct iocs are or are not queryable
@@ -1573,9 +1916,12 @@ def test_save_version(model: IOCTableModel):
     model.save_version should pend saving a new history entry for the given row.
     """
     assert not model.get_next_config().procs["ioc0"].history
+    # Fill the row cache first, it should be cleared by save_version
+    assert not model.get_row_view(0).info.ioc_proc.history
     model.save_version(0)
     ioc_proc = model.get_next_config().procs["ioc0"]
     assert ioc_proc.path in ioc_proc.history
+    assert ioc_proc.path in model.get_row_view(0).info.ioc_proc.history
 
 
 def test_save_all_versions(model: IOCTableModel):
@@ -1584,10 +1930,12 @@ def test_save_all_versions(model: IOCTableModel):
     """
     for ioc_name in (f"ioc{num}" for num in range(10)):
         assert not model.get_next_config().procs[ioc_name].history
+        assert not model.get_row_view(ioc_name).info.ioc_proc.history
     model.save_all_versions()
     for ioc_name in (f"ioc{num}" for num in range(10)):
         ioc_proc = model.get_next_config().procs[ioc_name]
         assert ioc_proc.path in ioc_proc.history
+        assert ioc_proc.path in model.get_row_view(ioc_name).info.ioc_proc.history
 
 
 def test_pending_edits(model: IOCTableModel):
@@ -1639,8 +1987,12 @@ def test_set_from_running(model: IOCTableModel):
     model.add_ioc(ioc_proc=old)
     assert model.get_next_config().procs["added"] == old
     model.update_from_live_ioc(status_live=status_live)
+    # Fill the row cache first, it should be cleared by set_from_running
+    index = model.index(model.get_ioc_row(ioc="added"), TableColumn.VERSION)
+    assert model.data(index) == "old/path"
     model.set_from_running(ioc="added")
     assert model.get_next_config().procs["added"] == new
+    assert model.data(index) == "new/path"
 
 
 def test_get_unused_port(model: IOCTableModel):